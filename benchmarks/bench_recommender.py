@@ -0,0 +1,196 @@
+"""Benchmark: row-wise vs set-based recommendation scoring.
+
+Run from the project root:
+
+    python -m benchmarks.bench_recommender
+
+Builds an in-memory corpus shaped like the data DB (papers with citation
+lists, paper_microtopics), then times the original per-row ranking of
+/api/users/<id>/recommendations against src.recommender.recommend for
+readers with 10, 1k and 10k papers in their history, both unnesting
+papers.citations and using the paper_cited_by reverse index.
+"""
+
+import datetime as dt
+import time
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+from src.recommender import recommend
+
+
+def legacy_recommend(data_db, read_papers: pd.DataFrame, strategy: str, limit: int, now: dt.datetime) -> list[dict]:
+    """The original route body (iterrows, per-paper filtering), kept as the reference."""
+    read_papers = read_papers.copy()
+    read_papers['days_ago'] = read_papers['read_at'].apply(
+        lambda x: (now - x).days if isinstance(x, dt.datetime) else 365
+    )
+    read_papers['weight'] = read_papers['days_ago'].apply(
+        lambda days: max(0.5, 2.0 * (0.5 ** (days / 30)))
+    )
+
+    read_paper_ids = read_papers['paper_id'].tolist()
+    placeholders = ','.join(['?'] * len(read_paper_ids))
+    paper_weights = dict(zip(read_papers['paper_id'], read_papers['weight']))
+
+    recommendations = []
+
+    if strategy in ['citation_graph', 'hybrid']:
+        citing_papers = data_db.execute(f"""
+            SELECT p.id, p.title, p.citation_count, p.categories, p.update_date, p.citations
+            FROM papers p
+            WHERE p.id NOT IN ({placeholders})
+            AND list_has_any(p.citations, CAST([{placeholders}] AS VARCHAR[]))
+            AND (p.deleted = false OR p.deleted IS NULL)
+            LIMIT {limit * 3}
+        """, read_paper_ids + read_paper_ids).fetchdf()
+
+        for _, paper in citing_papers.iterrows():
+            cited_papers = paper['citations'] if paper['citations'] is not None else []
+            citation_weight = sum(
+                paper_weights.get(cited_id, 0)
+                for cited_id in cited_papers
+                if cited_id in paper_weights
+            )
+            recommendations.append({
+                'id': paper['id'],
+                'citation_count': int(paper['citation_count']),
+                'reason': 'Cites papers in your reading history',
+                'score': 0.9 + (citation_weight * 0.1)
+            })
+
+    if strategy in ['topic_similarity', 'hybrid'] and len(recommendations) < limit * 2:
+        user_microtopics = data_db.execute(f"""
+            SELECT pm.microtopic_id, pm.paper_id
+            FROM paper_microtopics pm
+            WHERE pm.paper_id IN ({placeholders})
+        """, read_paper_ids).fetchdf()
+
+        if not user_microtopics.empty:
+            user_microtopics['weight'] = user_microtopics['paper_id'].map(paper_weights)
+            microtopic_weights = user_microtopics.groupby('microtopic_id')['weight'].sum().to_dict()
+
+            microtopic_ids = list(microtopic_weights.keys())
+            topic_placeholders = ','.join(['?'] * len(microtopic_ids))
+
+            similar_papers = data_db.execute(f"""
+                SELECT p.id, p.title, p.citation_count, p.categories, p.update_date,
+                       pm.microtopic_id
+                FROM papers p
+                INNER JOIN paper_microtopics pm ON p.id = pm.paper_id
+                WHERE pm.microtopic_id IN ({topic_placeholders})
+                AND p.id NOT IN ({placeholders})
+                AND (p.deleted = false OR p.deleted IS NULL)
+                LIMIT {limit * 3}
+            """, microtopic_ids + read_paper_ids).fetchdf()
+
+            for paper_id in similar_papers['id'].unique():
+                paper_rows = similar_papers[similar_papers['id'] == paper_id]
+                paper_data = paper_rows.iloc[0]
+                topic_weight = sum(
+                    microtopic_weights.get(mid, 0)
+                    for mid in paper_rows['microtopic_id'].values
+                )
+                if paper_id not in [r['id'] for r in recommendations]:
+                    recommendations.append({
+                        'id': paper_data['id'],
+                        'citation_count': int(paper_data['citation_count']),
+                        'reason': 'Shares topics with your reading history',
+                        'score': 0.7 + (topic_weight * 0.05)
+                    })
+
+    recommendations.sort(key=lambda x: (x['score'], x['citation_count']), reverse=True)
+    return recommendations[:limit]
+
+
+def make_corpus(n_papers: int, n_topics: int, seed: int = 0) -> duckdb.DuckDBPyConnection:
+    """In-memory data DB with papers citing earlier papers and 1-3 microtopics each."""
+    rng = np.random.default_rng(seed)
+    ids = [f"2401.{i:05d}" for i in range(n_papers)]
+    edges = []
+    for i in range(n_papers):
+        k = min(i, int(rng.integers(0, 12)))
+        edges.extend((ids[i], ids[j]) for j in (rng.choice(i, size=k, replace=False) if k else ()))
+    cites = pd.DataFrame(edges, columns=["id", "cited_id"]).astype("string")
+    papers = pd.DataFrame({
+        "id": ids,
+        "title": [f"Paper {i}" for i in range(n_papers)],
+        "citation_count": rng.integers(0, 500, n_papers).astype(np.int32),
+        "categories": rng.choice(["cs.LG", "cs.CV", "cs.CL"], n_papers),
+        "update_date": pd.Series(pd.to_datetime("2020-01-01")
+                                 + pd.to_timedelta(rng.integers(0, 1500, n_papers), unit="D")).dt.date,
+        "deleted": rng.random(n_papers) < 0.01,
+    }).astype({"id": "string", "title": "string", "categories": "string"})
+
+    topic_rows = [(pid, f"mt-{t:04d}")
+                  for pid in ids
+                  for t in rng.choice(n_topics, size=int(rng.integers(1, 4)), replace=False)]
+    paper_microtopics = pd.DataFrame(topic_rows, columns=["paper_id", "microtopic_id"]).astype("string")
+
+    conn = duckdb.connect()
+    conn.register("papers_df", papers)
+    conn.register("cites_df", cites)
+    conn.execute("""
+        CREATE TABLE papers AS
+        SELECT p.*, COALESCE(c.citations, []::VARCHAR[]) AS citations
+        FROM papers_df p
+        LEFT JOIN (SELECT id, list(cited_id) AS citations FROM cites_df GROUP BY id) c USING (id)
+    """)
+    conn.register("pm_df", paper_microtopics)
+    conn.execute("CREATE TABLE paper_microtopics AS SELECT * FROM pm_df")
+    # Same shape as data/process_cited_by.py builds
+    conn.execute("""
+        CREATE TABLE paper_cited_by AS
+        SELECT DISTINCT c.cited_id, c.id AS citing_id
+        FROM cites_df c
+        SEMI JOIN (SELECT id FROM papers WHERE NOT deleted) p ON p.id = c.id
+        ORDER BY c.cited_id
+    """)
+    conn.unregister("papers_df")
+    conn.unregister("pm_df")
+    conn.unregister("cites_df")
+    return conn
+
+
+def make_reads(conn: duckdb.DuckDBPyConnection, n_reads: int, now: dt.datetime, seed: int = 0) -> pd.DataFrame:
+    """Read history of ``n_reads`` random papers over the last year."""
+    rng = np.random.default_rng(seed)
+    ids = [r[0] for r in conn.execute("SELECT id FROM papers").fetchall()]
+    picked = rng.choice(len(ids), size=min(n_reads, len(ids)), replace=False)
+    ages = pd.to_timedelta(rng.integers(0, 365 * 24 * 3600, len(picked)), unit="s")
+    return pd.DataFrame({
+        "paper_id": [ids[i] for i in picked],
+        "read_at": pd.Series(now - ages).astype("datetime64[us]"),
+    })
+
+
+def timed(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    now = dt.datetime(2025, 1, 1)
+    conn = make_corpus(n_papers=50_000, n_topics=500)
+    for n_reads in (10, 1_000, 10_000):
+        reads = make_reads(conn, n_reads, now)
+        paper_ids, read_at = reads["paper_id"].tolist(), reads["read_at"].to_numpy()
+        for strategy in ("citation_graph", "topic_similarity", "hybrid"):
+            t_legacy = timed(lambda: legacy_recommend(conn, reads, strategy, 10, now))
+            t_unnest = timed(lambda: recommend(conn, paper_ids, read_at, strategy, 10, now, use_cited_by=False))
+            t_cited_by = timed(lambda: recommend(conn, paper_ids, read_at, strategy, 10, now, use_cited_by=True))
+            print(
+                f"{n_reads:>6} reads {strategy:>16}: row-wise {t_legacy * 1000:8.1f} ms | "
+                f"set-based {t_unnest * 1000:7.1f} ms ({t_legacy / t_unnest:5.1f}x) | "
+                f"with paper_cited_by {t_cited_by * 1000:7.1f} ms ({t_legacy / t_cited_by:5.1f}x)"
+            )
+
+
+if __name__ == "__main__":
+    main()
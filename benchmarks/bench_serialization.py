@@ -0,0 +1,96 @@
+"""Micro-benchmark: row-wise vs columnar DataFrame serialization.
+
+Run from the project root:
+
+    python -m benchmarks.bench_serialization
+
+Builds frames shaped like a `SELECT * FROM papers` result (strings, dates,
+list columns, NULLs, numpy ints/floats), checks that both serializers give
+byte-identical JSON, then times them on 100-row and 10k-row frames.
+"""
+
+import timeit
+
+import numpy as np
+import pandas as pd
+from flask import Flask
+
+from src.database import df_to_json_serializable
+
+
+def legacy_df_to_json_serializable(df: pd.DataFrame) -> list[dict]:
+    """The original iterrows() implementation, kept as the reference."""
+    def convert_value(val):
+        if isinstance(val, (np.ndarray, list)):
+            return [convert_value(v) for v in val] if len(val) > 0 else []
+        elif val is None or (not isinstance(val, (list, dict)) and pd.isna(val)):
+            return None
+        elif isinstance(val, (np.integer, np.int64)):
+            return int(val)
+        elif isinstance(val, (np.floating, np.float64)):
+            return float(val)
+        elif isinstance(val, (np.bool_, bool)):
+            return bool(val)
+        elif isinstance(val, (pd.Timestamp, np.datetime64)):
+            return pd.Timestamp(val).strftime('%Y-%m-%d')
+        elif isinstance(val, dict):
+            return {k: convert_value(v) for k, v in val.items()}
+        else:
+            return val
+
+    records = []
+    for _, row in df.iterrows():
+        record = {}
+        for col in df.columns:
+            record[col] = convert_value(row[col])
+        records.append(record)
+
+    return records
+
+
+def make_papers_frame(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """Synthetic frame with the column types the papers table returns."""
+    rng = np.random.default_rng(seed)
+    ids = [f"2401.{i:05d}" for i in range(n_rows)]
+    dates = pd.to_datetime("2015-01-01") + pd.to_timedelta(rng.integers(0, 3650, n_rows), unit="D")
+    dates = pd.Series(dates).astype("datetime64[us]")
+    dates[rng.random(n_rows) < 0.05] = pd.NaT
+    citations = [
+        np.array([f"W{j}" for j in rng.integers(0, 10**6, rng.integers(0, 8))], dtype=object)
+        for _ in range(n_rows)
+    ]
+    scores = rng.random(n_rows)
+    scores[rng.random(n_rows) < 0.1] = np.nan
+    titles = pd.Series([f"Paper {i}" for i in range(n_rows)], dtype=object)
+    titles[rng.random(n_rows) < 0.02] = None
+    return pd.DataFrame({
+        "id": ids,
+        "title": titles,
+        "update_date": dates,
+        "citations": citations,
+        "citation_count": rng.integers(0, 5000, n_rows).astype(np.int32),
+        "primary_topic_score": scores,
+        "deleted": rng.random(n_rows) < 0.01,
+        "versions": [[{"version": "v1", "created": "Mon, 1 Jan 2024"}] for _ in range(n_rows)],
+    })
+
+
+def main() -> None:
+    dumps = Flask(__name__).json.dumps
+    for n_rows in (100, 10_000):
+        df = make_papers_frame(n_rows)
+        legacy = dumps(legacy_df_to_json_serializable(df))
+        columnar = dumps(df_to_json_serializable(df))
+        assert legacy == columnar, f"JSON differs for {n_rows} rows"
+
+        number = max(1, 2000 // n_rows)
+        t_legacy = min(timeit.repeat(lambda: legacy_df_to_json_serializable(df), number=number, repeat=3)) / number
+        t_columnar = min(timeit.repeat(lambda: df_to_json_serializable(df), number=number, repeat=3)) / number
+        print(
+            f"{n_rows:>6} rows: iterrows {t_legacy * 1000:8.2f} ms | "
+            f"columnar {t_columnar * 1000:8.2f} ms | {t_legacy / t_columnar:5.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
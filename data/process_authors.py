@@ -9,6 +9,8 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
 from requests.adapters import HTTPAdapter
 
+from process_doi_norm import ensure_doi_norm
+
 # 1) Get DOI for all papers from arxiv id
 # 2) Get author list and update papers table
 # 3) Get citations list from DOIs (of DOIs) and update papers table
@@ -18,6 +20,8 @@ conn = duckdb.connect("../data.db")
 res = conn.execute(
     "UPDATE papers SET doi = '10.48550/arXiv.' || id WHERE doi IS NULL AND id IS NOT NULL;"
 )
+# doi_norm for those DOIs; also registers the normalize_doi() macro used below
+ensure_doi_norm(conn)
 
 res = conn.execute("SELECT doi FROM papers where author_ids is null;").fetchdf()
 count = (
@@ -127,7 +131,7 @@ with tqdm(total=count) as pbar:
                                 UPDATE papers
                                 SET author_ids = u.author_ids
                                 FROM batch_updates u
-                                WHERE lower(papers.doi) = u.doi_lc;
+                                WHERE papers.doi_norm = normalize_doi(u.doi_lc);
                             """)
                     conn.execute("DELETE FROM batch_updates")
                     conn.commit()
@@ -145,7 +149,7 @@ with tqdm(total=count) as pbar:
             conn.executemany("INSERT INTO batch_updates VALUES (?, ?)", pending_rows)
             conn.execute("""
                         UPDATE papers SET author_ids = u.author_ids
-                        FROM batch_updates u WHERE lower(papers.doi) = u.doi_lc;
+                        FROM batch_updates u WHERE papers.doi_norm = normalize_doi(u.doi_lc);
                     """)
             conn.execute("DELETE FROM batch_updates")
 
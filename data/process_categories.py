@@ -0,0 +1,84 @@
+import argparse
+import time
+
+import duckdb
+
+
+DB_PATH_DEFAULT = "../src/data.db"
+
+
+def build_categories(conn: duckdb.DuckDBPyConnection) -> dict:
+    """(Re)build the normalized category tables from papers.categories.
+
+    Tables written:
+      paper_categories(paper_id, category, is_primary)
+          one row per (paper, category); the first category listed on the
+          paper is its primary one. Sorted by category, so an equality filter
+          on one subject only reads that subject's row groups.
+      category_dict(category, archive, paper_count, primary_count)
+          every category seen, with its archive ("cs" for "cs.LG",
+          "hep-th" for "hep-th") and paper counts.
+    """
+    conn.execute("BEGIN TRANSACTION")
+    try:
+        conn.execute(
+            """
+            CREATE OR REPLACE TABLE paper_categories AS
+            WITH exploded AS (
+                SELECT
+                    id AS paper_id,
+                    unnest(regexp_split_to_array(trim(categories), '\\s+')) AS category,
+                    generate_subscripts(regexp_split_to_array(trim(categories), '\\s+'), 1) AS position
+                FROM papers
+                WHERE id IS NOT NULL
+                  AND deleted IS NOT TRUE
+                  AND categories IS NOT NULL
+                  AND trim(categories) <> ''
+            )
+            SELECT paper_id, category, bool_or(position = 1) AS is_primary
+            FROM exploded
+            WHERE category <> ''
+            GROUP BY paper_id, category
+            ORDER BY category, paper_id;
+            """
+        )
+        conn.execute(
+            """
+            CREATE OR REPLACE TABLE category_dict AS
+            SELECT
+                category,
+                split_part(category, '.', 1) AS archive,
+                COUNT(*)::INTEGER AS paper_count,
+                COUNT(*) FILTER (WHERE is_primary)::INTEGER AS primary_count
+            FROM paper_categories
+            GROUP BY category
+            ORDER BY category;
+            """
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+    rows = conn.execute("SELECT COUNT(*) FROM paper_categories").fetchone()[0]
+    categories = conn.execute("SELECT COUNT(*) FROM category_dict").fetchone()[0]
+    return {"rows": rows, "categories": categories}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Explode papers.categories into paper_categories + category_dict.")
+    parser.add_argument("--db", default=DB_PATH_DEFAULT)
+    args = parser.parse_args()
+
+    conn = duckdb.connect(args.db)
+    t0 = time.time()
+    try:
+        stats = build_categories(conn)
+    finally:
+        conn.close()
+
+    print(f"Wrote {stats['rows']} paper/category rows over {stats['categories']} categories ({time.time() - t0:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
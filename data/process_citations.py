@@ -8,7 +8,12 @@ from requests.adapters import HTTPAdapter
 from tqdm import tqdm
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+from process_cited_by import has_cited_by, update_cited_by
+from process_doi_norm import ensure_doi_norm
+
 conn = duckdb.connect("data.db")
+# Flushes join on papers.doi_norm through the normalize_doi() macro
+ensure_doi_norm(conn)
 
 res = conn.execute("SELECT doi FROM papers WHERE citations IS NULL AND deleted = false AND doi IS NOT NULL;").fetchdf()
 total_dois = [x[0] for x in res.values]
@@ -76,6 +81,22 @@ BATCHES_TO_SAVE = 200
 
 conn.execute("CREATE TEMP TABLE IF NOT EXISTS citation_updates (doi_lc VARCHAR, cited_work_ids VARCHAR[]);")
 
+# Keep paper_cited_by in step with papers.citations if it has been built
+MAINTAIN_CITED_BY = has_cited_by(conn)
+
+
+def apply_citation_updates():
+    conn.execute("""
+        UPDATE papers SET citations = u.cited_work_ids
+        FROM citation_updates u WHERE papers.doi_norm = normalize_doi(u.doi_lc);
+    """)
+    if MAINTAIN_CITED_BY:
+        update_cited_by(conn, """
+            SELECT p.id FROM papers p
+            JOIN citation_updates u ON p.doi_norm = normalize_doi(u.doi_lc)
+        """)
+
+
 def job(batch):
     return get_citations_batch(list(batch))
 
@@ -99,10 +120,7 @@ with tqdm(total=count) as pbar:
 
                 if len(pending_rows) >= BATCHES_TO_SAVE * 50:
                     conn.executemany("INSERT INTO citation_updates VALUES (?, ?)", pending_rows)
-                    conn.execute("""
-                        UPDATE papers SET citations = u.cited_work_ids
-                        FROM citation_updates u WHERE lower(papers.doi) = u.doi_lc;
-                    """)
+                    apply_citation_updates()
                     conn.execute("DELETE FROM citation_updates")
                     conn.commit()
                     pending_rows = []
@@ -115,10 +133,7 @@ with tqdm(total=count) as pbar:
 
     if pending_rows:
         conn.executemany("INSERT INTO citation_updates VALUES (?, ?)", pending_rows)
-        conn.execute("""
-            UPDATE papers SET citations = u.cited_work_ids
-            FROM citation_updates u WHERE lower(papers.doi) = u.doi_lc;
-        """)
+        apply_citation_updates()
         conn.commit()
 
 conn.close()
\ No newline at end of file
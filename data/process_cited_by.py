@@ -0,0 +1,103 @@
+import argparse
+import time
+
+import duckdb
+
+
+DB_PATH_DEFAULT = "../src/data.db"
+
+# One edge per (cited work, citing paper) taken from papers.citations.
+# Deleted papers do not cite anything.
+_EDGES_SQL = """
+    SELECT DISTINCT cited_id, citing_id
+    FROM (
+        SELECT unnest(citations) AS cited_id, id AS citing_id
+        FROM papers
+        WHERE id IS NOT NULL
+          AND deleted IS NOT TRUE
+          AND citations IS NOT NULL
+          {extra_where}
+    )
+    WHERE cited_id IS NOT NULL
+"""
+
+
+def has_cited_by(conn: duckdb.DuckDBPyConnection) -> bool:
+    found = conn.execute(
+        "SELECT COUNT(*) FROM duckdb_tables() WHERE table_name = 'paper_cited_by'"
+    ).fetchone()[0]
+    return found == 1
+
+
+def build_cited_by(conn: duckdb.DuckDBPyConnection) -> dict:
+    """(Re)build the reverse-citation table from papers.citations.
+
+    Table written:
+      paper_cited_by(cited_id, citing_id)   sorted by cited_id, so "who cites
+                                            X" only reads the row groups
+                                            holding X
+    """
+    conn.execute("BEGIN TRANSACTION")
+    try:
+        conn.execute(
+            f"""
+            CREATE OR REPLACE TABLE paper_cited_by AS
+            {_EDGES_SQL.format(extra_where="")}
+            ORDER BY cited_id, citing_id;
+            """
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+    edges = conn.execute("SELECT COUNT(*) FROM paper_cited_by").fetchone()[0]
+    cited = conn.execute("SELECT COUNT(DISTINCT cited_id) FROM paper_cited_by").fetchone()[0]
+    return {"edges": edges, "cited": cited}
+
+
+def update_cited_by(conn: duckdb.DuckDBPyConnection, citing_ids_sql: str, params: list | None = None) -> None:
+    """Re-derive edges for papers whose citations just changed.
+
+    `citing_ids_sql` is a query returning one column of papers.id values
+    (e.g. the papers touched by a citations UPDATE). Their old edges are
+    dropped and new ones inserted. New rows land at the end of the table;
+    a periodic full build_cited_by() restores the cited_id sort.
+
+    Runs inside the caller's transaction.
+    """
+    conn.execute(
+        f"CREATE OR REPLACE TEMP TABLE cited_by_touched AS SELECT DISTINCT * FROM ({citing_ids_sql}) t(id)",
+        params or [],
+    )
+    conn.execute(
+        f"""
+        CREATE OR REPLACE TEMP TABLE cited_by_new AS
+        {_EDGES_SQL.format(extra_where="AND id IN (SELECT id FROM cited_by_touched)")};
+        """
+    )
+
+    conn.execute("DELETE FROM paper_cited_by WHERE citing_id IN (SELECT id FROM cited_by_touched)")
+    conn.execute("INSERT INTO paper_cited_by SELECT cited_id, citing_id FROM cited_by_new ORDER BY cited_id")
+
+    for table in ("cited_by_touched", "cited_by_new"):
+        conn.execute(f"DROP TABLE {table}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the reverse-citation table (paper_cited_by).")
+    parser.add_argument("--db", default=DB_PATH_DEFAULT)
+    args = parser.parse_args()
+
+    conn = duckdb.connect(args.db)
+    t0 = time.time()
+    try:
+        stats = build_cited_by(conn)
+    finally:
+        conn.close()
+
+    print(f"Wrote {stats['edges']} citation edges for {stats['cited']} cited works ({time.time() - t0:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -25,6 +25,8 @@ from sklearn.preprocessing import normalize
 from tqdm import tqdm
 from transformers import AutoTokenizer
 
+from process_microtopic_stats import update_microtopic_stats
+
 _LABEL_TOKENIZER = None
 _LABEL_MODEL = None
 _LABEL_DEVICE = None
@@ -1126,6 +1128,10 @@ def write_results(
         f"[write] Inserted {len(microtopics_df)} microtopics + {len(assignments_df):,} assignments in {time.time() - t0:.1f}s",
         file=sys.stderr)
 
+    t0 = time.time()
+    if update_microtopic_stats(conn, bucket_column, bucket_value):
+        print(f"[write] Refreshed microtopic stats for {bucket_value!r} in {time.time() - t0:.1f}s", file=sys.stderr)
+
     return microtopics_df, assignments_df
 
 
@@ -0,0 +1,98 @@
+import argparse
+import time
+
+import duckdb
+
+
+DB_PATH_DEFAULT = "../src/data.db"
+
+INDEX_NAME = "papers_doi_norm_idx"
+
+# SQL twin of process_topics.normalize_doi: strip, lowercase, drop one
+# https://doi.org/, http://doi.org/ and doi: prefix (in that order), drop
+# trailing commas, empty -> NULL. src/filters.normalize_doi is the copy the
+# routes use for lookups.
+_NORMALIZE_DOI_MACRO = r"""
+    CREATE OR REPLACE TEMP MACRO normalize_doi(raw) AS NULLIF(
+        rtrim(
+            regexp_replace(
+                regexp_replace(
+                    regexp_replace(
+                        regexp_replace(lower(raw), '^\s+|\s+$', '', 'g'),
+                        '^https://doi\.org/', ''),
+                    '^http://doi\.org/', ''),
+                '^doi:', ''),
+            ','),
+        '')
+"""
+
+
+def ensure_doi_norm(conn: duckdb.DuckDBPyConnection) -> int:
+    """Make papers.doi_norm usable and fill rows that do not have it yet.
+
+    Adds the column and its ART index when missing, registers the
+    `normalize_doi(raw)` temp macro on `conn` (enrichment jobs use it to
+    normalize their own keys), and computes doi_norm for rows whose doi is
+    set but doi_norm is not. Returns the number of rows filled.
+    """
+    conn.execute(_NORMALIZE_DOI_MACRO)
+    conn.execute("ALTER TABLE papers ADD COLUMN IF NOT EXISTS doi_norm VARCHAR")
+    filled = conn.execute(
+        """
+        UPDATE papers SET doi_norm = normalize_doi(doi)
+        WHERE doi_norm IS NULL AND normalize_doi(doi) IS NOT NULL
+        """
+    ).fetchone()[0]
+    conn.execute(f"CREATE INDEX IF NOT EXISTS {INDEX_NAME} ON papers(doi_norm)")
+    return filled
+
+
+def build_doi_norm(conn: duckdb.DuckDBPyConnection) -> dict:
+    """(Re)compute papers.doi_norm for every paper and (re)build its index.
+
+    Column written:
+      papers.doi_norm   canonical DOI (see process_topics.normalize_doi),
+                        NULL when the paper has no usable DOI
+    Index:
+      papers_doi_norm_idx   ART index, so `doi_norm = ?` is a point lookup
+
+    The index is dropped during the rewrite so the bulk UPDATE does not
+    maintain it row by row, and recreated once the rewrite is committed
+    (DuckDB cannot build an index over uncommitted updates).
+    """
+    conn.execute(_NORMALIZE_DOI_MACRO)
+    conn.execute(f"DROP INDEX IF EXISTS {INDEX_NAME}")
+    conn.execute("BEGIN TRANSACTION")
+    try:
+        conn.execute("ALTER TABLE papers ADD COLUMN IF NOT EXISTS doi_norm VARCHAR")
+        conn.execute("UPDATE papers SET doi_norm = normalize_doi(doi)")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute(f"CREATE INDEX {INDEX_NAME} ON papers(doi_norm)")
+
+    papers, with_doi, distinct = conn.execute(
+        "SELECT COUNT(*), COUNT(doi_norm), COUNT(DISTINCT doi_norm) FROM papers"
+    ).fetchone()
+    return {"papers": papers, "with_doi": with_doi, "distinct": distinct}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compute papers.doi_norm and index it.")
+    parser.add_argument("--db", default=DB_PATH_DEFAULT)
+    args = parser.parse_args()
+
+    conn = duckdb.connect(args.db)
+    t0 = time.time()
+    try:
+        stats = build_doi_norm(conn)
+    finally:
+        conn.close()
+
+    print(f"Normalized {stats['with_doi']} of {stats['papers']} DOIs "
+          f"({stats['distinct']} distinct, {time.time() - t0:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
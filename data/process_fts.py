@@ -0,0 +1,144 @@
+import argparse
+import time
+
+import duckdb
+
+
+DB_PATH_DEFAULT = "../src/data.db"
+
+# Tokenizer shared with src/search.py -- keep the two in sync. Text is
+# accent-stripped and lower-cased, split on anything that is not [a-z0-9],
+# and tokens shorter than two characters or in STOPWORDS are dropped.
+TOKEN_SPLIT_RE = "[^a-z0-9]+"
+MIN_TOKEN_LEN = 2
+STOPWORDS = (
+    "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "in",
+    "is", "it", "its", "of", "on", "or", "that", "the", "this", "to", "was",
+    "we", "were", "which", "with",
+)
+
+
+def build_fts_index(conn: duckdb.DuckDBPyConnection) -> dict:
+    """(Re)build the BM25 inverted index over papers.title/abstract/authors.
+
+    Tables written:
+      fts_docs(docid, paper_id, len)        one row per paper, len in tokens
+      fts_dict(termid, term, df)            vocabulary, ordered by term
+      fts_postings(termid, docid, tf)       ordered by termid so a term lookup
+                                            only touches its own row groups
+      fts_stats(num_docs, avg_len, built_at)
+    """
+    stopwords_sql = ", ".join(f"'{w}'" for w in STOPWORDS)
+
+    conn.execute("BEGIN TRANSACTION")
+    try:
+        conn.execute(
+            f"""
+            CREATE OR REPLACE TEMP TABLE fts_doc_terms AS
+            WITH docs AS (
+                SELECT
+                    row_number() OVER (ORDER BY id)::INTEGER AS docid,
+                    id AS paper_id,
+                    regexp_split_to_array(
+                        lower(strip_accents(concat_ws(' ', title, abstract, authors))),
+                        '{TOKEN_SPLIT_RE}'
+                    ) AS tokens
+                FROM papers
+                WHERE id IS NOT NULL
+            ),
+            tokens AS (
+                SELECT docid, paper_id, unnest(tokens) AS term FROM docs
+            )
+            SELECT docid, paper_id, term, COUNT(*)::INTEGER AS tf
+            FROM tokens
+            WHERE length(term) >= {MIN_TOKEN_LEN}
+              AND term NOT IN ({stopwords_sql})
+            GROUP BY docid, paper_id, term;
+            """
+        )
+
+        conn.execute(
+            """
+            CREATE OR REPLACE TABLE fts_docs AS
+            SELECT docid, paper_id, SUM(tf)::INTEGER AS len
+            FROM fts_doc_terms
+            GROUP BY docid, paper_id
+            ORDER BY docid;
+            """
+        )
+        conn.execute(
+            """
+            CREATE OR REPLACE TABLE fts_dict AS
+            SELECT row_number() OVER (ORDER BY term)::INTEGER AS termid, term, df
+            FROM (
+                SELECT term, COUNT(*)::INTEGER AS df
+                FROM fts_doc_terms
+                GROUP BY term
+            )
+            ORDER BY term;
+            """
+        )
+        conn.execute(
+            """
+            CREATE OR REPLACE TABLE fts_postings AS
+            SELECT d.termid, t.docid, t.tf
+            FROM fts_doc_terms t
+            JOIN fts_dict d ON d.term = t.term
+            ORDER BY d.termid, t.docid;
+            """
+        )
+        conn.execute(
+            """
+            CREATE OR REPLACE TABLE fts_stats AS
+            SELECT
+                COUNT(*) AS num_docs,
+                COALESCE(AVG(len), 0)::DOUBLE AS avg_len,
+                now()::TIMESTAMP AS built_at
+            FROM fts_docs;
+            """
+        )
+        conn.execute("DROP TABLE fts_doc_terms")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+    num_docs, avg_len = conn.execute("SELECT num_docs, avg_len FROM fts_stats").fetchone()
+    num_terms = conn.execute("SELECT COUNT(*) FROM fts_dict").fetchone()[0]
+    num_postings = conn.execute("SELECT COUNT(*) FROM fts_postings").fetchone()[0]
+    return {
+        "docs": num_docs,
+        "terms": num_terms,
+        "postings": num_postings,
+        "avg_len": avg_len,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the BM25 keyword index (fts_* tables) for /api/papers?keyword=.")
+    parser.add_argument("--db", default=DB_PATH_DEFAULT)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--memory-limit", default=None, help="DuckDB memory_limit, e.g. 8GB.")
+    args = parser.parse_args()
+
+    conn = duckdb.connect(args.db)
+    if args.threads:
+        conn.execute(f"SET threads = {int(args.threads)}")
+    if args.memory_limit:
+        conn.execute("SET memory_limit = ?", [args.memory_limit])
+
+    t0 = time.time()
+    try:
+        stats = build_fts_index(conn)
+    finally:
+        conn.close()
+
+    print(
+        f"Indexed {stats['docs']} papers: {stats['terms']} terms, "
+        f"{stats['postings']} postings, avg {stats['avg_len']:.1f} tokens/doc "
+        f"({time.time() - t0:.1f}s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import argparse
+import time
+
+import duckdb
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+DB_PATH_DEFAULT = "../src/data.db"
+
+# Same blend /api/microtopics/graph used when it computed edges per request.
+JACCARD_WEIGHT = 0.3
+OVERLAP_WEIGHT = 0.7
+
+
+def compute_edges(topic_ids: np.ndarray, paper_ids: np.ndarray) -> pd.DataFrame:
+    """Overlap statistics for every pair of microtopics sharing a paper.
+
+    `topic_ids[i]` / `paper_ids[i]` are one (microtopic, paper) assignment.
+    With M the binary paper x microtopic incidence matrix, M.T @ M holds the
+    shared-paper counts off the diagonal and each topic's paper count on it,
+    so the whole matrix comes out of one sparse product. Only pairs with
+    a < b (string order) are returned.
+    """
+    if len(topic_ids) == 0:
+        return pd.DataFrame({
+            "a": pd.Series(dtype="string"), "b": pd.Series(dtype="string"),
+            "shared": pd.Series(dtype="int64"),
+            "jaccard": pd.Series(dtype="float64"), "weight": pd.Series(dtype="float64"),
+        })
+
+    topics, topic_idx = np.unique(topic_ids, return_inverse=True)
+    _, paper_idx = np.unique(paper_ids, return_inverse=True)
+
+    incidence = sparse.csr_matrix(
+        (np.ones(len(topic_idx), dtype=np.int32), (paper_idx, topic_idx)),
+        shape=(paper_idx.max() + 1, len(topics)),
+    )
+    # Duplicate assignments would sum to 2; papers are sets per topic.
+    incidence.data[:] = 1
+
+    overlap = (incidence.T @ incidence).tocoo()
+    sizes = overlap.diagonal().astype(np.int64)
+
+    upper = overlap.row < overlap.col
+    a = overlap.row[upper]
+    b = overlap.col[upper]
+    shared = overlap.data[upper].astype(np.int64)
+
+    size_a = sizes[a]
+    size_b = sizes[b]
+    jaccard = shared / (size_a + size_b - shared)
+    weight = jaccard * JACCARD_WEIGHT + (shared / np.maximum(size_a, size_b)) * OVERLAP_WEIGHT
+
+    return pd.DataFrame({
+        "a": topics[a],
+        "b": topics[b],
+        "shared": shared,
+        "jaccard": jaccard,
+        "weight": weight,
+    }).astype({"a": "string", "b": "string"})
+
+
+def build_microtopic_edges(conn: duckdb.DuckDBPyConnection) -> dict:
+    """(Re)build microtopic_edges from paper_microtopics.
+
+    Table written:
+      microtopic_edges(a, b, shared, jaccard, weight)
+        one row per unordered pair with at least one shared paper, a < b,
+        sorted by (a, b). weight = 0.3 * jaccard + 0.7 * shared / max size.
+
+    Run after process_cluster.py has (re)written paper_microtopics.
+    """
+    assignments = conn.execute(
+        "SELECT DISTINCT microtopic_id, paper_id FROM paper_microtopics"
+    ).fetchnumpy()
+    edges = compute_edges(
+        np.asarray(assignments["microtopic_id"], dtype=object),
+        np.asarray(assignments["paper_id"], dtype=object),
+    )
+
+    conn.execute("BEGIN TRANSACTION")
+    try:
+        conn.register("microtopic_edges_df", edges)
+        conn.execute(
+            """
+            CREATE OR REPLACE TABLE microtopic_edges AS
+            SELECT
+                a::VARCHAR AS a,
+                b::VARCHAR AS b,
+                shared::INTEGER AS shared,
+                jaccard::DOUBLE AS jaccard,
+                weight::DOUBLE AS weight
+            FROM microtopic_edges_df
+            ORDER BY a, b;
+            """
+        )
+        conn.unregister("microtopic_edges_df")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+    return {"edges": len(edges), "assignments": len(assignments["paper_id"])}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the microtopic co-occurrence edge table (microtopic_edges).")
+    parser.add_argument("--db", default=DB_PATH_DEFAULT)
+    args = parser.parse_args()
+
+    conn = duckdb.connect(args.db)
+    t0 = time.time()
+    try:
+        stats = build_microtopic_edges(conn)
+    finally:
+        conn.close()
+
+    print(f"Wrote {stats['edges']} microtopic edges from {stats['assignments']} assignments ({time.time() - t0:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+import argparse
+import time
+
+import duckdb
+
+
+DB_PATH_DEFAULT = "../src/data.db"
+
+TOP_AUTHORS_PER_TOPIC = 10
+
+STATS_TABLES = (
+    "microtopic_stats",
+    "microtopic_year_series",
+    "microtopic_citation_hist",
+    "microtopic_top_authors",
+)
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS microtopic_stats (
+        microtopic_id VARCHAR,
+        paper_count INTEGER,
+        total_citations BIGINT,
+        avg_citations DOUBLE,
+        median_citations DOUBLE,
+        max_citations BIGINT,
+        min_year INTEGER,
+        max_year INTEGER,
+        unique_author_count INTEGER
+    );
+    CREATE TABLE IF NOT EXISTS microtopic_year_series (
+        microtopic_id VARCHAR,
+        year VARCHAR,
+        count BIGINT,
+        total_citations BIGINT
+    );
+    CREATE TABLE IF NOT EXISTS microtopic_citation_hist (
+        microtopic_id VARCHAR,
+        citation_bucket VARCHAR,
+        count BIGINT
+    );
+    CREATE TABLE IF NOT EXISTS microtopic_top_authors (
+        microtopic_id VARCHAR,
+        rank INTEGER,
+        name VARCHAR,
+        paper_count BIGINT,
+        total_citations BIGINT
+    );
+"""
+
+# Non-deleted papers of the selected microtopics; {where} narrows the
+# microtopics (e.g. to one clustering bucket).
+_ASSIGNED_SQL = """
+    SELECT pm.microtopic_id, p.id, p.citation_count, p.authors, p.update_date
+    FROM papers p
+    INNER JOIN paper_microtopics pm ON p.id = pm.paper_id
+    WHERE (p.deleted = false OR p.deleted IS NULL)
+    {where}
+"""
+
+# Same buckets as the detail endpoint's citation_distribution; NULL counts
+# land in '0-10'.
+_CITATION_BUCKET_SQL = """
+    CASE
+        WHEN citation_count >= 100000 THEN '100k+'
+        WHEN citation_count >= 10000 THEN '10k-100k'
+        WHEN citation_count >= 1000 THEN '1k-10k'
+        WHEN citation_count >= 100 THEN '100-1k'
+        WHEN citation_count >= 10 THEN '10-100'
+        ELSE '0-10'
+    END
+"""
+
+
+def _insert_stats(conn: duckdb.DuckDBPyConnection, where: str = "", params: list | None = None) -> None:
+    params = params or []
+    conn.execute(
+        f"""
+        CREATE OR REPLACE TEMP TABLE microtopic_assigned AS
+        {_ASSIGNED_SQL.format(where=where)}
+        """,
+        params,
+    )
+    conn.execute(
+        """
+        CREATE OR REPLACE TEMP TABLE microtopic_papers AS
+        SELECT DISTINCT microtopic_id, id, citation_count, authors, strftime(update_date, '%Y') AS year
+        FROM microtopic_assigned
+        """
+    )
+    # Up to the first three comma-separated names of each paper, as the
+    # detail endpoint has always counted authors.
+    conn.execute(
+        """
+        CREATE OR REPLACE TEMP TABLE microtopic_author_slots AS
+        SELECT microtopic_id, trim(name) AS name, citation_count
+        FROM (
+            SELECT microtopic_id, citation_count, unnest(string_split(authors, ',')[1:3]) AS name
+            FROM microtopic_papers
+            WHERE authors IS NOT NULL AND authors != ''
+        )
+        WHERE trim(name) != ''
+        """
+    )
+
+    conn.execute(
+        """
+        INSERT INTO microtopic_stats
+        SELECT
+            a.microtopic_id,
+            COUNT(DISTINCT a.id)::INTEGER,
+            COALESCE(SUM(a.citation_count), 0)::BIGINT,
+            COALESCE(AVG(a.citation_count), 0)::DOUBLE,
+            COALESCE(MEDIAN(a.citation_count), 0)::DOUBLE,
+            COALESCE(MAX(a.citation_count), 0)::BIGINT,
+            MIN(CAST(strftime(a.update_date, '%Y') AS INTEGER)),
+            MAX(CAST(strftime(a.update_date, '%Y') AS INTEGER)),
+            COALESCE(ANY_VALUE(u.unique_author_count), 0)::INTEGER
+        FROM microtopic_assigned a
+        LEFT JOIN (
+            SELECT microtopic_id, COUNT(DISTINCT name) AS unique_author_count
+            FROM microtopic_author_slots
+            GROUP BY microtopic_id
+        ) u ON u.microtopic_id = a.microtopic_id
+        GROUP BY a.microtopic_id
+        ORDER BY a.microtopic_id
+        """
+    )
+    conn.execute(
+        """
+        INSERT INTO microtopic_year_series
+        SELECT microtopic_id, year, COUNT(*), COALESCE(SUM(citation_count), 0)::BIGINT
+        FROM microtopic_papers
+        WHERE year IS NOT NULL
+        GROUP BY microtopic_id, year
+        ORDER BY microtopic_id, year
+        """
+    )
+    conn.execute(
+        f"""
+        INSERT INTO microtopic_citation_hist
+        SELECT microtopic_id, {_CITATION_BUCKET_SQL} AS citation_bucket, COUNT(*)
+        FROM microtopic_papers
+        GROUP BY microtopic_id, citation_bucket
+        ORDER BY microtopic_id, citation_bucket
+        """
+    )
+    conn.execute(
+        f"""
+        INSERT INTO microtopic_top_authors
+        SELECT microtopic_id, rank, name, paper_count, total_citations
+        FROM (
+            SELECT
+                microtopic_id,
+                name,
+                COUNT(*) AS paper_count,
+                COALESCE(SUM(citation_count), 0)::BIGINT AS total_citations,
+                row_number() OVER (
+                    PARTITION BY microtopic_id ORDER BY COUNT(*) DESC, name
+                )::INTEGER AS rank
+            FROM microtopic_author_slots
+            GROUP BY microtopic_id, name
+        )
+        WHERE rank <= {TOP_AUTHORS_PER_TOPIC}
+        ORDER BY microtopic_id, rank
+        """
+    )
+
+    for table in ("microtopic_assigned", "microtopic_papers", "microtopic_author_slots"):
+        conn.execute(f"DROP TABLE {table}")
+
+
+def build_microtopic_stats(conn: duckdb.DuckDBPyConnection) -> dict:
+    """(Re)build the microtopic detail tables for every microtopic.
+
+    Tables written (all keyed and sorted by microtopic_id):
+      microtopic_stats(microtopic_id, paper_count, total_citations,
+                       avg_citations, median_citations, max_citations,
+                       min_year, max_year, unique_author_count)
+      microtopic_year_series(microtopic_id, year, count, total_citations)
+      microtopic_citation_hist(microtopic_id, citation_bucket, count)
+      microtopic_top_authors(microtopic_id, rank, name, paper_count,
+                             total_citations)      top 10 per microtopic
+
+    Only non-deleted papers are counted; a microtopic without any has no
+    rows. process_cluster.py refreshes a bucket's rows after writing it;
+    rerun this after papers are deleted or re-imported.
+    """
+    conn.execute("BEGIN TRANSACTION")
+    try:
+        for table in STATS_TABLES:
+            conn.execute(f"DROP TABLE IF EXISTS {table}")
+        conn.execute(_SCHEMA)
+        _insert_stats(conn)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+    topics = conn.execute("SELECT COUNT(*) FROM microtopic_stats").fetchone()[0]
+    authors = conn.execute("SELECT COUNT(*) FROM microtopic_top_authors").fetchone()[0]
+    return {"microtopics": topics, "top_authors": authors}
+
+
+def has_microtopic_stats(conn: duckdb.DuckDBPyConnection) -> bool:
+    found = conn.execute(
+        f"""
+        SELECT COUNT(*) FROM duckdb_tables()
+        WHERE table_name IN ({', '.join(['?'] * len(STATS_TABLES))})
+        """,
+        list(STATS_TABLES),
+    ).fetchone()[0]
+    return found == len(STATS_TABLES)
+
+
+def update_microtopic_stats(conn: duckdb.DuckDBPyConnection, bucket_column: str, bucket_value: str) -> bool:
+    """Recompute the detail tables for one clustering bucket.
+
+    Called by process_cluster.write_results once the bucket's microtopics
+    and assignments are written. Rows of microtopics that no longer exist
+    (e.g. a re-cluster produced fewer clusters) are dropped as well.
+
+    Does nothing (returns False) until a full build has created the
+    tables: tables holding one bucket would make the detail endpoint serve
+    every other microtopic from them with empty stats.
+
+    Runs inside the caller's transaction, if any.
+    """
+    if not has_microtopic_stats(conn):
+        return False
+    bucket_ids = """
+        SELECT microtopic_id FROM microtopics WHERE bucket_column = ? AND bucket_value = ?
+    """
+    for table in STATS_TABLES:
+        conn.execute(
+            f"""
+            DELETE FROM {table}
+            WHERE microtopic_id IN ({bucket_ids})
+               OR microtopic_id NOT IN (SELECT microtopic_id FROM microtopics)
+            """,
+            [bucket_column, bucket_value],
+        )
+    _insert_stats(conn, f"AND pm.microtopic_id IN ({bucket_ids})", [bucket_column, bucket_value])
+    return True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild the microtopic detail tables (microtopic_stats and side tables).")
+    parser.add_argument("--db", default=DB_PATH_DEFAULT)
+    args = parser.parse_args()
+
+    conn = duckdb.connect(args.db)
+    t0 = time.time()
+    try:
+        stats = build_microtopic_stats(conn)
+    finally:
+        conn.close()
+
+    print(f"Wrote stats for {stats['microtopics']} microtopics, {stats['top_authors']} top-author rows ({time.time() - t0:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
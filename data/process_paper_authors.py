@@ -0,0 +1,116 @@
+import argparse
+import time
+
+import duckdb
+
+
+DB_PATH_DEFAULT = "../src/data.db"
+
+# Lower-case, accent-free, punctuation-free, single-spaced. The API applies
+# the same folding to the `author` query parameter (src/filters.py).
+NORMALIZE_NAME_SQL = "trim(regexp_replace(lower(strip_accents({col})), '[^a-z0-9]+', ' ', 'g'))"
+
+
+def build_paper_authors(conn: duckdb.DuckDBPyConnection) -> dict:
+    """(Re)build paper_authors(paper_id, author_id, position, normalized_name)
+    and paper_author_tokens(token, paper_id, position).
+
+    One row per author slot on a paper, 1-based `position` in byline order.
+    `author_id` comes from papers.author_ids (ORCID / OpenAlex URLs) and the
+    name from authors_parsed, or the raw authors string when that is
+    missing. The two lists are lined up by position; when their lengths
+    differ the extra slots keep a NULL id or name. Deleted papers are left
+    out. Sorted by author_id so per-author lookups read few row groups.
+
+    paper_author_tokens holds each word of every normalized name, sorted by
+    token, so a name filter is an equality lookup that skips the row
+    groups of other words instead of a substring scan over every name.
+    """
+    normalized = NORMALIZE_NAME_SQL.format(col="n.name")
+
+    conn.execute("BEGIN TRANSACTION")
+    try:
+        conn.execute(
+            f"""
+            CREATE OR REPLACE TABLE paper_authors AS
+            WITH live AS (
+                SELECT id, author_ids, authors_parsed, authors
+                FROM papers
+                WHERE id IS NOT NULL AND deleted IS NOT TRUE
+            ),
+            ids AS (
+                SELECT
+                    id AS paper_id,
+                    unnest(author_ids) AS author_id,
+                    generate_subscripts(author_ids, 1) AS position
+                FROM live
+                WHERE author_ids IS NOT NULL
+            ),
+            name_lists AS (
+                SELECT
+                    id AS paper_id,
+                    CASE
+                        WHEN authors_parsed IS NOT NULL AND len(authors_parsed) > 0 THEN
+                            list_transform(authors_parsed, x -> trim(concat_ws(' ', x[2], x[1], x[3])))
+                        ELSE
+                            regexp_split_to_array(trim(authors), '\\s*,\\s*|\\s+and\\s+')
+                    END AS names
+                FROM live
+                WHERE authors_parsed IS NOT NULL OR authors IS NOT NULL
+            ),
+            names AS (
+                SELECT paper_id, unnest(names) AS name, generate_subscripts(names, 1) AS position
+                FROM name_lists
+            )
+            SELECT
+                COALESCE(i.paper_id, n.paper_id) AS paper_id,
+                i.author_id,
+                COALESCE(i.position, n.position)::SMALLINT AS position,
+                NULLIF({normalized}, '') AS normalized_name
+            FROM ids i
+            FULL OUTER JOIN names n
+              ON n.paper_id = i.paper_id AND n.position = i.position
+            WHERE i.author_id IS NOT NULL OR NULLIF({normalized}, '') IS NOT NULL
+            ORDER BY author_id, paper_id;
+            """
+        )
+        conn.execute(
+            """
+            CREATE OR REPLACE TABLE paper_author_tokens AS
+            SELECT DISTINCT unnest(string_split(normalized_name, ' ')) AS token, paper_id, position
+            FROM paper_authors
+            WHERE normalized_name IS NOT NULL
+            ORDER BY token, paper_id;
+            """
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+    rows, papers, authors = conn.execute(
+        "SELECT COUNT(*), COUNT(DISTINCT paper_id), COUNT(DISTINCT author_id) FROM paper_authors"
+    ).fetchone()
+    return {"rows": rows, "papers": papers, "authors": authors}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the paper_authors and paper_author_tokens author indexes.")
+    parser.add_argument("--db", default=DB_PATH_DEFAULT)
+    args = parser.parse_args()
+
+    conn = duckdb.connect(args.db)
+    t0 = time.time()
+    try:
+        stats = build_paper_authors(conn)
+    finally:
+        conn.close()
+
+    print(
+        f"Wrote {stats['rows']} author slots for {stats['papers']} papers, "
+        f"{stats['authors']} distinct author ids ({time.time() - t0:.1f}s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -11,7 +11,11 @@ from requests.adapters import HTTPAdapter
 from tqdm import tqdm
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+from process_doi_norm import ensure_doi_norm
+
 conn = duckdb.connect("../data.db")
+# Flushes join on papers.doi_norm through the normalize_doi() macro
+ensure_doi_norm(conn)
 
 # Get papers with empty citations from OpenAlex (arxiv papers)
 res = conn.execute("""
@@ -218,7 +222,7 @@ with tqdm(total=count) as pbar:
                     conn.executemany("INSERT INTO citation_updates VALUES (?, ?)", pending_rows)
                     conn.execute("""
                         UPDATE papers SET citations = u.citations
-                        FROM citation_updates u WHERE lower(papers.doi) = u.doi_lc;
+                        FROM citation_updates u WHERE papers.doi_norm = normalize_doi(u.doi_lc);
                     """)
                     conn.execute("DELETE FROM citation_updates")
                     conn.commit()
@@ -234,7 +238,7 @@ with tqdm(total=count) as pbar:
         conn.executemany("INSERT INTO citation_updates VALUES (?, ?)", pending_rows)
         conn.execute("""
             UPDATE papers SET citations = u.citations
-            FROM citation_updates u WHERE lower(papers.doi) = u.doi_lc;
+            FROM citation_updates u WHERE papers.doi_norm = normalize_doi(u.doi_lc);
         """)
         conn.commit()
 
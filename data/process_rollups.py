@@ -0,0 +1,98 @@
+import argparse
+import time
+
+import duckdb
+
+
+DB_PATH_DEFAULT = "../src/data.db"
+
+# Same ranges as /api/analytics/citations/distribution. A NULL citation
+# count falls through to the ELSE branch there too.
+CITATION_BUCKET_SQL = """
+    CASE
+        WHEN citation_count = 0 THEN '0'
+        WHEN citation_count BETWEEN 1 AND 5 THEN '1-5'
+        WHEN citation_count BETWEEN 6 AND 10 THEN '6-10'
+        WHEN citation_count BETWEEN 11 AND 25 THEN '11-25'
+        WHEN citation_count BETWEEN 26 AND 50 THEN '26-50'
+        WHEN citation_count BETWEEN 51 AND 100 THEN '51-100'
+        WHEN citation_count BETWEEN 101 AND 500 THEN '101-500'
+        WHEN citation_count BETWEEN 501 AND 1000 THEN '501-1000'
+        WHEN citation_count BETWEEN 1001 AND 5000 THEN '1001-5000'
+        WHEN citation_count BETWEEN 5001 AND 10000 THEN '5001-10000'
+        ELSE '10000+'
+    END
+"""
+
+
+def build_rollups(conn: duckdb.DuckDBPyConnection) -> dict:
+    """(Re)build analytics_rollup from the non-deleted papers.
+
+    One row per (year, month, domain, topic, primary_category,
+    citation_bucket) cell with:
+      paper_count       COUNT(*)
+      citation_sum      SUM(citation_count), same type as the live query
+      citation_n        COUNT(citation_count), for averages
+      min_citation      MIN(citation_count), to order buckets
+
+    year / month are the strftime strings the live queries group by
+    ('%Y' / '%Y-%m'), NULL when update_date is NULL. Run after every data
+    DB refresh; the API serves the analytics endpoints from this table.
+    """
+    conn.execute("BEGIN TRANSACTION")
+    try:
+        conn.execute(
+            f"""
+            CREATE OR REPLACE TABLE analytics_rollup AS
+            SELECT
+                strftime(update_date, '%Y') AS year,
+                strftime(update_date, '%Y-%m') AS month,
+                primary_domain_name AS domain,
+                primary_topic_name AS topic,
+                NULLIF(split_part(trim(categories), ' ', 1), '') AS primary_category,
+                {CITATION_BUCKET_SQL} AS citation_bucket,
+                COUNT(*) AS paper_count,
+                SUM(citation_count) AS citation_sum,
+                COUNT(citation_count) AS citation_n,
+                MIN(citation_count) AS min_citation
+            FROM papers
+            WHERE deleted = false OR deleted IS NULL
+            GROUP BY ALL
+            ORDER BY year, month, domain, topic;
+            """
+        )
+        conn.execute(
+            """
+            CREATE OR REPLACE TABLE analytics_rollup_meta AS
+            SELECT now()::TIMESTAMP AS built_at, SUM(paper_count)::BIGINT AS paper_count
+            FROM analytics_rollup;
+            """
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+    cells, papers = conn.execute(
+        "SELECT (SELECT COUNT(*) FROM analytics_rollup), paper_count FROM analytics_rollup_meta"
+    ).fetchone()
+    return {"cells": cells, "papers": papers}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild the analytics rollup cube (run after each data DB refresh).")
+    parser.add_argument("--db", default=DB_PATH_DEFAULT)
+    args = parser.parse_args()
+
+    conn = duckdb.connect(args.db)
+    t0 = time.time()
+    try:
+        stats = build_rollups(conn)
+    finally:
+        conn.close()
+
+    print(f"Rolled {stats['papers']} papers into {stats['cells']} cells ({time.time() - t0:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import argparse
+import time
+
+import duckdb
+
+
+DB_PATH_DEFAULT = "../src/data.db"
+
+OPENALEX_PREFIX = "https://openalex.org/"
+
+
+def build_topic_citations(conn: duckdb.DuckDBPyConnection) -> dict:
+    """(Re)build the microtopic -> microtopic citation matrix.
+
+    Table written:
+      microtopic_citations(citing_topic, cited_topic, citations)
+        sparse: one row per ordered topic pair with at least one citation,
+        sorted by (citing_topic, cited_topic). `citations` counts distinct
+        (citing paper, cited paper) edges; a pair of papers sharing both
+        topics counts on the diagonal.
+
+    Entries of papers.citations are resolved to papers by arXiv id,
+    OpenAlex work id (stored without the https://openalex.org/ prefix by
+    process_citations.py) or DOI, all compared case-insensitively. Deleted
+    papers are skipped on both ends.
+    Run after process_cluster.py and process_citations.py.
+    """
+    conn.execute("BEGIN TRANSACTION")
+    try:
+        conn.execute(
+            """
+            CREATE OR REPLACE TEMP TABLE topic_citation_keys AS
+            SELECT DISTINCT key, paper_id FROM (
+                SELECT lower(id) AS key, id AS paper_id FROM papers
+                WHERE deleted IS NOT TRUE
+                UNION ALL
+                SELECT lower(replace(oa_work_id, ?, '')) AS key, id AS paper_id FROM papers
+                WHERE deleted IS NOT TRUE
+                UNION ALL
+                SELECT lower(doi) AS key, id AS paper_id FROM papers
+                WHERE deleted IS NOT TRUE
+            )
+            WHERE key IS NOT NULL AND paper_id IS NOT NULL;
+            """,
+            [OPENALEX_PREFIX],
+        )
+        conn.execute(
+            """
+            CREATE OR REPLACE TEMP TABLE topic_citation_edges AS
+            SELECT DISTINCT c.citing_id, k.paper_id AS cited_id
+            FROM (
+                SELECT id AS citing_id, unnest(citations) AS cited_key
+                FROM papers
+                WHERE id IS NOT NULL
+                  AND deleted IS NOT TRUE
+                  AND citations IS NOT NULL
+            ) c
+            INNER JOIN topic_citation_keys k
+                ON k.key = lower(c.cited_key);
+            """
+        )
+        conn.execute(
+            """
+            CREATE OR REPLACE TABLE microtopic_citations AS
+            SELECT
+                citing.microtopic_id AS citing_topic,
+                cited.microtopic_id AS cited_topic,
+                COUNT(DISTINCT (e.citing_id, e.cited_id))::BIGINT AS citations
+            FROM topic_citation_edges e
+            INNER JOIN paper_microtopics citing ON citing.paper_id = e.citing_id
+            INNER JOIN paper_microtopics cited ON cited.paper_id = e.cited_id
+            GROUP BY citing_topic, cited_topic
+            ORDER BY citing_topic, cited_topic;
+            """
+        )
+        conn.execute("DROP TABLE topic_citation_keys")
+        conn.execute("DROP TABLE topic_citation_edges")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+    pairs, citations = conn.execute(
+        "SELECT COUNT(*), COALESCE(SUM(citations), 0)::BIGINT FROM microtopic_citations"
+    ).fetchone()
+    return {"pairs": pairs, "citations": citations}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the microtopic cross-citation matrix (microtopic_citations).")
+    parser.add_argument("--db", default=DB_PATH_DEFAULT)
+    args = parser.parse_args()
+
+    conn = duckdb.connect(args.db)
+    t0 = time.time()
+    try:
+        stats = build_topic_citations(conn)
+    finally:
+        conn.close()
+
+    print(f"Wrote {stats['pairs']} topic pairs covering {stats['citations']} citations ({time.time() - t0:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
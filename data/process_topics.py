@@ -11,6 +11,8 @@ import requests
 from requests.adapters import HTTPAdapter
 from tqdm import tqdm
 
+from process_doi_norm import ensure_doi_norm
+
 
 DB_PATH_DEFAULT = "../src/data.db"
 WORKS_URL = "https://api.openalex.org/works"
@@ -217,7 +219,7 @@ def flush_rows(conn: duckdb.DuckDBPyConnection, rows: list[tuple]) -> None:
             topics_fetched = u.topics_fetched,
             topics_updated_at = u.topics_updated_at
         FROM topic_updates AS u
-        WHERE lower(p.doi) = u.doi_lc;
+        WHERE p.doi_norm = u.doi_lc;
         """
     )
     conn.execute("DELETE FROM topic_updates")
@@ -236,16 +238,15 @@ def select_target_dois(conn: duckdb.DuckDBPyConnection, *, force: bool) -> list[
     where_extra = "" if force else "AND topics_fetched IS NULL"
     rows = conn.execute(
         f"""
-        SELECT DISTINCT lower(doi) AS doi_lc
+        SELECT DISTINCT doi_norm
         FROM papers
         WHERE deleted IS NOT TRUE
-          AND doi IS NOT NULL
-          AND trim(doi) <> ''
+          AND doi_norm IS NOT NULL
           {where_extra}
-        ORDER BY doi_lc;
+        ORDER BY doi_norm;
         """
     ).fetchall()
-    return [normalize_doi(r[0]) for r in rows if normalize_doi(r[0])]
+    return [r[0] for r in rows]
 
 
 def run_demo(dois: list[str], *, mailto: str, max_rps: float) -> None:
@@ -277,6 +278,8 @@ def main() -> None:
 
     conn = duckdb.connect(args.db)
     ensure_columns(conn)
+    # Update rows carry normalize_doi() keys, matched against papers.doi_norm
+    ensure_doi_norm(conn)
     conn.execute(
         """
         CREATE TEMP TABLE IF NOT EXISTS topic_updates (
@@ -2,10 +2,22 @@
 Firebase Authentication Middleware
 
 Provides @require_auth decorator to protect Flask routes with Firebase ID token verification.
+
+Verified tokens and firebase_uid -> user rows are cached in-process, so a
+burst of authenticated calls from one page verifies the token and reads
+the users table once. User rows are only kept for AUTH_USER_CACHE_TTL
+seconds: forget_user() can only clear the worker it runs in, so that is how
+long other workers may keep serving an account that was changed or
+deleted. Google's signing keys are cached by firebase_admin's certificate
+session, which honours the Cache-Control max-age of the keys.
 """
 
+import hashlib
 import logging
 import os
+import threading
+import time
+from collections import OrderedDict
 from functools import wraps
 from flask import request, jsonify, g
 import firebase_admin
@@ -24,6 +36,115 @@ else:
     except Exception as e:
         logger.error("Error initializing Firebase Admin SDK: %s", e)
 
+TOKEN_CACHE_SIZE = int(os.getenv('AUTH_TOKEN_CACHE_SIZE', '4096'))
+USER_CACHE_SIZE = int(os.getenv('AUTH_USER_CACHE_SIZE', '4096'))
+USER_CACHE_TTL = float(os.getenv('AUTH_USER_CACHE_TTL', '30'))
+
+
+class LRUCache:
+    """Small thread-safe LRU with an optional expiry time per entry."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[0] is None or entry[0] > time.time()):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, value, expires_at: float | None = None) -> None:
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, key) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def discard_where(self, predicate) -> int:
+        """Drop every entry whose value matches ``predicate``; returns the count."""
+        with self._lock:
+            keys = [key for key, (_, value) in self._entries.items() if predicate(value)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "maxsize": self.maxsize,
+                    "hits": self.hits, "misses": self.misses}
+
+
+# sha256(token) -> decoded claims, until the token's `exp`
+verified_tokens = LRUCache(TOKEN_CACHE_SIZE)
+# firebase_uid -> (id, username, email) for USER_CACHE_TTL seconds; only
+# users that exist are cached
+users_by_uid = LRUCache(USER_CACHE_SIZE)
+
+
+def _token_key(id_token: str) -> str:
+    return hashlib.sha256(id_token.encode()).hexdigest()
+
+
+def verify_token(id_token: str) -> dict:
+    """``auth.verify_id_token`` with the result cached until the token expires."""
+    key = _token_key(id_token)
+    claims = verified_tokens.get(key)
+    if claims is None:
+        claims = auth.verify_id_token(id_token)
+        verified_tokens.set(key, claims, expires_at=claims.get('exp'))
+    return claims
+
+
+def lookup_user(firebase_uid: str):
+    """(id, username, email) of the user with ``firebase_uid``, or None."""
+    user = users_by_uid.get(firebase_uid)
+    if user is None:
+        from src.database import get_user_db
+        user = get_user_db().execute(
+            "SELECT id, username, email FROM users WHERE firebase_uid = ?",
+            [firebase_uid]
+        ).fetchone()
+        if user:
+            users_by_uid.set(firebase_uid, tuple(user), expires_at=time.time() + USER_CACHE_TTL)
+    return user
+
+
+def forget_user(firebase_uid: str = None, user_id: int = None) -> None:
+    """Drop cached auth state after a user row is linked, changed or deleted.
+
+    With a ``firebase_uid`` its verified tokens are dropped as well, so a
+    deleted account cannot keep using a token it was issued earlier. This
+    only reaches the current worker; the others notice once their cached
+    row expires and the users table no longer has it.
+    """
+    if firebase_uid:
+        users_by_uid.discard(firebase_uid)
+        verified_tokens.discard_where(lambda claims: claims.get('uid') == firebase_uid)
+    if user_id is not None:
+        users_by_uid.discard_where(lambda user: user[0] == user_id)
+
+
+def auth_cache_stats() -> dict:
+    return {"tokens": verified_tokens.stats(), "users": users_by_uid.stats()}
+
 
 def require_auth(f):
     """
@@ -51,18 +172,13 @@ def require_auth(f):
         id_token = auth_header.split('Bearer ')[1].strip()
 
         try:
-            # Verify the ID token with Firebase
-            decoded_token = auth.verify_id_token(id_token)
+            # Verify the ID token with Firebase (cached until it expires)
+            decoded_token = verify_token(id_token)
             g.firebase_uid = decoded_token['uid']
             g.firebase_email = decoded_token.get('email')
 
             # Look up user in DuckDB by Firebase UID
-            from src.database import get_user_db
-            user_db = get_user_db()
-            user = user_db.execute(
-                "SELECT id, username, email FROM users WHERE firebase_uid = ?",
-                [g.firebase_uid]
-            ).fetchone()
+            user = lookup_user(g.firebase_uid)
 
             if not user:
                 return jsonify({'error': 'User not found in database'}), 404
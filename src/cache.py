@@ -2,7 +2,271 @@
 Caching configuration for the application.
 Separated to avoid circular imports.
 """
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import time
+import uuid
+from functools import wraps
+
+from flask import copy_current_request_context, current_app, g, request
 from flask_caching import Cache
 
+from src.database import data_db_manager
+
+logger = logging.getLogger(__name__)
+
 # Initialize cache instance (will be configured by app)
-cache = Cache()
\ No newline at end of file
+cache = Cache()
+
+
+def _query_digest() -> str:
+    args = str(tuple(sorted(request.args.items(multi=True)))).encode()
+    return hashlib.md5(args).hexdigest()
+
+
+def data_cache_key(*args, **kwargs) -> str:
+    """``make_cache_key`` for views over the data DB.
+
+    Path plus order-independent query string (like ``query_string=True``),
+    prefixed with the data DB version so a swapped snapshot never serves
+    responses computed from the previous one.
+    """
+    return f"view/{data_db_manager.version}{request.path}?{_query_digest()}"
+
+
+class UserCacheNamespaces:
+    """Per-user cache keys that can be invalidated without cache.clear().
+
+    Every user-scoped key embeds that user's generation token, kept in the
+    cache itself under ``user-gen/<user_id>``. Invalidating a user replaces
+    the token, so no later lookup can reach the old entries. The keys this
+    process handed out are also remembered per user and deleted right
+    away, which frees the memory and gives the count reported in
+    ``stats()``.
+
+    A token that disappears from the cache (eviction, restart) is simply
+    replaced by a fresh one, which costs a miss but can never resurrect an
+    old entry.
+    """
+
+    def __init__(self, cache: Cache):
+        self._cache = cache
+        self._lock = threading.Lock()
+        self._keys: dict[int, set[str]] = {}
+        self._invalidations = 0
+        self._entries_dropped = 0
+        self._last_dropped = 0
+
+    def _generation(self, user_id: int) -> str:
+        gen_key = f"user-gen/{user_id}"
+        generation = self._cache.get(gen_key)
+        if generation is None:
+            generation = uuid.uuid4().hex
+            self._cache.set(gen_key, generation, timeout=0)
+        return generation
+
+    def make_cache_key(self, user_id: int, **kwargs) -> str:
+        """``make_cache_key`` for ``@cache.cached`` on ``/<int:user_id>/`` views.
+
+        Same inputs as ``query_string=True`` (path plus sorted query args),
+        scoped to the user's current generation and the data DB version. The
+        authenticated caller is part of the key too, so a 403 served to
+        someone else is never replayed to the owner.
+        """
+        digest = _query_digest()
+        caller = g.get("user_id")
+        version = data_db_manager.version
+        with self._lock:
+            key = f"user/{user_id}/{self._generation(user_id)}/{version}{request.path}?{digest}/{caller}"
+            self._keys.setdefault(user_id, set()).add(key)
+        return key
+
+    def invalidate(self, user_id: int) -> int:
+        """Drop every cached entry of ``user_id``; returns how many were dropped."""
+        with self._lock:
+            self._cache.set(f"user-gen/{user_id}", uuid.uuid4().hex, timeout=0)
+            # One delete per key: delete_many() stops at the first key that
+            # has already expired.
+            dropped = sum(1 for key in self._keys.pop(user_id, ()) if self._cache.delete(key))
+            self._invalidations += 1
+            self._entries_dropped += dropped
+            self._last_dropped = dropped
+        logger.debug("Invalidated cache for user %s: %d entries dropped", user_id, dropped)
+        return dropped
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "invalidations": self._invalidations,
+                "entries_dropped": self._entries_dropped,
+                "last_dropped": self._last_dropped,
+                "tracked_users": len(self._keys),
+            }
+
+
+user_caches = UserCacheNamespaces(cache)
+
+
+class _Flight:
+    """One in-progress computation that identical requests wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.response_blob: bytes | None = None
+
+
+class SingleFlightCache:
+    """Response cache where concurrent misses for one key run the view once.
+
+    ``cached()`` replaces ``@cache.cached(query_string=True)`` on expensive
+    views. On a miss the first request computes the response; identical
+    requests in the same process wait for it instead of running the same
+    DuckDB query in parallel. Across processes, a short ``cache.add()``
+    lock lets one worker compute while the others poll the shared cache.
+
+    With ``stale_ttl`` > 0 an entry stays servable for that many seconds
+    after it goes stale: the stale response is returned immediately and
+    one background refresh recomputes it (stale-while-revalidate).
+
+    Only 200 responses are stored. Waiters get their own unpickled copy
+    so after_request hooks (compression) never touch a shared object.
+    """
+
+    wait_timeout = 30.0
+    poll_interval = 0.05
+
+    def __init__(self, cache: Cache):
+        self._cache = cache
+        self._lock = threading.Lock()
+        self._flights: dict[str, _Flight] = {}
+        self._counts = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "stale_served": 0,
+            "background_refreshes": 0,
+        }
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counts[name] += 1
+
+    @staticmethod
+    def make_cache_key() -> str:
+        """Data DB version, path and order-independent query string."""
+        return f"flight/{data_db_manager.version}{request.path}?{_query_digest()}"
+
+    def cached(self, timeout: int = 300, stale_ttl: int = 0, unless=None):
+        def decorator(f):
+            @wraps(f)
+            def decorated_function(*args, **kwargs):
+                if unless is not None and unless():
+                    return f(*args, **kwargs)
+
+                key = self.make_cache_key()
+                entry = self._cache.get(key)
+                if entry is not None:
+                    fresh_until, response = entry
+                    if time.time() < fresh_until:
+                        self._count("hits")
+                        return response
+                    if stale_ttl > 0:
+                        self._count("stale_served")
+                        self._refresh_in_background(key, f, args, kwargs, timeout, stale_ttl)
+                        return response
+
+                self._count("misses")
+                return self._compute(key, f, args, kwargs, timeout, stale_ttl)
+
+            return decorated_function
+
+        return decorator
+
+    def _store(self, key, response, timeout: int, stale_ttl: int) -> bytes | None:
+        if response.status_code != 200:
+            return None
+        self._cache.set(key, (time.time() + timeout, response), timeout=timeout + stale_ttl)
+        return pickle.dumps(response, pickle.HIGHEST_PROTOCOL)
+
+    def _wait_for_other_process(self, key):
+        """Poll the shared cache while another worker holds the compute lock."""
+        deadline = time.time() + self.wait_timeout
+        while time.time() < deadline:
+            time.sleep(self.poll_interval)
+            entry = self._cache.get(key)
+            if entry is not None and time.time() < entry[0]:
+                return entry[1]
+            if not self._cache.has(f"{key}/lock"):
+                break
+        return None
+
+    def _compute(self, key, f, args, kwargs, timeout: int, stale_ttl: int):
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            self._count("coalesced")
+            flight.done.wait(self.wait_timeout)
+            if flight.response_blob is not None:
+                return pickle.loads(flight.response_blob)
+            # The leader failed or produced an uncacheable response.
+            return f(*args, **kwargs)
+
+        lock_key = f"{key}/lock"
+        holds_lock = self._cache.add(lock_key, os.getpid(), timeout=int(self.wait_timeout))
+        try:
+            if not holds_lock:
+                response = self._wait_for_other_process(key)
+                if response is not None:
+                    flight.response_blob = pickle.dumps(response, pickle.HIGHEST_PROTOCOL)
+                    return response
+            response = current_app.make_response(f(*args, **kwargs))
+            flight.response_blob = self._store(key, response, timeout, stale_ttl)
+            return response
+        finally:
+            if holds_lock:
+                self._cache.delete(lock_key)
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def _refresh_in_background(self, key, f, args, kwargs, timeout: int, stale_ttl: int) -> None:
+        with self._lock:
+            if key in self._flights:
+                return
+            flight = self._flights[key] = _Flight()
+        if not self._cache.add(f"{key}/lock", os.getpid(), timeout=int(self.wait_timeout)):
+            # Another worker is already refreshing this key.
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+            return
+
+        @copy_current_request_context
+        def refresh():
+            try:
+                response = current_app.make_response(f(*args, **kwargs))
+                flight.response_blob = self._store(key, response, timeout, stale_ttl)
+                self._count("background_refreshes")
+            except Exception:
+                logger.exception("Background refresh of %s failed", key)
+            finally:
+                self._cache.delete(f"{key}/lock")
+                with self._lock:
+                    self._flights.pop(key, None)
+                flight.done.set()
+
+        threading.Thread(target=refresh, name=f"cache-refresh{request.path}", daemon=True).start()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._counts, in_flight=len(self._flights))
+
+
+single_flight = SingleFlightCache(cache)
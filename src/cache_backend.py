@@ -0,0 +1,240 @@
+"""
+SQLite-backed Flask-Caching backend shared by every gunicorn worker.
+
+SimpleCache lives inside one process, so with ``--workers N`` each worker
+would keep its own cold copy of the graph / hot-papers responses. This
+backend keeps entries in one SQLite file (WAL mode, memory-mapped reads)
+that all forked workers open, with per-entry TTLs and a size bound
+enforced by evicting the least recently used entries. Entry count and total
+size are kept in a one-row ``cache_totals`` table by triggers, so a write
+only scans the entries when it pushes the cache past a bound.
+
+Configured through ``cache.init_app`` in src/main.py:
+
+    CACHE_TYPE          'src.cache_backend.SQLiteCache'
+    CACHE_SQLITE_PATH   database file (default: <tmp>/researchviewer-cache.sqlite3)
+    CACHE_MAX_BYTES     total pickled size to keep (default: 256 MiB)
+    CACHE_THRESHOLD     maximum number of entries (default: 10000)
+"""
+
+import logging
+import os
+import pickle
+import sqlite3
+import tempfile
+import threading
+import time
+
+from flask_caching.backends.base import BaseCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = os.path.join(tempfile.gettempdir(), "researchviewer-cache.sqlite3")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_THRESHOLD = 10000
+
+# Reads only refresh `accessed` when it is older than this, so a hot key
+# does not turn every hit into a write.
+_TOUCH_GRANULARITY = 1.0
+
+
+class SQLiteCache(BaseCache):
+    """Cache entries in a SQLite file: TTL per entry, LRU eviction by size.
+
+    Connections are per thread and per process (a forked worker never
+    reuses its parent's handle). ``expires`` is an absolute UNIX time, 0
+    for entries that never expire; expired rows are ignored on read and
+    removed when space is reclaimed.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_PATH,
+        default_timeout: int = 300,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        threshold: int = DEFAULT_THRESHOLD,
+    ):
+        super().__init__(default_timeout=default_timeout)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.threshold = threshold
+        self._local = threading.local()
+        self.evictions = 0
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    expires REAL NOT NULL,
+                    accessed REAL NOT NULL,
+                    size INTEGER NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_entries_accessed ON cache_entries(accessed)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache_totals (
+                    id INTEGER PRIMARY KEY CHECK (id = 0),
+                    entries INTEGER NOT NULL,
+                    bytes INTEGER NOT NULL
+                )
+            """)
+            # Seeds the totals for a cache file written before they existed.
+            conn.execute("""
+                INSERT OR IGNORE INTO cache_totals
+                SELECT 0, COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries
+            """)
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS cache_entries_insert AFTER INSERT ON cache_entries
+                BEGIN
+                    UPDATE cache_totals SET entries = entries + 1, bytes = bytes + NEW.size;
+                END
+            """)
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS cache_entries_delete AFTER DELETE ON cache_entries
+                BEGIN
+                    UPDATE cache_totals SET entries = entries - 1, bytes = bytes - OLD.size;
+                END
+            """)
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS cache_entries_resize AFTER UPDATE OF size ON cache_entries
+                BEGIN
+                    UPDATE cache_totals SET bytes = bytes - OLD.size + NEW.size;
+                END
+            """)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        kwargs.update(
+            path=config.get("CACHE_SQLITE_PATH", DEFAULT_PATH),
+            max_bytes=config.get("CACHE_MAX_BYTES", DEFAULT_MAX_BYTES),
+            threshold=config.get("CACHE_THRESHOLD") or DEFAULT_THRESHOLD,
+        )
+        return cls(*args, **kwargs)
+
+    # -- connection handling ------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA mmap_size=268435456")
+        # INSERT OR REPLACE only fires the delete trigger for the row it
+        # replaces with this on; cache_totals would drift without it.
+        conn.execute("PRAGMA recursive_triggers=ON")
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def _expires_at(self, timeout: int | None) -> float:
+        timeout = self._normalize_timeout(timeout)
+        return time.time() + timeout if timeout > 0 else 0.0
+
+    # -- cachelib API -------------------------------------------------------
+
+    def get(self, key):
+        now = time.time()
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT value, expires, accessed FROM cache_entries WHERE key = ?", [key]
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires, accessed = row
+        if expires and expires <= now:
+            return None
+        if now - accessed > _TOUCH_GRANULARITY:
+            conn.execute("UPDATE cache_entries SET accessed = ? WHERE key = ?", [now, key])
+        try:
+            return pickle.loads(value)
+        except Exception:
+            logger.warning("Dropping unreadable cache entry %r", key)
+            self.delete(key)
+            return None
+
+    def _write(self, key, value, timeout, replace: bool) -> bool:
+        blob = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        now = time.time()
+        verb = "INSERT OR REPLACE" if replace else "INSERT OR IGNORE"
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if not replace:
+                # An expired entry does not block add().
+                conn.execute(
+                    "DELETE FROM cache_entries WHERE key = ? AND expires > 0 AND expires <= ?", [key, now]
+                )
+            cursor = conn.execute(
+                f"{verb} INTO cache_entries (key, value, expires, accessed, size) VALUES (?, ?, ?, ?, ?)",
+                [key, blob, self._expires_at(timeout), now, len(blob)],
+            )
+            written = cursor.rowcount > 0
+            if written:
+                self._evict(conn, now)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return written
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        """Drop expired rows, then least recently used ones until within bounds."""
+        count, total = self._totals(conn)
+        if count <= self.threshold and total <= self.max_bytes:
+            return
+        removed = conn.execute(
+            "DELETE FROM cache_entries WHERE expires > 0 AND expires <= ?", [now]
+        ).rowcount
+        count, total = self._totals(conn)
+        while count > self.threshold or total > self.max_bytes:
+            victim = conn.execute("SELECT key, size FROM cache_entries ORDER BY accessed LIMIT 1").fetchone()
+            if victim is None:
+                break
+            conn.execute("DELETE FROM cache_entries WHERE key = ?", [victim[0]])
+            count -= 1
+            total -= victim[1]
+            removed += 1
+        self.evictions += removed
+
+    @staticmethod
+    def _totals(conn: sqlite3.Connection) -> tuple[int, int]:
+        """(entries, bytes) as kept by the cache_totals triggers."""
+        return conn.execute("SELECT entries, bytes FROM cache_totals").fetchone()
+
+    def set(self, key, value, timeout=None):
+        return self._write(key, value, timeout, replace=True)
+
+    def add(self, key, value, timeout=None):
+        return self._write(key, value, timeout, replace=False)
+
+    def delete(self, key):
+        return self._connect().execute("DELETE FROM cache_entries WHERE key = ?", [key]).rowcount > 0
+
+    def has(self, key):
+        row = self._connect().execute(
+            "SELECT expires FROM cache_entries WHERE key = ?", [key]
+        ).fetchone()
+        return row is not None and (not row[0] or row[0] > time.time())
+
+    def clear(self):
+        self._connect().execute("DELETE FROM cache_entries")
+        return True
+
+    def stats(self) -> dict:
+        count, total = self._totals(self._connect())
+        return {
+            "backend": "sqlite",
+            "entries": count,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "threshold": self.threshold,
+            "evictions": self.evictions,
+        }
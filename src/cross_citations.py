@@ -0,0 +1,43 @@
+"""Lookups on the microtopic cross-citation matrix.
+
+`microtopic_citations(citing_topic, cited_topic, citations)` is built by
+data/process_topic_citations.py. Without it every count here is 0, which
+is what the endpoints reported before the matrix existed.
+"""
+
+from src.database import has_data_table
+
+
+def cross_citation_count(db, topic_a: str, topic_b: str) -> int:
+    """Citations between two microtopics, in both directions."""
+    if topic_a == topic_b or not has_data_table("microtopic_citations"):
+        return 0
+    return db.execute("""
+        SELECT COALESCE(SUM(citations), 0)::BIGINT
+        FROM microtopic_citations
+        WHERE (citing_topic = ? AND cited_topic = ?)
+        OR (citing_topic = ? AND cited_topic = ?)
+    """, [topic_a, topic_b, topic_b, topic_a]).fetchone()[0]
+
+
+def cross_citation_counts(db, topic_ids: list) -> dict[frozenset, int]:
+    """Citations in both directions for every pair of `topic_ids` that has any.
+
+    Keyed by `frozenset({a, b})`; pairs without citations are left out.
+    """
+    if len(topic_ids) < 2 or not has_data_table("microtopic_citations"):
+        return {}
+    placeholders = ','.join(['?'] * len(topic_ids))
+    rows = db.execute(f"""
+        SELECT citing_topic, cited_topic, citations
+        FROM microtopic_citations
+        WHERE citing_topic IN ({placeholders})
+        AND cited_topic IN ({placeholders})
+        AND citing_topic != cited_topic
+    """, [*topic_ids, *topic_ids]).fetchall()
+
+    counts: dict[frozenset, int] = {}
+    for citing, cited, citations in rows:
+        pair = frozenset((citing, cited))
+        counts[pair] = counts.get(pair, 0) + citations
+    return counts
@@ -3,15 +3,43 @@
 Dual database architecture:
 - User DB: Read/write database for user data (users, reading lists, etc.)
 - Data DB: Read-only database for research papers and microtopics
+
+The data DB is opened once per process by ``data_db_manager``; requests get
+a cursor on that shared connection. The user DB is still opened per request.
+A new data DB snapshot can be swapped in without a restart (``swap``).
+
+When the two are separate files, the shared connection is opened on the
+user DB and the data DB is ATTACHed to it (read-only), so data cursors can
+join user tables in SQL (``user_table``). DuckDB lets a process open a file
+in only one database instance; per-request ``get_user_db()`` connections
+land on that same instance.
 """
 
+import hashlib
+import itertools
+import logging
 import os
-from typing import Any
+import threading
+import time
+from typing import Any, Callable
 
 import duckdb
 import numpy as np
 import pandas as pd
-from flask import g, has_app_context
+from flask import current_app, g, has_app_context, has_request_context, jsonify, request
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+
+    PYARROW_AVAILABLE = True
+except ImportError:
+    pa = None
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+ARROW_STREAM_MIMETYPE = "application/vnd.apache.arrow.stream"
 
 # User database - read/write (users, reading lists, publications, read history)
 USER_DB_PATH = os.getenv(
@@ -26,6 +54,356 @@ DATA_DB_PATH = os.getenv(
 )
 
 
+# Upper bound on cursors handed out at once. Each in-flight request holds at
+# most one, so this only bites if something leaks or threads are raised.
+DATA_DB_MAX_CURSORS = int(os.getenv("DATA_DB_MAX_CURSORS", "16"))
+DATA_DB_ACQUIRE_TIMEOUT = float(os.getenv("DATA_DB_ACQUIRE_TIMEOUT", "30"))
+DATA_DB_HEALTH_INTERVAL = float(os.getenv("DATA_DB_HEALTH_INTERVAL", "30"))
+# Seconds between checks of DATA_DB_PATH for a replaced file; 0 disables.
+DATA_DB_WATCH_INTERVAL = float(os.getenv("DATA_DB_WATCH_INTERVAL", "0"))
+
+
+class DataDBUnavailable(RuntimeError):
+    """Raised when no data DB cursor can be handed out."""
+
+
+class DataDBManager:
+    """Process-wide owner of the data database connection.
+
+    The data DB is opened once per process and every request gets its own
+    ``cursor()`` on that connection. Cursors share the catalog and buffer
+    pool, so warm pages survive between requests instead of being thrown
+    away with a per-request connection.
+
+    With ``user_db_path`` the connection is opened on the user DB and each
+    data snapshot is attached under its own catalog alias (``data_1``,
+    ``data_2``, ...), which cursors ``USE``; ``user_catalog`` names the
+    user DB for cross-database joins.
+
+    Without it, a read-only snapshot is attached the same way to a private
+    in-memory connection. DuckDB hands out one cached instance per file, so
+    reconnecting to a path that was replaced on disk (``os.replace``) while
+    the old connection is open would keep reading the old file; a fresh
+    alias on a fresh instance always opens what is at ``path`` now. A
+    writable data DB (tests: the user tables live in it and per-request
+    connections share its instance) is opened directly, and a swap closes
+    the old connection first.
+
+    ``swap`` opens a new snapshot and makes it current in one step. Cursors
+    already handed out keep using the old connection, which is closed once
+    the last of them is released. ``version`` identifies the open snapshot
+    and is folded into cache keys (src/cache.py).
+    """
+
+    def __init__(self, path: str, read_only: bool, max_cursors: int,
+                 acquire_timeout: float, health_interval: float,
+                 user_db_path: str | None = None):
+        self.path = path
+        self.read_only = read_only
+        self.user_db_path = user_db_path
+        self.max_cursors = max_cursors
+        self.acquire_timeout = acquire_timeout
+        self.health_interval = health_interval
+        self._conn: duckdb.DuckDBPyConnection | None = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_cursors)
+        self._in_use = 0
+        self._last_health_check = 0.0
+        self._known_tables: set[str] = set()
+        self._version: str | None = None
+        self._file_stamp: str | None = None
+        # Cursors out per connection, so retired connections close only
+        # after their last cursor comes back.
+        self._cursor_conns: dict[int, duckdb.DuckDBPyConnection] = {}
+        self._conn_users: dict[int, int] = {}
+        self._retired: dict[int, duckdb.DuckDBPyConnection] = {}
+        self._watcher: threading.Thread | None = None
+        # Attached data catalog per connection when the user DB hosts it
+        self._catalogs: dict[int, str] = {}
+        self._catalog_ids = itertools.count(1)
+        self._user_catalog: str | None = None
+
+    @staticmethod
+    def file_stamp(path: str) -> str:
+        """Cheap fingerprint of the file at ``path`` (inode, size, mtime)."""
+        st = os.stat(path)
+        return hashlib.sha1(f"{st.st_ino}:{st.st_size}:{st.st_mtime_ns}".encode()).hexdigest()[:12]
+
+    @staticmethod
+    def read_version(conn: duckdb.DuckDBPyConnection, file_stamp: str) -> str:
+        """Snapshot version: ``data_version.version`` if present, else the file stamp."""
+        try:
+            row = conn.execute("SELECT MAX(version) FROM data_version").fetchone()
+        except duckdb.CatalogException:
+            row = None
+        return str(row[0]) if row and row[0] is not None else file_stamp
+
+    def _open(self, path: str | None = None) -> tuple[duckdb.DuckDBPyConnection, str, str]:
+        path = path or self.path
+        logger.info("Opening data DB %s (read_only=%s)", path, self.read_only)
+        stamp = self.file_stamp(path)
+        if self.user_db_path is None and not self.read_only:
+            conn = duckdb.connect(path)
+        else:
+            if self.user_db_path is None:
+                conn = duckdb.connect()
+            else:
+                conn = duckdb.connect(self.user_db_path, read_only=False)
+            try:
+                if self.user_db_path is not None:
+                    self._user_catalog = conn.execute("SELECT current_database()").fetchone()[0]
+                catalog = f"data_{next(self._catalog_ids)}"
+                mode = " (READ_ONLY)" if self.read_only else ""
+                quoted = path.replace("'", "''")
+                conn.execute(f"ATTACH '{quoted}' AS {catalog}{mode}")
+                conn.execute(f"USE {catalog}")
+            except duckdb.Error:
+                conn.close()
+                raise
+            self._catalogs[id(conn)] = catalog
+        return conn, stamp, self.read_version(conn, stamp)
+
+    def _connection(self) -> duckdb.DuckDBPyConnection:
+        """Return the shared connection, (re)opening it if needed. Caller holds _lock."""
+        now = time.monotonic()
+        if self._conn is not None and now - self._last_health_check >= self.health_interval:
+            try:
+                probe = self._conn.cursor()
+                try:
+                    probe.execute("SELECT 1").fetchone()
+                finally:
+                    probe.close()
+            except duckdb.Error as exc:
+                logger.warning("Data DB health check failed, reopening: %s", exc)
+                self._discard()
+            self._last_health_check = now
+        if self._conn is None:
+            self._conn, self._file_stamp, self._version = self._open()
+            self._last_health_check = now
+        return self._conn
+
+    def _retire(self, conn: duckdb.DuckDBPyConnection) -> None:
+        """Close ``conn`` now, or once its last cursor is released. Caller holds _lock."""
+        if self._conn_users.get(id(conn), 0) > 0:
+            self._retired[id(conn)] = conn
+            return
+        self._conn_users.pop(id(conn), None)
+        catalog = self._catalogs.pop(id(conn), None)
+        try:
+            # The user DB outlives this connection; an in-memory host does not
+            if catalog is not None and self.user_db_path is not None:
+                conn.execute(f'USE "{self._user_catalog}"')
+                conn.execute(f"DETACH {catalog}")
+            conn.close()
+        except duckdb.Error:
+            pass
+
+    def _discard(self) -> None:
+        conn, self._conn = self._conn, None
+        self._known_tables.clear()
+        if conn is not None:
+            self._retire(conn)
+
+    def acquire(self) -> duckdb.DuckDBPyConnection:
+        """Hand out a cursor on the shared connection. Pair with ``release``."""
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            raise DataDBUnavailable(
+                f"all {self.max_cursors} data DB cursors busy for {self.acquire_timeout}s"
+            )
+        try:
+            with self._lock:
+                conn = self._connection()
+                cursor = conn.cursor()
+                catalog = self._catalogs.get(id(conn))
+                if catalog is not None:
+                    cursor.execute(f"USE {catalog}")
+                self._cursor_conns[id(cursor)] = conn
+                self._conn_users[id(conn)] = self._conn_users.get(id(conn), 0) + 1
+                self._in_use += 1
+            return cursor
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, cursor: duckdb.DuckDBPyConnection) -> None:
+        try:
+            cursor.close()
+        except duckdb.Error:
+            pass
+        with self._lock:
+            self._in_use -= 1
+            conn = self._cursor_conns.pop(id(cursor), None)
+            if conn is not None:
+                self._conn_users[id(conn)] -= 1
+                if id(conn) in self._retired and self._conn_users[id(conn)] == 0:
+                    self._retire(self._retired.pop(id(conn)))
+        self._slots.release()
+
+    @property
+    def version(self) -> str:
+        """Version stamp of the current snapshot (opens the DB if needed)."""
+        with self._lock:
+            self._connection()
+            return self._version
+
+    @property
+    def user_catalog(self) -> str | None:
+        """Catalog of the attached user DB, or None when it is the data DB file itself."""
+        if self.user_db_path is None:
+            return None
+        with self._lock:
+            self._connection()
+            return self._user_catalog
+
+    def swap(self, path: str | None = None) -> str:
+        """Atomically switch to the snapshot at ``path`` (default: the current path).
+
+        A read-only snapshot is opened before anything changes, so a bad
+        file raises and leaves the current one in place. Requests that already
+        hold a cursor finish on the old snapshot. Returns the new version.
+        """
+        if self.user_db_path is None and not self.read_only:
+            # A writable data DB is opened directly, so the old connection
+            # must go first or DuckDB hands back its cached instance
+            with self._lock:
+                self._discard()
+        conn, stamp, version = self._open(path)
+        with self._lock:
+            old, self._conn = self._conn, conn
+            self.path = path or self.path
+            self._file_stamp, self._version = stamp, version
+            self._known_tables.clear()
+            self._last_health_check = time.monotonic()
+            if old is not None:
+                self._retire(old)
+        logger.info("Swapped data DB to %s (version %s)", self.path, version)
+        return version
+
+    def check_for_new_snapshot(self) -> bool:
+        """Swap if the file at ``path`` was replaced since it was opened."""
+        with self._lock:
+            opened = self._conn is not None
+            known = self._file_stamp
+        try:
+            current = self.file_stamp(self.path)
+        except OSError as exc:
+            logger.warning("Cannot stat data DB %s: %s", self.path, exc)
+            return False
+        if not opened or current == known:
+            return False
+        try:
+            self.swap()
+        except duckdb.Error as exc:
+            logger.warning("New data DB snapshot not usable yet, keeping the old one: %s", exc)
+            return False
+        return True
+
+    def start_watcher(self, interval: float) -> None:
+        """Poll the data DB file every ``interval`` seconds and swap on change."""
+        if interval <= 0 or self._watcher is not None:
+            return
+
+        def watch():
+            while True:
+                time.sleep(interval)
+                self.check_for_new_snapshot()
+
+        self._watcher = threading.Thread(target=watch, name="data-db-watcher", daemon=True)
+        self._watcher.start()
+
+    def _catalog_has(self, key: str, sql: str, params: list,
+                     cursor: duckdb.DuckDBPyConnection | None) -> bool:
+        if key in self._known_tables:
+            return True
+        own_cursor = cursor is None
+        if own_cursor:
+            cursor = self.acquire()
+        try:
+            found = cursor.execute(sql, params).fetchone()[0] > 0
+        finally:
+            if own_cursor:
+                self.release(cursor)
+        if found:
+            self._known_tables.add(key)
+        return found
+
+    def has_table(self, name: str, cursor: duckdb.DuckDBPyConnection | None = None) -> bool:
+        """True if ``name`` exists in the data DB.
+
+        Only hits are remembered (until the connection is reopened), so a
+        derived table built by a pipeline step is picked up on the next call.
+        """
+        return self._catalog_has(
+            name,
+            "SELECT COUNT(*) FROM duckdb_tables() WHERE table_name = ? AND database_name = current_database()",
+            [name],
+            cursor,
+        )
+
+    def has_column(self, table: str, column: str, cursor: duckdb.DuckDBPyConnection | None = None) -> bool:
+        """True if ``table.column`` exists in the data DB (remembered like ``has_table``)."""
+        return self._catalog_has(
+            f"{table}.{column}",
+            "SELECT COUNT(*) FROM duckdb_columns()"
+            " WHERE table_name = ? AND column_name = ? AND database_name = current_database()",
+            [table, column],
+            cursor,
+        )
+
+    def forget_tables(self) -> None:
+        """Drop remembered ``has_table``/``has_column`` hits after derived tables are removed."""
+        self._known_tables.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "open": self._conn is not None,
+                "cursors_in_use": self._in_use,
+                "max_cursors": self.max_cursors,
+                "version": self._version,
+                "retired_connections": len(self._retired),
+                "user_db_attached": self.user_db_path is not None,
+            }
+
+    def close(self) -> None:
+        """Close the shared connection. A later ``acquire`` reopens it."""
+        with self._lock:
+            self._discard()
+
+
+# In test mode, allow writes to the data database
+# In production, enforce read-only mode for data integrity
+data_db_manager = DataDBManager(
+    DATA_DB_PATH,
+    read_only=os.getenv('TESTING') != '1',
+    max_cursors=DATA_DB_MAX_CURSORS,
+    acquire_timeout=DATA_DB_ACQUIRE_TIMEOUT,
+    health_interval=DATA_DB_HEALTH_INTERVAL,
+    # Same file in tests: user tables are already in the data catalog
+    user_db_path=None if os.path.realpath(USER_DB_PATH) == os.path.realpath(DATA_DB_PATH) else USER_DB_PATH,
+)
+
+
+def has_data_table(name: str) -> bool:
+    """True if the data DB has a table called ``name``."""
+    return data_db_manager.has_table(name, get_data_db() if has_app_context() else None)
+
+
+def has_data_column(table: str, column: str) -> bool:
+    """True if the data DB table ``table`` has a column called ``column``."""
+    return data_db_manager.has_column(table, column, get_data_db() if has_app_context() else None)
+
+
+def user_table(name: str) -> str:
+    """SQL name of user DB table ``name`` for use in data DB queries.
+
+    Lets a data cursor join user data directly, e.g.
+    ``f"... JOIN {user_table('user_read_history')} h ON h.paper_id = p.id"``.
+    """
+    catalog = data_db_manager.user_catalog
+    return name if catalog is None else f'"{catalog}".main.{name}'
+
+
 def get_user_db() -> duckdb.DuckDBPyConnection:
     """Return read/write connection to user database (per Flask request)."""
     db = g.get("user_db")
@@ -36,13 +414,10 @@ def get_user_db() -> duckdb.DuckDBPyConnection:
 
 
 def get_data_db() -> duckdb.DuckDBPyConnection:
-    """Return read-only connection to data database (per Flask request)."""
+    """Return a cursor on the shared data database (per Flask request)."""
     db = g.get("data_db")
     if db is None:
-        # In test mode, allow writes to the data database
-        # In production, enforce read-only mode for data integrity
-        is_testing = os.getenv('TESTING') == '1'
-        db = duckdb.connect(DATA_DB_PATH, read_only=(not is_testing))
+        db = data_db_manager.acquire()
         g.data_db = db
     return db
 
@@ -64,7 +439,13 @@ def close_db(_exc: Exception | None = None) -> None:
 
     data_db = g.pop("data_db", None)
     if data_db is not None:
-        data_db.close()
+        data_db_manager.release(data_db)
+
+
+def shutdown_db() -> None:
+    """Release request connections and close the shared data DB connection."""
+    close_db()
+    data_db_manager.close()
 
 
 def init_app(app) -> None:
@@ -72,6 +453,12 @@ def init_app(app) -> None:
     app.logger.info(f"User DB path configured: {USER_DB_PATH}")
     app.logger.info(f"Data DB path configured: {DATA_DB_PATH} (read-only)")
     app.teardown_appcontext(close_db)
+    data_db_manager.start_watcher(DATA_DB_WATCH_INTERVAL)
+
+    @app.errorhandler(DataDBUnavailable)
+    def data_db_unavailable(exc):
+        app.logger.warning("Data DB unavailable: %s", exc)
+        return jsonify({"error": "Database busy, try again"}), 503
 
 
 def get_schema(db_type: str = 'both') -> dict:
@@ -90,41 +477,187 @@ def get_schema(db_type: str = 'both') -> dict:
                 schema[f"user.{table_name}"] = columns
 
     if db_type in ('data', 'both'):
-        with duckdb.connect(DATA_DB_PATH, read_only=True) as db:
+        db = data_db_manager.acquire()
+        try:
             tables = db.execute("SHOW TABLES").fetchall()
             for (table_name,) in tables:
                 columns = db.execute(f"DESCRIBE {table_name}").fetchall()
                 schema[f"data.{table_name}"] = columns
+        finally:
+            data_db_manager.release(db)
 
     return schema
 
 
+def _convert_value(val):
+    """Convert a single cell to a JSON-serializable Python value."""
+    if isinstance(val, (np.ndarray, list)):
+        return [_convert_value(v) for v in val] if len(val) > 0 else []
+    elif val is None or (not isinstance(val, (list, dict)) and pd.isna(val)):
+        return None
+    elif isinstance(val, (np.integer, np.int64)):
+        return int(val)
+    elif isinstance(val, (np.floating, np.float64)):
+        return float(val)
+    elif isinstance(val, (np.bool_, bool)):
+        return bool(val)
+    elif isinstance(val, (pd.Timestamp, np.datetime64)):
+        # Convert datetime to ISO format string (YYYY-MM-DD)
+        return pd.Timestamp(val).strftime('%Y-%m-%d')
+    elif isinstance(val, dict):
+        return {k: _convert_value(v) for k, v in val.items()}
+    else:
+        return val
+
+
+def _column_to_python(col: pd.Series) -> list:
+    """Convert a whole column at once, falling back to per-cell only for objects."""
+    dtype = col.dtype
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        formatted = col.dt.strftime('%Y-%m-%d')
+        return [None if isinstance(v, float) else v for v in formatted.tolist()]
+    if isinstance(dtype, np.dtype):
+        if dtype.kind in 'biu':
+            return col.tolist()
+        if dtype.kind == 'f':
+            values = col.to_numpy()
+            out = values.tolist()
+            nan_mask = np.isnan(values)
+            if nan_mask.any():
+                for idx in np.flatnonzero(nan_mask):
+                    out[idx] = None
+            return out
+    # Object, string and list columns: strings pass through untouched,
+    # everything else takes the per-value path.
+    return [v if type(v) is str else _convert_value(v) for v in col.tolist()]
+
+
 def df_to_json_serializable(df: pd.DataFrame) -> list[dict[str, Any]]:
-    """Convert DataFrame to JSON-serializable list of dicts."""
-    def convert_value(val):
-        if isinstance(val, (np.ndarray, list)):
-            return [convert_value(v) for v in val] if len(val) > 0 else []
-        elif val is None or (not isinstance(val, (list, dict)) and pd.isna(val)):
-            return None
-        elif isinstance(val, (np.integer, np.int64)):
-            return int(val)
-        elif isinstance(val, (np.floating, np.float64)):
-            return float(val)
-        elif isinstance(val, (np.bool_, bool)):
-            return bool(val)
-        elif isinstance(val, (pd.Timestamp, np.datetime64)):
-            # Convert datetime to ISO format string (YYYY-MM-DD)
-            return pd.Timestamp(val).strftime('%Y-%m-%d')
-        elif isinstance(val, dict):
-            return {k: convert_value(v) for k, v in val.items()}
-        else:
-            return val
+    """Convert DataFrame to JSON-serializable list of dicts.
+
+    Works column by column: dates become ISO strings, numpy scalars become
+    Python ints/floats, list columns become lists and NaN/NaT become None.
+    """
+    columns = list(df.columns)
+    if not columns:
+        return [{} for _ in range(len(df))]
+
+    # The row-wise version went through iterrows(), which upcasts frames
+    # made only of numeric columns to one common dtype (ints next to a float
+    # column came out as floats). Keep that so the JSON stays identical.
+    dtypes = list(df.dtypes)
+    if len(dtypes) > 1 and all(isinstance(t, np.dtype) and t.kind in 'iuf' for t in dtypes):
+        common = np.result_type(*dtypes)
+        if any(t != common for t in dtypes):
+            df = df.astype(common)
+
+    converted = [_column_to_python(df.iloc[:, i]) for i in range(len(columns))]
+    return [dict(zip(columns, row)) for row in zip(*converted)]
 
-    records = []
-    for _, row in df.iterrows():
-        record = {}
-        for col in df.columns:
-            record[col] = convert_value(row[col])
-        records.append(record)
 
-    return records
\ No newline at end of file
+# ── Result fetching without pandas ───────────────────────────────────────────
+
+def _array_to_python(arr: np.ndarray) -> list:
+    """Convert one ``fetchnumpy()`` column to Python values.
+
+    NULLs arrive as masked entries and become None; dates become ISO
+    (YYYY-MM-DD) strings, the same as ``df_to_json_serializable``.
+    """
+    mask = np.ma.getmaskarray(arr) if isinstance(arr, np.ma.MaskedArray) else None
+    data = np.ma.getdata(arr)
+    kind = data.dtype.kind
+
+    if kind == 'M':
+        values = np.datetime_as_string(data, unit='D').tolist()
+        nat = np.isnat(data)
+        mask = nat if mask is None else (mask | nat)
+    elif kind in 'biu':
+        values = data.tolist()
+    elif kind == 'f':
+        values = data.tolist()
+        nan = np.isnan(data)
+        mask = nan if mask is None else (mask | nan)
+    else:
+        values = [v if type(v) is str else _convert_value(v) for v in data.tolist()]
+
+    if mask is not None and mask.any():
+        for idx in np.flatnonzero(mask):
+            values[idx] = None
+    return values
+
+
+def fetch_records(cursor: duckdb.DuckDBPyConnection) -> list[dict[str, Any]]:
+    """Fetch the pending result on ``cursor`` as JSON-ready dicts.
+
+    Goes through ``fetchnumpy()`` instead of ``fetchdf()``, so no DataFrame
+    is built and integer columns with NULLs stay integers.
+    """
+    if cursor.description is None:
+        return []
+    columns = [d[0] for d in cursor.description]
+    arrays = cursor.fetchnumpy()
+    converted = [_array_to_python(arrays[name]) for name in columns]
+    return [dict(zip(columns, row)) for row in zip(*converted)]
+
+
+def wants_arrow() -> bool:
+    """True if the client prefers an Arrow IPC stream over JSON.
+
+    Only an explicit ``Accept: application/vnd.apache.arrow.stream`` (ranked
+    above JSON) opts in; ``*/*`` and browsers keep getting JSON. Also used as
+    ``unless=`` on cached routes so Arrow bodies never land in the JSON cache.
+    """
+    if not PYARROW_AVAILABLE or not has_request_context():
+        return False
+    best = request.accept_mimetypes.best_match(['application/json', ARROW_STREAM_MIMETYPE])
+    return best == ARROW_STREAM_MIMETYPE
+
+
+def arrow_response(table, **metadata):
+    """Serialize an Arrow table as an IPC stream response.
+
+    Scalars that accompany the rows in the JSON body (``total``, ``page``...)
+    are stored JSON-encoded in the schema metadata.
+    """
+    if metadata:
+        encoded = {k: current_app.json.dumps(v) for k, v in metadata.items()}
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), **encoded})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return current_app.response_class(sink.getvalue().to_pybytes(), mimetype=ARROW_STREAM_MIMETYPE)
+
+
+def query_response(cursor: duckdb.DuckDBPyConnection, key: str,
+                   paginate: tuple[int, Callable[[dict], str | None]] | None = None, **extra):
+    """Respond with the pending result on ``cursor`` in the negotiated format.
+
+    JSON clients get ``{key: [rows...], **extra}``; Arrow clients get the rows
+    as an IPC stream with ``extra`` in the schema metadata.
+
+    ``paginate`` is ``(per_page, make_cursor)`` for queries fetched with
+    ``LIMIT per_page + 1``: the extra row is dropped and ``next_cursor`` is
+    ``make_cursor(last_row)``, or None on the last page.
+    """
+    if wants_arrow():
+        table = cursor.fetch_arrow_table()
+        if paginate is not None:
+            per_page, make_cursor = paginate
+            next_cursor = None
+            if table.num_rows > per_page:
+                table = table.slice(0, per_page)
+                next_cursor = make_cursor(table.slice(per_page - 1, 1).to_pylist()[0])
+            extra['next_cursor'] = next_cursor
+        response = arrow_response(table, **extra)
+    else:
+        rows = fetch_records(cursor)
+        if paginate is not None:
+            per_page, make_cursor = paginate
+            next_cursor = None
+            if len(rows) > per_page:
+                rows = rows[:per_page]
+                next_cursor = make_cursor(rows[-1])
+            extra['next_cursor'] = next_cursor
+        response = jsonify({key: rows, **extra})
+    response.vary.add('Accept')
+    return response
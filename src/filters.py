@@ -0,0 +1,111 @@
+"""Shared SQL filter fragments for the data DB routes."""
+
+import re
+import unicodedata
+
+from src.database import has_data_column, has_data_table
+from src.search import prefix_upper_bound
+from src.sql_safety import escape_like
+
+
+def subject_filter(subject: str, id_expr: str = "id", categories_expr: str = "categories") -> tuple[str, list]:
+    """`AND ...` fragment restricting papers to an arXiv subject.
+
+    With `paper_categories` built (data/process_categories.py) this is an
+    equality semi-join on the category-sorted table, so only that subject's
+    rows are read. `subject` matches a category exactly ("cs.LG"), or every
+    category of an archive when it has no dot ("cs", "hep-th"). Papers added
+    through the API have no id and so no index rows; they are matched by the
+    same rule against their own `categories`. Without the table it falls
+    back to a substring match on `papers.categories`.
+
+    `id_expr` / `categories_expr` are the (possibly aliased) column names in
+    the caller's query and must be constants, never user input.
+    """
+    if has_data_table("paper_categories") and has_data_table("category_dict"):
+        archive = "" if "." in subject else r"(\.\S+)?"
+        return (
+            f" AND ({id_expr} IN ("
+            "SELECT paper_id FROM paper_categories WHERE category IN ("
+            "SELECT category FROM category_dict WHERE category = ? OR archive = ?))"
+            f" OR ({id_expr} IS NULL AND regexp_matches({categories_expr}, ?)))",
+            [subject, subject, rf"(^|\s){re.escape(subject)}{archive}(\s|$)"],
+        )
+    return f" AND {categories_expr} LIKE ? ESCAPE '\\'", [f"%{escape_like(subject)}%"]
+
+
+_AUTHOR_ID_PREFIXES = ("https://orcid.org/", "https://openalex.org/")
+
+
+def normalize_author_name(name: str) -> str:
+    """Fold a name the way data/process_paper_authors.py does."""
+    folded = unicodedata.normalize("NFKD", name)
+    folded = "".join(ch for ch in folded if not unicodedata.combining(ch)).lower()
+    return re.sub(r"[^a-z0-9]+", " ", folded).strip()
+
+
+def author_filter(author: str, id_expr: str = "id", authors_expr: str = "authors") -> tuple[str, list]:
+    """`AND ...` fragment restricting papers to an author.
+
+    With `paper_authors` built (data/process_paper_authors.py) the papers
+    are picked through the author index: an ORCID / OpenAlex URL matches
+    `author_id` exactly. Anything else is folded like the stored names
+    (case, accents, punctuation) and matched word by word against
+    `paper_author_tokens`: a paper matches when one of its authors has
+    every word of the query, in any order, the last word as a prefix
+    ("smi", "Alice Smith" and "smith al" all match Alice Smith). These are
+    equality and range lookups on tables sorted by the looked-up column.
+    Without the index this falls back to an ILIKE substring match on the
+    raw authors.
+    """
+    if has_data_table("paper_authors"):
+        if author.startswith(_AUTHOR_ID_PREFIXES):
+            return f" AND {id_expr} IN (SELECT paper_id FROM paper_authors WHERE author_id = ?)", [author]
+        words = normalize_author_name(author).split()
+        if words and has_data_table("paper_author_tokens"):
+            prefix = words[-1]
+            whole = sorted(set(words[:-1]))
+            prefix_params = [prefix, prefix_upper_bound(prefix)]
+            if not whole:
+                return (
+                    f" AND {id_expr} IN ("
+                    "SELECT paper_id FROM paper_author_tokens WHERE token >= ? AND token < ?)",
+                    prefix_params,
+                )
+            placeholders = ", ".join(["?"] * len(whole))
+            return (
+                f" AND {id_expr} IN ("
+                "SELECT paper_id FROM paper_author_tokens "
+                f"WHERE token IN ({placeholders}) OR (token >= ? AND token < ?) "
+                "GROUP BY paper_id, position "
+                f"HAVING COUNT(DISTINCT token) FILTER (WHERE token IN ({placeholders})) = ? "
+                "AND bool_or(token >= ? AND token < ?))",
+                [*whole, *prefix_params, *whole, len(whole), *prefix_params],
+            )
+    return f" AND {authors_expr} ILIKE ? ESCAPE '\\'", [f"%{escape_like(author)}%"]
+
+
+def normalize_doi(raw: str | None) -> str | None:
+    """Canonical DOI, the way data/process_topics.py normalizes it."""
+    if raw is None:
+        return None
+    doi = raw.strip().lower()
+    if not doi:
+        return None
+    doi = doi.removeprefix("https://doi.org/")
+    doi = doi.removeprefix("http://doi.org/")
+    doi = doi.removeprefix("doi:")
+    doi = doi.rstrip(",")
+    return doi or None
+
+
+def doi_match(doi: str, doi_expr: str = "doi", doi_norm_expr: str = "doi_norm") -> tuple[str, list]:
+    """Condition matching papers with DOI `doi`.
+
+    With `papers.doi_norm` built (data/process_doi_norm.py) this is an
+    equality on the indexed canonical DOI; otherwise a case-insensitive
+    comparison on `doi`. The expressions must be constants, never user input.
+    """
+    if has_data_column("papers", "doi_norm"):
+        return f"{doi_norm_expr} = ?", [normalize_doi(doi)]
+    return f"lower({doi_expr}) = lower(?)", [doi]
@@ -0,0 +1,40 @@
+"""JSON provider that encodes responses with orjson when it is installed.
+
+Drop-in for Flask's default provider: keys stay sorted and dates, UUIDs,
+Decimals and dataclasses are still handled by Flask's ``default``. Only the
+compact response path is swapped; ``app.json.dumps`` and pretty-printed
+debug output keep using the standard library.
+"""
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson for response bodies."""
+
+    def _orjson_options(self) -> int:
+        options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        return options
+
+    def response(self, *args, **kwargs):
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+        if not ORJSON_AVAILABLE or pretty:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        try:
+            body = orjson.dumps(obj, default=self.default, option=self._orjson_options())
+        except TypeError:
+            # Integers beyond 64 bits, non-str keys etc.: let json handle it
+            return super().response(*args, **kwargs)
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
@@ -8,8 +8,11 @@ from flask_compress import Compress
 from flask_swagger_ui import get_swaggerui_blueprint
 import flask_monitoringdashboard as dashboard
 
-from src.database import init_app as init_database, close_db
+from src.database import init_app as init_database, shutdown_db
 from src.cache import cache
+from src.cache_backend import DEFAULT_PATH as DEFAULT_CACHE_PATH
+from src.json_provider import FastJSONProvider
+from src.routes.admin import admin_bp
 from src.routes.analytics import analytics
 from src.routes.authors import authors_bp
 from src.routes.frontend import frontend
@@ -21,6 +24,7 @@ from src.routes.users import users_bp
 from src.routes.spec import spec_bp
 
 app = Flask(__name__, static_folder=None)
+app.json = FastJSONProvider(app)
 Compress(app)
 
 # Configure monitoring dashboard (bind later after routes are registered)
@@ -30,20 +34,25 @@ dashboard.config.init_from(file='config.cfg')
 init_database(app)
 
 # Initialize caching
+# The SQLite backend is shared by all gunicorn workers on the host; set
+# CACHE_TYPE=SimpleCache for a per-process in-memory cache instead.
 cache.init_app(app, config={
-    'CACHE_TYPE': 'SimpleCache',
-    'CACHE_DEFAULT_TIMEOUT': 300  # 5 minutes default
+    'CACHE_TYPE': os.getenv('CACHE_TYPE', 'src.cache_backend.SQLiteCache'),
+    'CACHE_DEFAULT_TIMEOUT': 300,  # 5 minutes default
+    'CACHE_SQLITE_PATH': os.getenv('CACHE_SQLITE_PATH', DEFAULT_CACHE_PATH),
+    'CACHE_MAX_BYTES': int(os.getenv('CACHE_MAX_BYTES', 256 * 1024 * 1024)),
+    'CACHE_THRESHOLD': int(os.getenv('CACHE_THRESHOLD', 10000)),
 })
 
 # Graceful shutdown for containers
 def shutdown_handler(signum, frame):
     app.logger.info("Shutting down gracefully...")
-    close_db()
+    shutdown_db()
     exit(0)
 
 signal.signal(signal.SIGTERM, shutdown_handler)
 signal.signal(signal.SIGINT, shutdown_handler)
-atexit.register(close_db)
+atexit.register(shutdown_db)
 
 # Register spec blueprint FIRST (highest priority)
 app.register_blueprint(spec_bp)
@@ -56,6 +65,7 @@ app.register_blueprint(users_bp)
 app.register_blueprint(microtopics_bp)
 app.register_blueprint(reports_bp)
 app.register_blueprint(analytics)
+app.register_blueprint(admin_bp)
 
 # Configure Swagger UI blueprint
 SWAGGER_URL = '/api'
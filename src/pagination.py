@@ -0,0 +1,106 @@
+"""Keyset (cursor) pagination helpers.
+
+A cursor is an opaque, URL-safe token holding the sort field, direction and
+the (sort value, key) of the last row a client saw. The next page is the
+rows strictly after that key in `ORDER BY <sort> NULLS LAST, <key>` order,
+so deep pages cost the same as the first one instead of sorting and
+discarding OFFSET rows. The key must never be NULL: papers added through
+the API have no id, so paper listings key on `paper_key()` (id, else DOI).
+
+Routes keep accepting `page` for backward compatibility; when `cursor` is
+given it takes precedence.
+"""
+
+import base64
+import datetime
+import json
+from typing import Any
+
+from src.sql_safety import InvalidParameter
+
+
+# papers.id is NULL for papers added through the API; those are keyed by
+# their DOI, which add_paper requires and keeps unique.
+PAPER_KEY_COLUMNS = ("id", "doi")
+
+
+def paper_key(alias: str = "") -> str:
+    """Never-NULL tie-breaker over papers, e.g. `COALESCE(p.id, p.doi)`."""
+    return f"COALESCE({', '.join(alias + c for c in PAPER_KEY_COLUMNS)})"
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return value
+
+
+def encode_cursor(sort_by: str, sort_order: str, value: Any, row_id: str) -> str:
+    """Pack the last row's sort key into an opaque token."""
+    payload = json.dumps([sort_by, sort_order, _json_value(value), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str, sort_by: str, sort_order: str) -> tuple[Any, str]:
+    """Unpack a token from `encode_cursor`; returns (value, row_id).
+
+    Raises InvalidParameter if the token is malformed or was issued for a
+    different sort, since its key would not mean anything in this order.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        field, order, value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise InvalidParameter("invalid cursor")
+    if field != sort_by or order != sort_order or not isinstance(row_id, str):
+        raise InvalidParameter("cursor does not match sort_by/sort_order")
+    if value is not None and not isinstance(value, (int, float, str)):
+        raise InvalidParameter("invalid cursor")
+    return value, row_id
+
+
+def order_by(sort_expr: str, id_expr: str, sort_order: str) -> str:
+    """ORDER BY body with the key tie-breaker keyset pagination relies on."""
+    return f"{sort_expr} {sort_order} NULLS LAST, {id_expr} {sort_order}"
+
+
+def keyset_condition(sort_expr: str, id_expr: str, sort_order: str,
+                     value: Any, row_id: str) -> tuple[str, list]:
+    """WHERE fragment selecting rows after (value, row_id) in `order_by` order.
+
+    `sort_expr` / `id_expr` / `sort_order` must come from allowlists; only
+    `value` and `row_id` are bound as parameters.
+    """
+    op = "<" if sort_order == "DESC" else ">"
+    if value is None:
+        # Already in the trailing NULL block: only keys further along remain.
+        return f"({sort_expr} IS NULL AND {id_expr} {op} ?)", [row_id]
+    return (
+        f"({sort_expr} {op} ? OR ({sort_expr} = ? AND {id_expr} {op} ?) OR {sort_expr} IS NULL)",
+        [value, value, row_id],
+    )
+
+
+def row_cursor(row: dict, sort_key: str, key_columns: tuple[str, ...],
+               sort_by: str, sort_order: str) -> str | None:
+    """Cursor pointing just past `row`.
+
+    The key is the first non-NULL of `key_columns`, matching the COALESCE
+    the query orders by; a row with none of them cannot anchor a cursor.
+    """
+    row_key = next((row[c] for c in key_columns if row.get(c) is not None), None)
+    if row_key is None:
+        return None
+    return encode_cursor(sort_by, sort_order, row.get(sort_key), row_key)
+
+
+def page_rows(rows: list[dict], per_page: int, sort_key: str, key_columns: tuple[str, ...],
+              sort_by: str, sort_order: str) -> tuple[list[dict], str | None]:
+    """Trim a `LIMIT per_page + 1` result and build the next cursor.
+
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    if len(rows) <= per_page:
+        return rows, None
+    rows = rows[:per_page]
+    return rows, row_cursor(rows[-1], sort_key, key_columns, sort_by, sort_order)
@@ -0,0 +1,256 @@
+"""Background precompute of per-user recommendations.
+
+Changes to a user's read history or reading list call
+``recommendation_queue.schedule(user_id)``. Once RECOMMENDATION_DEBOUNCE
+seconds pass without another change for that user, a worker thread ranks
+their reads for every strategy (``src.recommender.recommend``, top
+MAX_RECOMMENDATIONS) and stores the lists in the user DB table
+``user_recommendations``:
+
+  user_recommendations(user_id, strategy, recommendations, data_version, computed_at)
+      one row per (user_id, strategy); ``recommendations`` is the ranked
+      list as STRUCT(id, title, citation_count, categories, update_date,
+      reason, score)[]
+
+GET /api/users/<id>/recommendations reads that row. Rows computed against
+an older data DB snapshot, or more than RECOMMENDATION_MAX_AGE seconds ago
+(read weights decay with time), are still served while a refresh runs.
+
+Refreshes for one user never overlap: scheduling a user whose refresh is
+running queues another run after it. The hybrid strategy is stored at
+MAX_RECOMMENDATIONS, so it falls back to topic matches when there are
+fewer than 2 * MAX_RECOMMENDATIONS citation candidates, whatever the
+requested limit.
+"""
+
+import datetime as dt
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import duckdb
+
+from src.database import USER_DB_PATH, data_db_manager
+from src.recommender import STRATEGIES, recommend
+
+logger = logging.getLogger(__name__)
+
+# Largest `limit` the recommendations route accepts; stored lists are this long
+MAX_RECOMMENDATIONS = 50
+RECOMMENDATION_DEBOUNCE = float(os.getenv("RECOMMENDATION_DEBOUNCE", "2"))
+RECOMMENDATION_WORKERS = int(os.getenv("RECOMMENDATION_WORKERS", "2"))
+RECOMMENDATION_MAX_AGE = float(os.getenv("RECOMMENDATION_MAX_AGE", "86400"))
+
+_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS user_recommendations (
+        user_id INTEGER,
+        strategy VARCHAR,
+        recommendations STRUCT(
+            id VARCHAR,
+            title VARCHAR,
+            citation_count INTEGER,
+            categories VARCHAR,
+            update_date VARCHAR,
+            reason VARCHAR,
+            score DOUBLE
+        )[],
+        data_version VARCHAR,
+        computed_at TIMESTAMP,
+        PRIMARY KEY (user_id, strategy)
+    )
+"""
+
+_table_ready = False
+
+
+def ensure_table(user_db: duckdb.DuckDBPyConnection) -> None:
+    """Create user_recommendations if this process has not seen it yet."""
+    global _table_ready
+    if not _table_ready:
+        user_db.execute(_TABLE_SQL)
+        _table_ready = True
+
+
+def compute_recommendations(
+    user_db: duckdb.DuckDBPyConnection,
+    data_db: duckdb.DuckDBPyConnection,
+    user_id: int,
+    now: dt.datetime | None = None,
+) -> dict[str, list[dict]]:
+    """Top MAX_RECOMMENDATIONS per strategy for ``user_id``'s read history."""
+    reads = user_db.execute(
+        "SELECT paper_id, read_at FROM user_read_history WHERE user_id = ?", [user_id]
+    ).fetchnumpy()
+    use_cited_by = data_db_manager.has_table("paper_cited_by", data_db)
+    return {
+        strategy: recommend(
+            data_db, reads["paper_id"], reads["read_at"], strategy,
+            MAX_RECOMMENDATIONS, now, use_cited_by=use_cited_by,
+        )
+        for strategy in STRATEGIES
+    }
+
+
+def store_recommendations(
+    user_db: duckdb.DuckDBPyConnection,
+    user_id: int,
+    results: dict[str, list[dict]],
+    data_version: str,
+) -> None:
+    """Replace ``user_id``'s stored lists with ``results`` in one transaction."""
+    ensure_table(user_db)
+    user_db.execute("BEGIN TRANSACTION")
+    try:
+        for strategy, recommendations in results.items():
+            user_db.execute(
+                """
+                INSERT OR REPLACE INTO user_recommendations
+                    (user_id, strategy, recommendations, data_version, computed_at)
+                VALUES (?, ?, ?, ?, now())
+                """,
+                [user_id, strategy, recommendations, data_version],
+            )
+        user_db.execute("COMMIT")
+    except Exception:
+        user_db.execute("ROLLBACK")
+        raise
+
+
+def load_recommendations(
+    user_db: duckdb.DuckDBPyConnection, user_id: int, strategy: str, limit: int
+) -> tuple[list[dict], bool] | None:
+    """Stored top ``limit`` for (user_id, strategy) and whether it is stale.
+
+    Returns None when nothing has been stored for the user yet.
+    """
+    ensure_table(user_db)
+    row = user_db.execute(
+        """
+        SELECT recommendations[1:?], data_version,
+               epoch(now()::TIMESTAMP - computed_at) AS age
+        FROM user_recommendations
+        WHERE user_id = ? AND strategy = ?
+        """,
+        [limit, user_id, strategy],
+    ).fetchone()
+    if row is None:
+        return None
+    recommendations, data_version, age = row
+    stale = data_version != data_db_manager.version or age > RECOMMENDATION_MAX_AGE
+    return recommendations, stale
+
+
+def drop_recommended_paper(user_db: duckdb.DuckDBPyConnection, user_id: int, paper_id: str) -> None:
+    """Remove a just-read paper from the stored lists until the next refresh."""
+    ensure_table(user_db)
+    user_db.execute(
+        """
+        UPDATE user_recommendations
+        SET recommendations = list_filter(recommendations, r -> r.id != ?)
+        WHERE user_id = ?
+        """,
+        [paper_id, user_id],
+    )
+
+
+def delete_recommendations(user_db: duckdb.DuckDBPyConnection, user_id: int) -> None:
+    ensure_table(user_db)
+    user_db.execute("DELETE FROM user_recommendations WHERE user_id = ?", [user_id])
+
+
+def refresh_recommendations(user_id: int) -> None:
+    """Recompute and store ``user_id``'s recommendations outside a request."""
+    user_db = duckdb.connect(USER_DB_PATH, read_only=False)
+    data_db = data_db_manager.acquire()
+    try:
+        # Read the version first: a swap mid-refresh leaves the row stale
+        # rather than labelling old results with the new snapshot.
+        version = data_db_manager.version
+        if user_db.execute("SELECT 1 FROM users WHERE id = ?", [user_id]).fetchone() is None:
+            delete_recommendations(user_db, user_id)
+            return
+        results = compute_recommendations(user_db, data_db, user_id)
+        store_recommendations(user_db, user_id, results, version)
+    finally:
+        data_db_manager.release(data_db)
+        user_db.close()
+
+
+class RecommendationQueue:
+    """Debounced per-user refreshes on a small thread pool.
+
+    ``schedule()`` (re)starts a user's debounce timer; a dispatcher thread
+    submits users whose timer ran out to the pool, holding back any user
+    whose previous refresh is still running.
+    """
+
+    def __init__(self, refresh, debounce: float, workers: int):
+        self._refresh = refresh
+        self.debounce = debounce
+        self._workers = workers
+        self._cond = threading.Condition()
+        self._due: dict[int, float] = {}
+        self._running: set[int] = set()
+        self._pool: ThreadPoolExecutor | None = None
+        self._counts = {"scheduled": 0, "debounced": 0, "refreshed": 0, "failed": 0}
+
+    def schedule(self, user_id: int, delay: float | None = None) -> None:
+        """Refresh ``user_id`` after ``delay`` (default: the debounce) quiet seconds."""
+        with self._cond:
+            self._counts["scheduled"] += 1
+            if user_id in self._due:
+                self._counts["debounced"] += 1
+            self._due[user_id] = time.monotonic() + (self.debounce if delay is None else delay)
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(self._workers, thread_name_prefix="recs-refresh")
+                threading.Thread(target=self._dispatch, name="recs-dispatch", daemon=True).start()
+            self._cond.notify_all()
+
+    def _dispatch(self) -> None:
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                for user_id, due in list(self._due.items()):
+                    if due <= now and user_id not in self._running:
+                        del self._due[user_id]
+                        self._running.add(user_id)
+                        self._pool.submit(self._run, user_id)
+                waiting = [due for user_id, due in self._due.items() if user_id not in self._running]
+                self._cond.wait(max(0.0, min(waiting) - now) if waiting else None)
+
+    def _run(self, user_id: int) -> None:
+        try:
+            self._refresh(user_id)
+            outcome = "refreshed"
+        except Exception:
+            logger.exception("Refreshing recommendations for user %s failed", user_id)
+            outcome = "failed"
+        with self._cond:
+            self._counts[outcome] += 1
+            self._running.discard(user_id)
+            self._cond.notify_all()
+
+    def flush(self, timeout: float = 30.0) -> bool:
+        """Run every pending refresh now and wait for the queue to empty."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            for user_id in self._due:
+                self._due[user_id] = 0.0
+            self._cond.notify_all()
+            while self._due or self._running:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def stats(self) -> dict:
+        with self._cond:
+            return dict(self._counts, pending=len(self._due), running=len(self._running))
+
+
+recommendation_queue = RecommendationQueue(
+    refresh_recommendations, RECOMMENDATION_DEBOUNCE, RECOMMENDATION_WORKERS
+)
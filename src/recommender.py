@@ -0,0 +1,173 @@
+"""Paper recommendations from a user's read history.
+
+Scores every candidate in DuckDB with set operations instead of ranking a
+truncated candidate list row by row in Python:
+
+  * each read paper gets a recency weight (``read_weights``);
+  * ``citation_graph``: papers citing read papers score
+    0.9 + 0.1 * (sum of the weights of the read papers they cite);
+  * ``topic_similarity``: each microtopic is weighted by the summed weights
+    of the read papers in it, and papers in those microtopics score
+    0.7 + 0.05 * (sum of the weights of their shared microtopics);
+  * ``hybrid``: citation candidates first; topic candidates are added (for
+    papers not already suggested by citations) only when there are fewer
+    than 2 * limit citation candidates.
+
+Read and deleted papers are never recommended. Candidates are deduplicated
+with joins and the top ``limit`` taken by DuckDB's top-N operator (a
+partial sort), ordered by score, then citation count.
+"""
+
+import datetime as dt
+
+import duckdb
+import numpy as np
+
+from src.database import fetch_records, has_data_table
+
+STRATEGIES = ("hybrid", "citation_graph", "topic_similarity")
+
+CITATION_BASE, CITATION_BOOST = 0.9, 0.1
+TOPIC_BASE, TOPIC_BOOST = 0.7, 0.05
+
+CITATION_REASON = "Cites papers in your reading history"
+TOPIC_REASON = "Shares topics with your reading history"
+
+# Age assumed for reads without a timestamp
+_UNKNOWN_AGE_DAYS = 365
+
+
+def read_weights(read_at, now: dt.datetime | None = None) -> np.ndarray:
+    """Recency weight per read: 2.0 today, halving every 30 days, floor 0.5.
+
+    Ages are counted in whole days; missing timestamps count as a year old.
+    """
+    now = np.datetime64(now or dt.datetime.now(), "us")
+    if isinstance(read_at, np.ma.MaskedArray):
+        read_at = read_at.astype("datetime64[us]").filled(np.datetime64("NaT"))
+    read_at = np.asarray(read_at, dtype="datetime64[us]")
+    days = np.floor((now - read_at) / np.timedelta64(1, "D"))
+    days = np.where(np.isnan(days), _UNKNOWN_AGE_DAYS, days)
+    return np.maximum(0.5, 2.0 * 0.5 ** (days / 30))
+
+
+def _citation_edges_sql(use_cited_by: bool) -> str:
+    """(citing paper, read paper) pairs, from the reverse-citation index if built."""
+    if use_cited_by:
+        return """
+            SELECT c.citing_id AS paper_id, r.weight
+            FROM paper_cited_by c
+            INNER JOIN reads r ON r.paper_id = c.cited_id
+        """
+    return """
+        SELECT c.paper_id, r.weight
+        FROM (
+            SELECT DISTINCT id AS paper_id, unnest(citations) AS cited_id
+            FROM papers
+            WHERE id IS NOT NULL AND citations IS NOT NULL
+        ) c
+        INNER JOIN reads r ON r.paper_id = c.cited_id
+    """
+
+
+def recommend(
+    db: duckdb.DuckDBPyConnection,
+    paper_ids,
+    read_at,
+    strategy: str = "hybrid",
+    limit: int = 10,
+    now: dt.datetime | None = None,
+    use_cited_by: bool | None = None,
+) -> list[dict]:
+    """Top ``limit`` recommendations for a reader of ``paper_ids``.
+
+    ``read_at`` holds the matching read timestamps. Returns dicts with id,
+    title, citation_count, categories, update_date, reason and score.
+    ``use_cited_by`` defaults to whether the data DB has paper_cited_by
+    (data/process_cited_by.py); otherwise papers.citations is unnested.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"unknown strategy {strategy!r}")
+    paper_ids = [str(p) for p in paper_ids]
+    if not paper_ids:
+        return []
+    weights = read_weights(read_at, now).tolist()
+    if use_cited_by is None:
+        use_cited_by = has_data_table("paper_cited_by")
+
+    ctes = ["""
+        reads AS (
+            SELECT unnest(?::VARCHAR[]) AS paper_id, unnest(?::DOUBLE[]) AS weight
+        ),
+        live AS (
+            SELECT id FROM papers WHERE deleted IS NOT TRUE
+        )
+    """]
+    params: list = [paper_ids, weights]
+    branches = []
+
+    if strategy in ("citation_graph", "hybrid"):
+        ctes.append(f"""
+            cited AS (
+                SELECT e.paper_id,
+                       {CITATION_BASE} + {CITATION_BOOST} * SUM(e.weight) AS score,
+                       ? AS reason
+                FROM ({_citation_edges_sql(use_cited_by)}) e
+                ANTI JOIN reads r ON r.paper_id = e.paper_id
+                GROUP BY e.paper_id
+            ),
+            cite_candidates AS (
+                SELECT c.* FROM cited c
+                SEMI JOIN live l ON l.id = c.paper_id
+            )
+        """)
+        params.append(CITATION_REASON)
+        branches.append("SELECT * FROM cite_candidates")
+
+    if strategy in ("topic_similarity", "hybrid"):
+        ctes.append(f"""
+            topic_weights AS (
+                SELECT pm.microtopic_id, SUM(r.weight) AS weight
+                FROM paper_microtopics pm
+                INNER JOIN reads r ON r.paper_id = pm.paper_id
+                GROUP BY pm.microtopic_id
+            ),
+            topic_candidates AS (
+                SELECT pm.paper_id,
+                       {TOPIC_BASE} + {TOPIC_BOOST} * SUM(t.weight) AS score,
+                       ? AS reason
+                FROM paper_microtopics pm
+                INNER JOIN topic_weights t ON t.microtopic_id = pm.microtopic_id
+                ANTI JOIN reads r ON r.paper_id = pm.paper_id
+                SEMI JOIN live l ON l.id = pm.paper_id
+                GROUP BY pm.paper_id
+            )
+        """)
+        params.append(TOPIC_REASON)
+        if strategy == "hybrid":
+            branches.append("""
+                SELECT t.* FROM topic_candidates t
+                ANTI JOIN cite_candidates c ON c.paper_id = t.paper_id
+                WHERE (SELECT COUNT(*) FROM cite_candidates) < ?
+            """)
+            params.append(2 * limit)
+        else:
+            branches.append("SELECT * FROM topic_candidates")
+
+    ctes.append(f"scored AS ({' UNION ALL '.join(branches)})")
+    db.execute(f"""
+        WITH {', '.join(ctes)}
+        SELECT
+            p.id,
+            p.title,
+            COALESCE(p.citation_count, 0)::INTEGER AS citation_count,
+            p.categories,
+            p.update_date,
+            s.reason,
+            s.score
+        FROM scored s
+        INNER JOIN papers p ON p.id = s.paper_id
+        ORDER BY s.score DESC, citation_count DESC, p.id
+        LIMIT ?
+    """, params + [limit])
+    return fetch_records(db)
@@ -0,0 +1,52 @@
+import hmac
+import os
+
+import duckdb
+from flask import Blueprint, jsonify, request
+from src.database import data_db_manager
+
+admin_bp = Blueprint("admin", __name__)
+
+
+def _admin_token_valid() -> bool:
+    """Compare X-Admin-Token with ADMIN_TOKEN; admin routes are off when it is unset."""
+    expected = os.getenv("ADMIN_TOKEN")
+    supplied = request.headers.get("X-Admin-Token", "")
+    return bool(expected) and hmac.compare_digest(supplied.encode(), expected.encode())
+
+
+@admin_bp.route("/api/admin/data-db/reload", methods=["POST"])
+def reload_data_db():
+    """Swap in a new data DB snapshot without restarting.
+
+    Body (optional): {"path": "data-2025-01.db"}, a file in the same
+    directory as the current data DB. Without a path the current file is
+    reopened, e.g. after it was replaced with ``mv``.
+    Requests already running finish on the old snapshot.
+    """
+    if not _admin_token_valid():
+        return jsonify({"error": "Forbidden"}), 403
+
+    data = request.get_json(silent=True) or {}
+    path = data.get("path")
+    if path is not None:
+        if not isinstance(path, str) or not path:
+            return jsonify({"error": "path must be a non-empty string"}), 400
+        directory = os.path.dirname(os.path.abspath(data_db_manager.path))
+        path = os.path.abspath(os.path.join(directory, path))
+        if os.path.dirname(path) != directory:
+            return jsonify({"error": "path must be in the data DB directory"}), 400
+        if not os.path.isfile(path):
+            return jsonify({"error": "Snapshot not found"}), 404
+
+    previous = data_db_manager.stats()["version"]
+    try:
+        version = data_db_manager.swap(path)
+    except duckdb.Error as exc:
+        return jsonify({"error": f"Could not open snapshot: {exc}"}), 400
+
+    return jsonify({
+        "path": data_db_manager.path,
+        "previous_version": previous,
+        "version": version,
+    }), 200
@@ -1,12 +1,27 @@
 import datetime
 
 from flask import Blueprint, request, jsonify
-from src.database import get_data_db as get_db, df_to_json_serializable
-from src.cache import cache
+from src.database import (
+    get_data_db as get_db, df_to_json_serializable, has_data_table, query_response, user_table, wants_arrow,
+)
+from src.cache import cache, data_cache_key, single_flight
+from src.filters import subject_filter
+from src.sql_safety import InvalidParameter, safe_int
 
 analytics = Blueprint("analytics", __name__)
 
 
+def _rollup_available() -> bool:
+    """True once data/process_rollups.py has built the analytics cube.
+
+    The cube holds counts and citation sums per (year, month, domain, topic,
+    primary category, citation bucket) over non-deleted papers. Endpoints
+    answer from it when their filters map onto those dimensions and run
+    the live GROUP BY over papers otherwise.
+    """
+    return has_data_table('analytics_rollup')
+
+
 @analytics.route("/api/analytics/papers/over-time", methods=["GET"])
 def papers_over_time():
     """Get paper counts and citation totals over time."""
@@ -22,6 +37,20 @@ def papers_over_time():
     else:  # year
         date_trunc = "strftime(update_date, '%Y')"
 
+    if not subject and not microtopic_id and _rollup_available():
+        period_col = 'month' if group_by == 'month' else 'year'
+        cursor = db.execute(f"""
+            SELECT
+                {period_col} as period,
+                SUM(paper_count)::BIGINT as count,
+                SUM(citation_sum) as total_citations
+            FROM analytics_rollup
+            WHERE {period_col} IS NOT NULL
+            GROUP BY period
+            ORDER BY period
+        """)
+        return query_response(cursor, "data", group_by=group_by)
+
     # Build query based on filters
     if microtopic_id:
         query = f"""
@@ -49,17 +78,13 @@ def papers_over_time():
         params = []
 
     if subject:
-        query += " AND categories LIKE ?"
-        params.append(f"%{subject}%")
+        filter_clause, filter_params = subject_filter(subject, 'p.id' if microtopic_id else 'id')
+        query += filter_clause
+        params.extend(filter_params)
 
     query += " GROUP BY period ORDER BY period"
 
-    result = db.execute(query, params).fetchdf()
-
-    return jsonify({
-        "data": df_to_json_serializable(result),
-        "group_by": group_by
-    })
+    return query_response(db.execute(query, params), "data", group_by=group_by)
 
 
 @analytics.route("/api/analytics/citations/distribution", methods=["GET"])
@@ -70,6 +95,17 @@ def citations_distribution():
     subject = request.args.get('subject')
     microtopic_id = request.args.get('microtopic_id')
 
+    if not subject and not microtopic_id and _rollup_available():
+        cursor = db.execute("""
+            SELECT
+                citation_bucket as citation_range,
+                SUM(paper_count)::BIGINT as paper_count
+            FROM analytics_rollup
+            GROUP BY citation_range
+            ORDER BY MIN(min_citation)
+        """)
+        return query_response(cursor, "distribution")
+
     # Build query with filters
     if microtopic_id:
         base_query = """
@@ -84,13 +120,14 @@ def citations_distribution():
         base_query = """
             SELECT citation_count
             FROM papers
-            WHERE deleted = false OR deleted IS NULL
+            WHERE (deleted = false OR deleted IS NULL)
         """
         params = []
 
     if subject:
-        base_query += " AND categories LIKE ?"
-        params.append(f"%{subject}%")
+        filter_clause, filter_params = subject_filter(subject, 'p.id' if microtopic_id else 'id')
+        base_query += filter_clause
+        params.extend(filter_params)
 
     query = f"""
         WITH paper_citations AS ({base_query})
@@ -114,9 +151,7 @@ def citations_distribution():
         ORDER BY MIN(citation_count)
     """
 
-    result = db.execute(query, params).fetchdf()
-
-    return jsonify({"distribution": df_to_json_serializable(result)})
+    return query_response(db.execute(query, params), "distribution")
 
 
 @analytics.route("/api/analytics/subjects", methods=["GET"])
@@ -133,20 +168,33 @@ def subjects_breakdown():
         return jsonify({"error": "limit must be an integer"}), 400
 
     # Extract primary category (first in the list) and calculate avg citations
-    result = db.execute("""
-        SELECT
-            primary_topic_name as subject,
-            COUNT(*) as paper_count,
-            ROUND(AVG(citation_count), 0) as avg_citations
-        FROM papers
-        WHERE primary_topic_name IS NOT NULL
-        AND (deleted = false OR deleted IS NULL)
-        GROUP BY subject
-        ORDER BY paper_count DESC
-        LIMIT ?
-    """, [limit]).fetchdf()
+    if _rollup_available():
+        cursor = db.execute("""
+            SELECT
+                topic as subject,
+                SUM(paper_count)::BIGINT as paper_count,
+                ROUND(SUM(citation_sum) / NULLIF(SUM(citation_n), 0), 0) as avg_citations
+            FROM analytics_rollup
+            WHERE topic IS NOT NULL
+            GROUP BY subject
+            ORDER BY paper_count DESC
+            LIMIT ?
+        """, [limit])
+    else:
+        cursor = db.execute("""
+            SELECT
+                primary_topic_name as subject,
+                COUNT(*) as paper_count,
+                ROUND(AVG(citation_count), 0) as avg_citations
+            FROM papers
+            WHERE primary_topic_name IS NOT NULL
+            AND (deleted = false OR deleted IS NULL)
+            GROUP BY subject
+            ORDER BY paper_count DESC
+            LIMIT ?
+        """, [limit])
 
-    return jsonify({"subjects": df_to_json_serializable(result)})
+    return query_response(cursor, "subjects")
 
 
 @analytics.route("/api/analytics/authors/top", methods=["GET"])
@@ -172,79 +220,102 @@ def top_authors():
         sort_by = 'h_index'
 
     # If subject filter, join with papers
-    if subject:
-        result = db.execute(f"""
+    if subject and has_data_table('paper_authors'):
+        # Hash joins through the author index instead of matching every
+        # author's paper list against every paper.
+        filter_clause, filter_params = subject_filter(subject, 'p.id', 'p.categories')
+        cursor = db.execute(f"""
+            SELECT author_id, name, h_index, works_count, cited_by_count
+            FROM authors
+            WHERE {sort_by} IS NOT NULL
+            AND author_id IN (
+                SELECT pa.author_id
+                FROM paper_authors pa
+                INNER JOIN papers p ON p.id = pa.paper_id
+                WHERE (p.deleted = false OR p.deleted IS NULL)
+                {filter_clause}
+            )
+            ORDER BY {sort_by} DESC
+            LIMIT ?
+        """, filter_params + [limit])
+    elif subject:
+        filter_clause, filter_params = subject_filter(subject, 'p.id', 'p.categories')
+        cursor = db.execute(f"""
             SELECT DISTINCT
                 a.author_id, a.name, a.h_index, a.works_count, a.cited_by_count
             FROM authors a
             INNER JOIN papers p ON p.id = ANY(a.paper_dois)
-            WHERE p.categories LIKE ?
-            AND a.{sort_by} IS NOT NULL
+            WHERE a.{sort_by} IS NOT NULL
+            {filter_clause}
             AND (p.deleted = false OR p.deleted IS NULL)
             ORDER BY a.{sort_by} DESC
             LIMIT ?
-        """, [f"%{subject}%", limit]).fetchdf()
+        """, filter_params + [limit])
     else:
-        result = db.execute(f"""
+        cursor = db.execute(f"""
             SELECT author_id, name, h_index, works_count, cited_by_count
             FROM authors
             WHERE {sort_by} IS NOT NULL
             ORDER BY {sort_by} DESC
             LIMIT ?
-        """, [limit]).fetchdf()
+        """, [limit])
 
-    return jsonify({
-        "top_authors": df_to_json_serializable(result),
-        "sorted_by": sort_by
-    })
+    return query_response(cursor, "top_authors", sorted_by=sort_by)
 
 
 @analytics.route("/api/analytics/velocity", methods=["GET"])
+@cache.cached(timeout=300, make_cache_key=data_cache_key)
 def submission_velocity():
     """Paper submission velocity over recent time periods."""
     db = get_db()
 
     period = request.args.get('period', 'week')
     subject = request.args.get('subject')
-    lookback = int(request.args.get('lookback', 12))
-
-    # Calculate period dates
+    try:
+        lookback = safe_int(request.args.get('lookback'), default=12, minimum=0, maximum=1000)
+    except InvalidParameter as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    # Periods are 7 or 30 days ending today, stepping back one period at a
+    # time. Both ends are inclusive, so a paper dated on a boundary counts
+    # in the two periods that share it.
+    days = 7 if period == 'week' else 30
     today = datetime.date.today()
-    periods = []
-
-    if period == 'week':
-        for i in range(lookback):
-            period_end = today - datetime.timedelta(weeks=i)
-            period_start = period_end - datetime.timedelta(days=7)
-            periods.append((period_start, period_end))
-    else:  # month
-        for i in range(lookback):
-            period_end = today - datetime.timedelta(days=30*i)
-            period_start = period_end - datetime.timedelta(days=30)
-            periods.append((period_start, period_end))
-
-    # Query each period
-    velocity_data = []
-    for period_start, period_end in reversed(periods):
-        query = """
-            SELECT COUNT(*) as count
-            FROM papers
-            WHERE update_date BETWEEN ? AND ?
-            AND (deleted = false OR deleted IS NULL)
-        """
-        params = [period_start.isoformat(), period_end.isoformat()]
-
-        if subject:
-            query += " AND categories LIKE ?"
-            params.append(f"%{subject}%")
 
-        count = db.execute(query, params).fetchone()[0]
+    filter_clause, filter_params = subject_filter(subject) if subject else ("", [])
 
-        velocity_data.append({
-            'period_start': period_start.isoformat(),
-            'period_end': period_end.isoformat(),
-            'count': count
-        })
+    # Papers are counted per day once over the whole window, then summed
+    # into the generated periods: one scan instead of one per period.
+    rows = db.execute(f"""
+        WITH periods AS (
+            SELECT
+                i,
+                CAST(? AS DATE) - CAST(i * ? + ? AS INTEGER) as period_start,
+                CAST(? AS DATE) - CAST(i * ? AS INTEGER) as period_end
+            FROM generate_series(0, ? - 1) t(i)
+        ),
+        daily AS (
+            SELECT update_date as day, COUNT(*) as count
+            FROM papers
+            WHERE update_date BETWEEN (SELECT MIN(period_start) FROM periods) AND ?
+            AND (deleted = false OR deleted IS NULL)
+            {filter_clause}
+            GROUP BY day
+        )
+        SELECT
+            strftime(period_start, '%Y-%m-%d') as period_start,
+            strftime(period_end, '%Y-%m-%d') as period_end,
+            COALESCE(SUM(daily.count), 0)::BIGINT as count
+        FROM periods
+        LEFT JOIN daily ON daily.day BETWEEN period_start AND period_end
+        GROUP BY i, periods.period_start, periods.period_end
+        ORDER BY i DESC
+    """, [today, days, days, today, days, lookback, today, *filter_params]).fetchall()
+
+    velocity_data = [
+        {'period_start': start, 'period_end': end, 'count': count}
+        for start, end, count in rows
+    ]
 
     # Calculate statistics
     counts = [v['count'] for v in velocity_data]
@@ -264,7 +335,7 @@ def submission_velocity():
 
 
 @analytics.route("/api/analytics/hot-papers", methods=["GET"])
-@cache.cached(timeout=300, query_string=True)
+@single_flight.cached(timeout=300, stale_ttl=600, unless=wants_arrow)
 def hot_papers():
     """Recently published papers with high citation growth."""
     db = get_db()
@@ -281,7 +352,11 @@ def hot_papers():
     except ValueError:
         return jsonify({"error": "limit must be an integer"}), 400
 
-    user_id = request.args.get('user_id')  # Optional: filter out user's read papers
+    # Optional: filter out the user's read papers
+    try:
+        user_id = safe_int(request.args.get('user_id'), default=None)
+    except InvalidParameter as exc:
+        return jsonify({"error": str(exc)}), 400
 
     # Default to 2 years ago
     if not since:
@@ -310,27 +385,24 @@ def hot_papers():
     """
     params = [since]
 
-    # Exclude papers the user has already read
-    if user_id:
-        query += """
+    # Exclude papers the user has already read (user DB table, joined in place)
+    if user_id is not None:
+        query += f"""
             AND id NOT IN (
-                SELECT paper_id FROM user_read_history WHERE user_id = ?
+                SELECT paper_id FROM {user_table('user_read_history')} WHERE user_id = ?
             )
         """
-        params.append(int(user_id))
+        params.append(user_id)
 
     if subject:
-        query += " AND categories LIKE ?"
-        params.append(f"%{subject}%")
+        filter_clause, filter_params = subject_filter(subject)
+        query += filter_clause
+        params.extend(filter_params)
 
     query += f" ORDER BY {sort_by} DESC LIMIT ?"
     params.append(limit)
 
-    result = db.execute(query, params).fetchdf()
-
-    return jsonify({
-        "papers": df_to_json_serializable(result)
-    })
+    return query_response(db.execute(query, params), "papers")
 
 
 @analytics.route("/api/analytics/graph", methods=["GET"])
@@ -359,8 +431,9 @@ def citation_graph():
     params = []
 
     if subject:
-        query += " AND categories LIKE ?"
-        params.append(f"%{subject}%")
+        filter_clause, filter_params = subject_filter(subject)
+        query += filter_clause
+        params.extend(filter_params)
 
     query += " ORDER BY citation_count DESC LIMIT ?"
     params.append(limit)
@@ -422,22 +495,37 @@ def domains():
     except ValueError:
         return jsonify({"error": "limit must be an integer"}), 400
 
-    result = db.execute("""
-        SELECT
-            primary_domain_name as domain,
-            COUNT(*) as paper_count,
-            ROUND(AVG(citation_count), 0) as avg_citations,
-            SUM(citation_count) as total_citations
-        FROM papers
-        WHERE primary_domain_name IS NOT NULL
-        AND primary_domain_name != ''
-        AND (deleted = false OR deleted IS NULL)
-        GROUP BY primary_domain_name
-        ORDER BY paper_count DESC
-        LIMIT ?
-    """, [limit]).fetchdf()
+    if _rollup_available():
+        cursor = db.execute("""
+            SELECT
+                domain,
+                SUM(paper_count)::BIGINT as paper_count,
+                ROUND(SUM(citation_sum) / NULLIF(SUM(citation_n), 0), 0) as avg_citations,
+                SUM(citation_sum) as total_citations
+            FROM analytics_rollup
+            WHERE domain IS NOT NULL
+            AND domain != ''
+            GROUP BY domain
+            ORDER BY paper_count DESC
+            LIMIT ?
+        """, [limit])
+    else:
+        cursor = db.execute("""
+            SELECT
+                primary_domain_name as domain,
+                COUNT(*) as paper_count,
+                ROUND(AVG(citation_count), 0) as avg_citations,
+                SUM(citation_count) as total_citations
+            FROM papers
+            WHERE primary_domain_name IS NOT NULL
+            AND primary_domain_name != ''
+            AND (deleted = false OR deleted IS NULL)
+            GROUP BY primary_domain_name
+            ORDER BY paper_count DESC
+            LIMIT ?
+        """, [limit])
 
-    return jsonify({"domains": df_to_json_serializable(result)})
+    return query_response(cursor, "domains")
 
 
 @analytics.route("/api/analytics/topics", methods=["GET"])
@@ -457,20 +545,36 @@ def topics_in_domain():
     if not domain:
         return jsonify({"error": "domain query param is required"}), 400
 
-    result = db.execute("""
-        SELECT
-            primary_topic_name as topic,
-            COUNT(*) as paper_count,
-            ROUND(AVG(citation_count), 0) as avg_citations,
-            SUM(citation_count) as total_citations
-        FROM papers
-        WHERE primary_domain_name = ?
-        AND primary_topic_name IS NOT NULL
-        AND primary_topic_name != ''
-        AND (deleted = false OR deleted IS NULL)
-        GROUP BY primary_topic_name
-        ORDER BY paper_count DESC
-        LIMIT ?
-    """, [domain, limit]).fetchdf()
+    if _rollup_available():
+        cursor = db.execute("""
+            SELECT
+                topic,
+                SUM(paper_count)::BIGINT as paper_count,
+                ROUND(SUM(citation_sum) / NULLIF(SUM(citation_n), 0), 0) as avg_citations,
+                SUM(citation_sum) as total_citations
+            FROM analytics_rollup
+            WHERE domain = ?
+            AND topic IS NOT NULL
+            AND topic != ''
+            GROUP BY topic
+            ORDER BY paper_count DESC
+            LIMIT ?
+        """, [domain, limit])
+    else:
+        cursor = db.execute("""
+            SELECT
+                primary_topic_name as topic,
+                COUNT(*) as paper_count,
+                ROUND(AVG(citation_count), 0) as avg_citations,
+                SUM(citation_count) as total_citations
+            FROM papers
+            WHERE primary_domain_name = ?
+            AND primary_topic_name IS NOT NULL
+            AND primary_topic_name != ''
+            AND (deleted = false OR deleted IS NULL)
+            GROUP BY primary_topic_name
+            ORDER BY paper_count DESC
+            LIMIT ?
+        """, [domain, limit])
 
-    return jsonify({"topics": df_to_json_serializable(result)})
+    return query_response(cursor, "topics")
@@ -1,5 +1,8 @@
 from flask import Blueprint, jsonify
-from src.database import get_data_db as get_db
+from src.auth import auth_cache_stats
+from src.cache import cache, single_flight, user_caches
+from src.database import get_data_db as get_db, data_db_manager
+from src.precompute import recommendation_queue
 
 
 health = Blueprint("health", __name__)
@@ -20,7 +23,13 @@ def health_check():
             "database": "connected",
             "paper_count": paper_count,
             "author_count": author_count,
-            "microtopic_count": microtopic_count
+            "microtopic_count": microtopic_count,
+            "data_db_pool": data_db_manager.stats(),
+            "user_cache": user_caches.stats(),
+            "single_flight": single_flight.stats(),
+            "auth_cache": auth_cache_stats(),
+            "recommendation_queue": recommendation_queue.stats(),
+            "cache": cache.cache.stats() if hasattr(cache.cache, "stats") else {}
         }), 200
     except Exception as e:
         return jsonify({
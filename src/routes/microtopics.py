@@ -2,8 +2,10 @@ import json
 import re
 
 from flask import Blueprint, request, jsonify
-from src.cache import cache
-from src.database import get_data_db as get_db, df_to_json_serializable
+from src.cache import cache, data_cache_key, single_flight
+from src.cross_citations import cross_citation_count, cross_citation_counts
+from src.database import get_data_db as get_db, df_to_json_serializable, has_data_table, query_response, wants_arrow
+from src.pagination import decode_cursor, keyset_condition, order_by, row_cursor
 from src.sql_safety import (
     InvalidParameter,
     escape_like,
@@ -20,7 +22,7 @@ _MICROTOPIC_ID_RE = re.compile(r"^[A-Za-z0-9_\-]{1,64}$")
 
 
 @microtopics_bp.route("/api/microtopics", methods=["GET"])
-@cache.cached(timeout=300, query_string=True)
+@cache.cached(timeout=300, make_cache_key=data_cache_key)
 def get_microtopics():
     """List microtopics with filtering."""
     db = get_db()
@@ -78,8 +80,105 @@ def get_microtopics():
     })
 
 
+def _top_papers(db, microtopic_id: str) -> list[dict]:
+    """The microtopic's ten most cited non-deleted papers."""
+    top_papers_result = db.execute("""
+        SELECT DISTINCT p.id, p.title, p.citation_count, p.update_date, p.authors
+        FROM papers p
+        INNER JOIN paper_microtopics pm ON p.id = pm.paper_id
+        WHERE pm.microtopic_id = ?
+        AND (p.deleted = false OR p.deleted IS NULL)
+        ORDER BY p.citation_count DESC
+        LIMIT 10
+    """, [microtopic_id]).fetchdf()
+    return df_to_json_serializable(top_papers_result)
+
+
+def _empty_detail() -> dict:
+    """Detail fields for a microtopic without any (non-deleted) papers."""
+    return {
+        'stats': {
+            'total_citations': 0,
+            'avg_citations': 0,
+            'median_citations': 0,
+            'max_citations': 0,
+            'paper_count': 0,
+            'year_range': '',
+            'recent_growth_pct': 0
+        },
+        'papers_by_year': [],
+        'citation_distribution': [],
+        'top_authors': [],
+        'top_papers': [],
+    }
+
+
+def _precomputed_detail(db, microtopic_id: str, current_year: int) -> dict:
+    """Detail fields read from the tables built by data/process_microtopic_stats.py."""
+    stats = db.execute("""
+        SELECT paper_count, total_citations, avg_citations, median_citations,
+               max_citations, min_year, max_year, unique_author_count
+        FROM microtopic_stats
+        WHERE microtopic_id = ?
+    """, [microtopic_id]).fetchone()
+
+    if stats is None:
+        return _empty_detail()
+
+    (paper_count, total_citations, avg_citations, median_citations,
+     max_citations, min_year, max_year, unique_author_count) = stats
+
+    papers_by_year = db.execute("""
+        SELECT year, count, total_citations
+        FROM microtopic_year_series
+        WHERE microtopic_id = ?
+        ORDER BY year
+    """, [microtopic_id]).fetchall()
+    recent_count = sum(count for year, count, _ in papers_by_year if int(year) >= current_year - 2)
+
+    citation_distribution = db.execute("""
+        SELECT citation_bucket, count
+        FROM microtopic_citation_hist
+        WHERE microtopic_id = ?
+        ORDER BY citation_bucket
+    """, [microtopic_id]).fetchall()
+
+    top_authors = db.execute("""
+        SELECT name, paper_count, total_citations
+        FROM microtopic_top_authors
+        WHERE microtopic_id = ?
+        ORDER BY rank
+    """, [microtopic_id]).fetchall()
+
+    return {
+        'stats': {
+            'total_citations': total_citations,
+            'avg_citations': avg_citations,
+            'median_citations': median_citations,
+            'max_citations': max_citations,
+            'paper_count': paper_count,
+            'year_range': f"{min_year}-{max_year}",
+            'recent_growth_pct': round(recent_count / paper_count * 100, 1),
+            'unique_author_count': unique_author_count
+        },
+        'papers_by_year': [
+            {'year': year, 'count': count, 'total_citations': citations}
+            for year, count, citations in papers_by_year
+        ],
+        'citation_distribution': [
+            {'citation_bucket': bucket, 'count': count}
+            for bucket, count in citation_distribution
+        ],
+        'top_authors': [
+            {'name': name, 'paper_count': count, 'total_citations': citations}
+            for name, count, citations in top_authors
+        ],
+        'top_papers': _top_papers(db, microtopic_id),
+    }
+
+
 @microtopics_bp.route("/api/microtopics/<microtopic_id>", methods=["GET"])
-@cache.cached(timeout=300, query_string=True)
+@single_flight.cached(timeout=300, stale_ttl=600)
 def get_microtopic_detail(microtopic_id):
     """Full detail for a single microtopic including aggregated statistics."""
     db = get_db()
@@ -109,6 +208,10 @@ def get_microtopic_detail(microtopic_id):
     import datetime
     current_year = datetime.datetime.now().year
 
+    if has_data_table('microtopic_stats'):
+        microtopic.update(_precomputed_detail(db, microtopic_id, current_year))
+        return jsonify(microtopic)
+
     stats = db.execute("""
         SELECT
             COUNT(DISTINCT p.id) as paper_count,
@@ -150,7 +253,8 @@ def get_microtopic_detail(microtopic_id):
         # Calculate unique authors (single pass)
         unique_authors = set()
         author_counts = {}
-        for authors_str in papers['authors'].dropna():
+        with_authors = papers.dropna(subset=['authors'])
+        for authors_str, citations in zip(with_authors['authors'], with_authors['citation_count'].fillna(0)):
             if authors_str:
                 for author in str(authors_str).split(',')[:3]:
                     author = author.strip()
@@ -159,6 +263,7 @@ def get_microtopic_detail(microtopic_id):
                         if author not in author_counts:
                             author_counts[author] = {'count': 0, 'citations': 0}
                         author_counts[author]['count'] += 1
+                        author_counts[author]['citations'] += int(citations)
 
         microtopic['stats'] = {
             'total_citations': total_citations,
@@ -208,37 +313,15 @@ def get_microtopic_detail(microtopic_id):
 
         microtopic['top_authors'] = top_authors
 
-        # Top papers (fetch directly from database)
-        top_papers_result = db.execute("""
-            SELECT DISTINCT p.id, p.title, p.citation_count, p.update_date, p.authors
-            FROM papers p
-            INNER JOIN paper_microtopics pm ON p.id = pm.paper_id
-            WHERE pm.microtopic_id = ?
-            AND (p.deleted = false OR p.deleted IS NULL)
-            ORDER BY p.citation_count DESC
-            LIMIT 10
-        """, [microtopic_id]).fetchdf()
-        microtopic['top_papers'] = df_to_json_serializable(top_papers_result)
+        microtopic['top_papers'] = _top_papers(db, microtopic_id)
     else:
-        microtopic['stats'] = {
-            'total_citations': 0,
-            'avg_citations': 0,
-            'median_citations': 0,
-            'max_citations': 0,
-            'paper_count': 0,
-            'year_range': '',
-            'recent_growth_pct': 0
-        }
-        microtopic['papers_by_year'] = []
-        microtopic['citation_distribution'] = []
-        microtopic['top_authors'] = []
-        microtopic['top_papers'] = []
+        microtopic.update(_empty_detail())
 
     return jsonify(microtopic)
 
 
 @microtopics_bp.route("/api/microtopics/<microtopic_id>/papers", methods=["GET"])
-@cache.cached(timeout=300, query_string=True)
+@cache.cached(timeout=300, make_cache_key=data_cache_key, unless=wants_arrow)
 def get_microtopic_papers(microtopic_id):
     """Papers belonging to a microtopic, paginated.
 
@@ -248,6 +331,8 @@ def get_microtopic_papers(microtopic_id):
       * `sort_by` / `sort_order` are matched against fixed allowlists; the
         ORDER BY clause is then assembled from constants only — no string
         from `request.args` is ever interpolated into the SQL.
+      * `cursor` (keyset pagination, replaces OFFSET when given) decodes to
+        a (sort value, id) pair that is bound as parameters.
     """
     if not _MICROTOPIC_ID_RE.match(microtopic_id or ""):
         return jsonify({"error": "invalid microtopic_id"}), 400
@@ -277,7 +362,19 @@ def get_microtopic_papers(microtopic_id):
         'update_date': 'p.update_date',
         'score': 'pm.score',
     }
-    order_clause = f"{_ORDER_CLAUSES[sort_by]} {sort_order}"
+    sort_expr = _ORDER_CLAUSES[sort_by]
+
+    keyset_clause, params, offset = "", [microtopic_id], (page - 1) * per_page
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            last_value, last_id = decode_cursor(cursor, sort_by, sort_order)
+        except InvalidParameter as exc:
+            return jsonify({"error": str(exc)}), 400
+        keyset_sql, keyset_params = keyset_condition(sort_expr, 'p.id', sort_order, last_value, last_id)
+        keyset_clause = f"AND {keyset_sql}"
+        params.extend(keyset_params)
+        offset = 0
 
     # Get total count (use DISTINCT to avoid counting duplicates)
     total = db.execute("""
@@ -297,16 +394,18 @@ def get_microtopic_papers(microtopic_id):
         INNER JOIN paper_microtopics pm ON p.id = pm.paper_id
         WHERE pm.microtopic_id = ?
         AND (p.deleted = false OR p.deleted IS NULL)
-        ORDER BY {order_clause}
+        {keyset_clause}
+        ORDER BY {order_by(sort_expr, 'p.id', sort_order)}
         LIMIT ? OFFSET ?
-    """, [microtopic_id, per_page, (page - 1) * per_page]).fetchdf()
+    """, params + [per_page + 1, offset])
 
-    return jsonify({
-        "papers": df_to_json_serializable(result),
-        "page": page,
-        "per_page": per_page,
-        "total": total
-    })
+    def make_cursor(row):
+        return row_cursor(row, sort_by, ('id',), sort_by, sort_order)
+
+    return query_response(
+        result, "papers", paginate=(per_page, make_cursor),
+        page=page, per_page=per_page, total=total,
+    )
 
 
 @microtopics_bp.route("/api/microtopics/compare", methods=["GET"])
@@ -421,7 +520,7 @@ def compare_microtopics():
     overlap = {
         'shared_paper_count': shared_paper_count,
         'shared_author_count': shared_author_count,
-        'cross_citation_count': 0,  # Kept at 0 as it's expensive to calculate
+        'cross_citation_count': cross_citation_count(db, topic_a_id, topic_b_id),
         'jaccard_similarity': round(jaccard_similarity, 3),
         'shared_papers': shared_papers_list
     }
@@ -506,8 +605,135 @@ def get_topic_data(db, microtopic_id):
     return topic
 
 
+def _precomputed_edges(db, topic_ids: list, min_edge_weight: float) -> list[dict]:
+    """Paper-overlap edges among `topic_ids` read from microtopic_edges.
+
+    The table (data/process_microtopic_edges.py) stores each pair once with
+    a < b; edges are re-oriented and ordered by the nodes' position in
+    `topic_ids`, matching the live computation.
+    """
+    position = {topic_id: i for i, topic_id in enumerate(topic_ids)}
+    placeholders = ','.join(['?'] * len(topic_ids))
+    rows = db.execute(f"""
+        SELECT a, b, shared, weight
+        FROM microtopic_edges
+        WHERE a IN ({placeholders})
+        AND b IN ({placeholders})
+        AND weight >= ?
+    """, [*topic_ids, *topic_ids, min_edge_weight]).fetchall()
+
+    edges = []
+    for a, b, shared, weight in rows:
+        source, target = (a, b) if position[a] < position[b] else (b, a)
+        edges.append({
+            'source': source,
+            'target': target,
+            'weight': weight,
+            'shared_papers': shared,
+            'cross_citations': 0
+        })
+    edges.sort(key=lambda e: (position[e['source']], position[e['target']]))
+    return edges
+
+
+def _live_edges(db, topic_ids: list, min_edge_weight: float) -> list[dict]:
+    """Paper-overlap edges among `topic_ids` computed from paper_microtopics."""
+    placeholders = ','.join(['?'] * len(topic_ids))
+
+    # OPTIMIZED: Batch query for all paper-topic relationships at once
+    all_paper_topics = db.execute(f"""
+        SELECT microtopic_id, paper_id
+        FROM paper_microtopics
+        WHERE microtopic_id IN ({placeholders})
+    """, topic_ids).fetchdf()
+
+    # Group by topic for O(1) lookup
+    topic_papers = {}
+    for _, row in all_paper_topics.iterrows():
+        topic_id = row['microtopic_id']
+        if topic_id not in topic_papers:
+            topic_papers[topic_id] = set()
+        topic_papers[topic_id].add(row['paper_id'])
+
+    # Calculate edges
+    edges = []
+    for i, topic_a in enumerate(topic_ids):
+        for topic_b in topic_ids[i+1:]:
+            papers_a = topic_papers.get(topic_a, set())
+            papers_b = topic_papers.get(topic_b, set())
+
+            if not papers_a or not papers_b:
+                continue
+
+            shared_papers = papers_a.intersection(papers_b)
+            shared_count = len(shared_papers)
+
+            if shared_count > 0:
+                # Jaccard similarity
+                jaccard = shared_count / len(papers_a.union(papers_b))
+
+                # Paper-overlap weight; cross-citations are blended in by the caller
+                weight = jaccard * 0.3 + (shared_count / max(len(papers_a), len(papers_b))) * 0.7
+
+                if weight >= min_edge_weight:
+                    edges.append({
+                        'source': topic_a,
+                        'target': topic_b,
+                        'weight': weight,
+                        'shared_papers': shared_count,
+                        'cross_citations': 0
+                    })
+
+    return edges
+
+
+def _add_cross_citations(
+    edges: list[dict],
+    cross: dict[frozenset, int],
+    sizes: dict[str, int],
+    citation_weight: float,
+    min_edge_weight: float,
+) -> list[dict]:
+    """Fill in cross_citations and, with citation_weight > 0, blend them into weight.
+
+    The blended weight is
+        (1 - citation_weight) * overlap weight
+        + citation_weight * min(1, cross_citations / (size_a + size_b))
+    so topics that cite each other heavily are linked even without shared
+    papers. `edges` must hold every overlap edge when blending, since the
+    final weight is what min_edge_weight is checked against.
+    """
+    position = {topic_id: i for i, topic_id in enumerate(sizes)}
+    by_pair = {frozenset((e['source'], e['target'])): e for e in edges}
+
+    if citation_weight > 0:
+        for pair in cross:
+            if pair not in by_pair:
+                source, target = sorted(pair, key=position.get)
+                by_pair[pair] = {
+                    'source': source,
+                    'target': target,
+                    'weight': 0.0,
+                    'shared_papers': 0,
+                    'cross_citations': 0
+                }
+
+    for pair, edge in by_pair.items():
+        edge['cross_citations'] = cross.get(pair, 0)
+        if citation_weight > 0:
+            size = max(sizes[edge['source']] + sizes[edge['target']], 1)
+            citation_score = min(1.0, edge['cross_citations'] / size)
+            edge['weight'] = edge['weight'] * (1 - citation_weight) + citation_score * citation_weight
+
+    if citation_weight == 0:
+        return edges
+    blended = [e for e in by_pair.values() if e['weight'] >= min_edge_weight]
+    blended.sort(key=lambda e: (position[e['source']], position[e['target']]))
+    return blended
+
+
 @microtopics_bp.route("/api/microtopics/graph", methods=["GET"])
-@cache.cached(timeout=300, query_string=True)
+@single_flight.cached(timeout=300, stale_ttl=600)
 def microtopics_graph():
     """Returns a graph of microtopics as nodes and their relationships as edges."""
     db = get_db()
@@ -528,6 +754,11 @@ def microtopics_graph():
     except (TypeError, ValueError):
         return jsonify({"error": "min_edge_weight must be a number"}), 400
 
+    try:
+        citation_weight = min(max(float(request.args.get('citation_weight', 0)), 0.0), 1.0)
+    except (TypeError, ValueError):
+        return jsonify({"error": "citation_weight must be a number"}), 400
+
     # Get microtopics
     query = "SELECT * FROM microtopics WHERE size >= ?"
     params = [min_size]
@@ -588,53 +819,26 @@ def microtopics_graph():
         }
         nodes.append(node)
 
-    # OPTIMIZED: Batch query for all paper-topic relationships at once
-    all_paper_topics = db.execute(f"""
-        SELECT microtopic_id, paper_id
-        FROM paper_microtopics
-        WHERE microtopic_id IN ({placeholders})
-    """, topic_ids).fetchdf()
-
-    # Group by topic for O(1) lookup
-    topic_papers = {}
-    for _, row in all_paper_topics.iterrows():
-        topic_id = row['microtopic_id']
-        if topic_id not in topic_papers:
-            topic_papers[topic_id] = set()
-        topic_papers[topic_id].add(row['paper_id'])
-
-    # Calculate edges
-    edges = []
-    for i, topic_a in enumerate(topic_ids):
-        for topic_b in topic_ids[i+1:]:
-            papers_a = topic_papers.get(topic_a, set())
-            papers_b = topic_papers.get(topic_b, set())
-
-            if not papers_a or not papers_b:
-                continue
-
-            shared_papers = papers_a.intersection(papers_b)
-            shared_count = len(shared_papers)
-
-            if shared_count > 0:
-                # Jaccard similarity
-                jaccard = shared_count / len(papers_a.union(papers_b))
-
-                # Edge weight formula (simplified - no cross-citations for performance)
-                weight = jaccard * 0.3 + (shared_count / max(len(papers_a), len(papers_b))) * 0.7
+    # When cross-citations are blended in, the overlap weight alone can't
+    # be filtered on yet.
+    overlap_min_weight = min_edge_weight if citation_weight == 0 else 0.0
+    if has_data_table('microtopic_edges'):
+        edges = _precomputed_edges(db, topic_ids, overlap_min_weight)
+    else:
+        edges = _live_edges(db, topic_ids, overlap_min_weight)
 
-                if weight >= min_edge_weight:
-                    edges.append({
-                        'source': topic_a,
-                        'target': topic_b,
-                        'weight': round(weight, 3),
-                        'shared_papers': shared_count,
-                        'cross_citations': 0  # Simplified
-                    })
+    # Always blend: with citation_weight > 0 the edges above are unfiltered,
+    # even when no pair has cross-citations
+    cross = cross_citation_counts(db, topic_ids)
+    if cross or citation_weight > 0:
+        sizes = dict(zip(topic_ids, topics['size'].astype(int).tolist()))
+        edges = _add_cross_citations(edges, cross, sizes, citation_weight, min_edge_weight)
+    for edge in edges:
+        edge['weight'] = round(edge['weight'], 3)
 
     return jsonify({
         "nodes": nodes,
         "edges": edges,
         "node_count": len(nodes),
         "edge_count": len(edges)
-    })
\ No newline at end of file
+    })
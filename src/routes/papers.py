@@ -1,7 +1,10 @@
 import re
 
 from flask import Blueprint, request, jsonify
-from src.database import get_data_db as get_db, df_to_json_serializable
+from src.database import get_data_db as get_db, df_to_json_serializable, has_data_column, has_data_table
+from src.filters import author_filter, doi_match, normalize_doi, subject_filter
+from src.pagination import PAPER_KEY_COLUMNS, decode_cursor, keyset_condition, order_by, page_rows, paper_key
+from src.search import fts_available, match_cte, reindex_papers
 from src.sql_safety import (
     InvalidParameter,
     escape_like,
@@ -16,6 +19,96 @@ papers_bp = Blueprint("papers", __name__)
 _ISO_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
 
 
+def _paper_columns(prefix: str = "") -> str:
+    """`*` over papers, minus the internal `doi_norm` key once process_doi_norm.py has added it."""
+    star = f"{prefix}*"
+    return f"{star} EXCLUDE (doi_norm)" if has_data_column("papers", "doi_norm") else star
+
+
+def _refresh_paper_categories(db, doi_sql: str, doi_params: list) -> None:
+    """Re-derive the paper_categories rows of the papers matching `doi_sql`.
+
+    Same explosion as data/process_categories.py; category_dict gains any
+    new category and has its counts recomputed for the categories touched.
+    Runs inside the caller's transaction.
+    """
+    if not (has_data_table("paper_categories") and has_data_table("category_dict")):
+        return
+    ids_sql = f"SELECT id FROM papers WHERE {doi_sql} AND id IS NOT NULL"
+    db.execute(f"""
+        CREATE OR REPLACE TEMP TABLE categories_affected AS
+        SELECT DISTINCT category FROM paper_categories WHERE paper_id IN ({ids_sql})
+    """, doi_params)
+    db.execute(f"DELETE FROM paper_categories WHERE paper_id IN ({ids_sql})", doi_params)
+    db.execute(f"""
+        INSERT INTO paper_categories
+        SELECT paper_id, category, bool_or(position = 1)
+        FROM (
+            SELECT
+                id AS paper_id,
+                unnest(regexp_split_to_array(trim(categories), '\\s+')) AS category,
+                generate_subscripts(regexp_split_to_array(trim(categories), '\\s+'), 1) AS position
+            FROM papers
+            WHERE {doi_sql}
+              AND id IS NOT NULL
+              AND deleted IS NOT TRUE
+              AND categories IS NOT NULL
+              AND trim(categories) <> ''
+        )
+        WHERE category <> ''
+        GROUP BY paper_id, category
+    """, doi_params)
+    db.execute(f"""
+        INSERT INTO categories_affected
+        SELECT DISTINCT category FROM paper_categories WHERE paper_id IN ({ids_sql})
+    """, doi_params)
+    db.execute("""
+        INSERT INTO category_dict
+        SELECT DISTINCT category, split_part(category, '.', 1), 0, 0
+        FROM categories_affected
+        WHERE category NOT IN (SELECT category FROM category_dict)
+    """)
+    db.execute("""
+        UPDATE category_dict SET
+            paper_count = (
+                SELECT COUNT(*) FROM paper_categories pc WHERE pc.category = category_dict.category
+            ),
+            primary_count = (
+                SELECT COUNT(*) FROM paper_categories pc
+                WHERE pc.category = category_dict.category AND pc.is_primary
+            )
+        WHERE category IN (SELECT category FROM categories_affected)
+    """)
+    db.execute("DROP TABLE categories_affected")
+
+
+def _keyword_filter(keyword: str) -> tuple[str, list, str, list]:
+    """SQL for the `keyword` filter.
+
+    Uses the BM25 index (see src/search.py) when it has been built, which
+    defines an `fts_match(paper_id, score)` CTE; papers added through the
+    API have no id and are not in the index, so those are still matched
+    with ILIKE. Without the index every paper goes through ILIKE scans over
+    title, abstract and authors.
+
+    Returns (with_clause, with_params, filter_clause, filter_params).
+    """
+    kw = f"%{escape_like(keyword)}%"
+    ilike_clause = (
+        "(title ILIKE ? ESCAPE '\\'"
+        " OR abstract ILIKE ? ESCAPE '\\'"
+        " OR authors ILIKE ? ESCAPE '\\')"
+    )
+
+    cte = match_cte(keyword) if fts_available() else None
+    if cte is not None:
+        cte_sql, cte_params = cte
+        filter_clause = f" AND (id IN (SELECT paper_id FROM fts_match) OR (id IS NULL AND {ilike_clause}))"
+        return f"WITH {cte_sql} ", cte_params, filter_clause, [kw, kw, kw]
+
+    return "", [], f" AND {ilike_clause}", [kw, kw, kw]
+
+
 @papers_bp.route("/api/papers", methods=["GET"])
 def get_papers():
     """Get all papers with optional filters. Supports pagination and sorting.
@@ -23,10 +116,14 @@ def get_papers():
     All user input is sanitized before reaching SQL:
       * Free-text filters (keyword, author, subject) are bound as `?`
         parameters AND have LIKE wildcards escaped via `escape_like`.
+        With the BM25 index built, `keyword` is tokenized and matched
+        against the index instead; `rank=relevance` then orders by score.
       * Numeric filters go through `safe_int` (parsed + range-clamped).
       * Dates are regex-checked for ISO format before being bound.
       * `sort_by` / `sort_order` are matched against fixed allowlists
         before being interpolated into the ORDER BY clause.
+      * `cursor` is decoded to a (sort value, id) pair that is bound as
+        parameters; it replaces OFFSET when given (see src/pagination.py).
     """
     db = get_db()
 
@@ -63,12 +160,14 @@ def get_papers():
         default='citation_count',
     )
     sort_order = safe_sort_order(request.args.get('sort_order'))
+    rank = safe_sort_field(request.args.get('rank'), allowed=('relevance',), default='')
+    cursor = request.args.get('cursor')
 
     # Build base query
     if microtopic_id:
         # Join with paper_microtopics for filtering by microtopic
-        base_query = """
-            SELECT DISTINCT p.* FROM papers p
+        base_query = f"""
+            SELECT DISTINCT {_paper_columns('p.')} FROM papers p
             INNER JOIN paper_microtopics pm ON p.id = pm.paper_id
             WHERE pm.microtopic_id = ?
             AND (p.deleted = false OR p.deleted IS NULL)
@@ -80,35 +179,33 @@ def get_papers():
             AND (p.deleted = false OR p.deleted IS NULL)
         """
         params = [microtopic_id]
+        key_expr = paper_key('p.')
     else:
-        base_query = "SELECT * FROM papers WHERE (deleted = false OR deleted IS NULL)"
+        base_query = f"SELECT {_paper_columns()} FROM papers WHERE (deleted = false OR deleted IS NULL)"
         count_query = "SELECT COUNT(*) FROM papers WHERE (deleted = false OR deleted IS NULL)"
         params = []
+        key_expr = paper_key()
 
     # Add filters. Every value is bound as a `?` parameter; LIKE patterns
     # are escaped so user input cannot inject wildcards.
+    with_clause, with_params = "", []
     if keyword:
-        kw = f"%{escape_like(keyword)}%"
-        filter_clause = (
-            " AND (title ILIKE ? ESCAPE '\\'"
-            " OR abstract ILIKE ? ESCAPE '\\'"
-            " OR authors ILIKE ? ESCAPE '\\')"
-        )
+        with_clause, with_params, filter_clause, filter_params = _keyword_filter(keyword)
         base_query += filter_clause
         count_query += filter_clause
-        params.extend([kw, kw, kw])
+        params.extend(filter_params)
 
     if subject:
-        filter_clause = " AND categories LIKE ? ESCAPE '\\'"
+        filter_clause, filter_params = subject_filter(subject)
         base_query += filter_clause
         count_query += filter_clause
-        params.append(f"%{escape_like(subject)}%")
+        params.extend(filter_params)
 
     if author:
-        filter_clause = " AND authors ILIKE ? ESCAPE '\\'"
+        filter_clause, filter_params = author_filter(author)
         base_query += filter_clause
         count_query += filter_clause
-        params.append(f"%{escape_like(author)}%")
+        params.extend(filter_params)
 
     if domain:
         filter_clause = " AND primary_domain_name = ?"
@@ -147,21 +244,50 @@ def get_papers():
         params.append(max_citations)
 
     # Get total count (use a copy of params for count query)
-    count_params = params.copy()
-    total = db.execute(count_query, count_params).fetchone()[0]
-
-    # Add sorting and pagination to main query
-    query = base_query + f" ORDER BY {sort_by} {sort_order} LIMIT ? OFFSET ?"
-    params.append(per_page)
-    params.append((page - 1) * per_page)
+    count_params = with_params + params
+    total = db.execute(with_clause + count_query, count_params).fetchone()[0]
+
+    # Add sorting and pagination to main query. One extra row is fetched to
+    # tell whether there is a next page.
+    if rank == 'relevance' and with_clause:
+        sort_by, sort_order = 'relevance', 'DESC'
+        # Papers only matched by ILIKE (not in the index) rank last
+        sort_expr, id_expr = 'COALESCE(m.score, 0)', paper_key('q.')
+        query = (
+            f"{with_clause}SELECT q.*, {sort_expr} AS relevance FROM ({base_query}) q"
+            " LEFT JOIN fts_match m ON m.paper_id = q.id WHERE true"
+        )
+    else:
+        sort_expr, id_expr = sort_by, key_expr
+        query = with_clause + base_query
+    params = with_params + params
+
+    offset = (page - 1) * per_page
+    if cursor:
+        try:
+            last_value, last_id = decode_cursor(cursor, sort_by, sort_order)
+        except InvalidParameter as exc:
+            return jsonify({"error": str(exc)}), 400
+        keyset_clause, keyset_params = keyset_condition(sort_expr, id_expr, sort_order, last_value, last_id)
+        query += f" AND {keyset_clause}"
+        params.extend(keyset_params)
+        offset = 0
+
+    query += f" ORDER BY {order_by(sort_expr, id_expr, sort_order)} LIMIT ? OFFSET ?"
+    params.append(per_page + 1)
+    params.append(offset)
 
     result = db.execute(query, params).fetchdf()
+    papers, next_cursor = page_rows(
+        df_to_json_serializable(result), per_page, sort_by, PAPER_KEY_COLUMNS, sort_by, sort_order
+    )
 
     return jsonify({
-        "papers": df_to_json_serializable(result),
+        "papers": papers,
         "page": page,
         "per_page": per_page,
-        "total": total
+        "total": total,
+        "next_cursor": next_cursor
     })
 
 
@@ -200,25 +326,24 @@ def count_papers():
         """
         params = [microtopic_id]
     else:
-        query = "SELECT COUNT(*) FROM papers WHERE deleted = false OR deleted IS NULL"
+        query = "SELECT COUNT(*) FROM papers WHERE (deleted = false OR deleted IS NULL)"
         params = []
 
+    with_clause, with_params = "", []
     if keyword:
-        kw = f"%{escape_like(keyword)}%"
-        query += (
-            " AND (title ILIKE ? ESCAPE '\\'"
-            " OR abstract ILIKE ? ESCAPE '\\'"
-            " OR authors ILIKE ? ESCAPE '\\')"
-        )
-        params.extend([kw, kw, kw])
+        with_clause, with_params, filter_clause, filter_params = _keyword_filter(keyword)
+        query += filter_clause
+        params.extend(filter_params)
 
     if subject:
-        query += " AND categories LIKE ? ESCAPE '\\'"
-        params.append(f"%{escape_like(subject)}%")
+        filter_clause, filter_params = subject_filter(subject)
+        query += filter_clause
+        params.extend(filter_params)
 
     if author:
-        query += " AND authors ILIKE ? ESCAPE '\\'"
-        params.append(f"%{escape_like(author)}%")
+        filter_clause, filter_params = author_filter(author)
+        query += filter_clause
+        params.extend(filter_params)
 
     if start_date:
         query += " AND update_date >= ?"
@@ -236,7 +361,7 @@ def count_papers():
         query += " AND citation_count <= ?"
         params.append(max_citations)
 
-    result = db.execute(query, params).fetchone()
+    result = db.execute(with_clause + query, with_params + params).fetchone()
 
     return jsonify({"count": result[0]})
 
@@ -247,9 +372,10 @@ def get_paper(paper_id):
     db = get_db()
 
     # Get paper details (search by both id and doi to handle both formats)
+    doi_sql, doi_params = doi_match(paper_id)
     result = db.execute(
-        "SELECT * FROM papers WHERE (id = ? OR lower(doi) = lower(?)) AND (deleted = false OR deleted IS NULL)",
-        [paper_id, paper_id]
+        f"SELECT {_paper_columns()} FROM papers WHERE (id = ? OR {doi_sql}) AND (deleted = false OR deleted IS NULL)",
+        [paper_id, *doi_params]
     ).fetchdf()
 
     if result.empty:
@@ -268,7 +394,7 @@ def get_paper(paper_id):
         INNER JOIN microtopics m ON pm.microtopic_id = m.microtopic_id
         WHERE pm.paper_id = ?
         ORDER BY pm.score DESC
-    """, [paper_id]).fetchdf()
+    """, [paper['id']]).fetchdf()
 
     if not microtopics_result.empty:
         paper['microtopics'] = df_to_json_serializable(microtopics_result)
@@ -278,6 +404,107 @@ def get_paper(paper_id):
     return jsonify(paper)
 
 
+# Papers per /api/papers/batch call.
+MAX_BATCH = 200
+
+def _batch_fields(db, fields) -> tuple[str, bool]:
+    """Validate the `fields` projection; returns (select list, include microtopics).
+
+    Without `fields` every column `get_paper` returns is selected. Otherwise
+    each field must be a column of `papers` in this data DB (doi_norm is
+    internal) or the pseudo-field `microtopics`.
+    """
+    if fields is None:
+        return _paper_columns(), True
+    if not isinstance(fields, list) or not all(isinstance(f, str) for f in fields):
+        raise InvalidParameter("fields must be a list of strings")
+    available = [row[0] for row in db.execute("""
+        SELECT column_name FROM duckdb_columns()
+        WHERE table_name = 'papers' AND database_name = current_database()
+        AND column_name != 'doi_norm'
+        ORDER BY column_index
+    """).fetchall()]
+    unknown = [f for f in fields if f not in available and f != "microtopics"]
+    if unknown:
+        raise InvalidParameter(f"unknown fields: {', '.join(unknown)}")
+    # id and doi are always returned so results can be matched to the request.
+    columns = ["id", "doi"] + [c for c in available if c in fields and c not in ("id", "doi")]
+    return ", ".join(f'"{c}"' for c in columns), "microtopics" in fields
+
+
+@papers_bp.route("/api/papers/batch", methods=["POST"])
+def get_papers_batch():
+    """Look up many papers by arXiv ID or DOI in one request.
+
+    Input: {"ids": [...], "fields": [...]} with up to MAX_BATCH ids; `fields`
+    (optional) limits the paper columns returned, and microtopics are only
+    included when `fields` is omitted or lists "microtopics". Papers come
+    back in request order; ids that match nothing are listed in `not_found`.
+    Runs one query for the papers and one for all their microtopics.
+    """
+    data = request.get_json(silent=True) or {}
+    ids = data.get("ids")
+    if not isinstance(ids, list) or not all(isinstance(i, str) for i in ids):
+        return jsonify({"error": "ids must be a list of strings"}), 400
+    if len(ids) > MAX_BATCH:
+        return jsonify({"error": f"at most {MAX_BATCH} ids per request"}), 400
+    db = get_db()
+    try:
+        select, with_microtopics = _batch_fields(db, data.get("fields"))
+    except InvalidParameter as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    requested = list(dict.fromkeys(i.strip() for i in ids if i.strip()))
+    if not requested:
+        return jsonify({"papers": [], "not_found": []})
+
+    if has_data_column("papers", "doi_norm"):
+        doi_key, doi_sql = normalize_doi, "doi_norm IN (SELECT unnest(?::VARCHAR[]))"
+    else:
+        doi_key, doi_sql = str.lower, "lower(doi) IN (SELECT unnest(?::VARCHAR[]))"
+    doi_keys = [k for k in dict.fromkeys(doi_key(i) for i in requested) if k]
+
+    result = db.execute(f"""
+        SELECT {select} FROM papers
+        WHERE (id IN (SELECT unnest(?::VARCHAR[])) OR {doi_sql})
+        AND (deleted = false OR deleted IS NULL)
+    """, [requested, doi_keys]).fetchdf()
+    rows = df_to_json_serializable(result) if not result.empty else []
+
+    by_id = {row["id"]: row for row in rows if row.get("id")}
+    by_doi = {doi_key(row["doi"]): row for row in rows if row.get("doi")}
+
+    if with_microtopics and rows:
+        for row in rows:
+            row["microtopics"] = []
+        topics = db.execute("""
+            SELECT
+                pm.paper_id,
+                m.microtopic_id,
+                m.label,
+                pm.score,
+                pm.is_primary
+            FROM paper_microtopics pm
+            INNER JOIN microtopics m ON pm.microtopic_id = m.microtopic_id
+            WHERE pm.paper_id IN (SELECT unnest(?::VARCHAR[]))
+            ORDER BY pm.paper_id, pm.score DESC
+        """, [list(by_id)]).fetchdf()
+        if not topics.empty:
+            for topic in df_to_json_serializable(topics):
+                by_id[topic.pop("paper_id")]["microtopics"].append(topic)
+
+    papers, seen, not_found = [], set(), []
+    for key in requested:
+        row = by_id.get(key) or by_doi.get(doi_key(key))
+        if row is None:
+            not_found.append(key)
+        elif id(row) not in seen:
+            seen.add(id(row))
+            papers.append(row)
+
+    return jsonify({"papers": papers, "not_found": not_found})
+
+
 @papers_bp.route("/api/papers", methods=["POST"])
 def add_paper():
     """Add new paper. Input: title, doi, authors, citations, keywords, journal, subject, submission_time."""
@@ -292,20 +519,23 @@ def add_paper():
         return jsonify({"error": "Title is required"}), 400
 
     # Check if paper already exists
+    doi_sql, doi_params = doi_match(data['doi'])
     existing = db.execute(
-        "SELECT COUNT(*) FROM papers WHERE lower(doi) = lower(?)",
-        [data['doi']]
+        f"SELECT COUNT(*) FROM papers WHERE {doi_sql}",
+        doi_params
     ).fetchone()[0]
 
     if existing > 0:
         return jsonify({"error": "Paper with this DOI already exists"}), 409
 
-    # Insert paper
-    db.execute("""
+    # Insert paper (doi_norm too, once process_doi_norm.py has added it)
+    has_doi_norm = has_data_column("papers", "doi_norm")
+    db.execute(f"""
         INSERT INTO papers (
             doi, title, abstract, authors, categories,
             "journal-ref", citations, author_ids, update_date, deleted
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, false)
+            {", doi_norm" if has_doi_norm else ""}
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, false{", ?" if has_doi_norm else ""})
     """, [
         data.get('doi'),
         data.get('title'),
@@ -315,7 +545,8 @@ def add_paper():
         data.get('journal'),
         data.get('citations', []),
         data.get('author_ids', []),
-        data.get('submission_time') or data.get('update_date')
+        data.get('submission_time') or data.get('update_date'),
+        *([normalize_doi(data['doi'])] if has_doi_norm else []),
     ])
 
     return jsonify({"status": "created", "doi": data['doi']}), 201
@@ -328,9 +559,10 @@ def update_paper(doi):
     data = request.get_json()
 
     # Check if paper exists
+    doi_sql, doi_params = doi_match(doi)
     existing = db.execute(
-        "SELECT COUNT(*) FROM papers WHERE lower(doi) = lower(?)",
-        [doi]
+        f"SELECT COUNT(*) FROM papers WHERE {doi_sql}",
+        doi_params
     ).fetchone()[0]
 
     if existing == 0:
@@ -359,10 +591,20 @@ def update_paper(doi):
     if not update_fields:
         return jsonify({"error": "No valid fields to update"}), 400
 
-    params.append(doi)
-    query = f"UPDATE papers SET {', '.join(update_fields)} WHERE lower(doi) = lower(?)"
+    params.extend(doi_params)
+    query = f"UPDATE papers SET {', '.join(update_fields)} WHERE {doi_sql}"
 
-    db.execute(query, params)
+    db.execute("BEGIN TRANSACTION")
+    try:
+        db.execute(query, params)
+        if 'subject' in data or 'categories' in data:
+            _refresh_paper_categories(db, doi_sql, doi_params)
+        if data.keys() & {'title', 'abstract', 'authors'}:
+            reindex_papers(db, f"SELECT id FROM papers WHERE {doi_sql}", doi_params)
+        db.execute("COMMIT")
+    except Exception:
+        db.execute("ROLLBACK")
+        raise
 
     return jsonify({"status": "updated", "doi": doi})
 
@@ -372,17 +614,18 @@ def delete_paper(doi):
     """Remove paper from database."""
     db = get_db()
 
+    doi_sql, doi_params = doi_match(doi)
     existing = db.execute(
-        "SELECT COUNT(*) FROM papers WHERE lower(doi) = lower(?) AND (deleted = false OR deleted IS NULL)",
-        [doi]
+        f"SELECT COUNT(*) FROM papers WHERE {doi_sql} AND (deleted = false OR deleted IS NULL)",
+        doi_params
     ).fetchone()[0]
 
     if existing == 0:
         return jsonify({"error": "Paper not found"}), 404
 
     db.execute(
-        "UPDATE papers SET deleted = true WHERE lower(doi) = lower(?)",
-        [doi]
+        f"UPDATE papers SET deleted = true WHERE {doi_sql}",
+        doi_params
     )
 
     return jsonify({"status": "deleted", "doi": doi})
@@ -397,7 +640,11 @@ def generate_paper():
 
 @papers_bp.route("/api/papers/<path:paper_id>/citations", methods=["GET"])
 def get_paper_citations(paper_id):
-    """Get all papers that cite this paper. Papers whose citations array contains this ID."""
+    """Get all papers that cite this paper. Papers whose citations array contains this ID.
+
+    Paginates with `page` (OFFSET) or, for deep pages, the `cursor` from the
+    previous response's `next_cursor`.
+    """
     db = get_db()
 
     try:
@@ -415,25 +662,64 @@ def get_paper_citations(paper_id):
     )
     sort_order = safe_sort_order(request.args.get('sort_order'))
 
-    count = db.execute("""
-        SELECT COUNT(*) FROM papers
-        WHERE list_contains(citations, ?)
-        AND (deleted = false OR deleted IS NULL)
-    """, [paper_id]).fetchone()[0]
+    keyset_clause, params, offset = "", [paper_id], (page - 1) * per_page
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            last_value, last_id = decode_cursor(cursor, sort_by, sort_order)
+        except InvalidParameter as exc:
+            return jsonify({"error": str(exc)}), 400
+        keyset_sql, keyset_params = keyset_condition(sort_by, paper_key(), sort_order, last_value, last_id)
+        keyset_clause = f"AND {keyset_sql}"
+        params.extend(keyset_params)
+        offset = 0
+
+    if has_data_table('paper_cited_by'):
+        # Reverse-citation table from data/process_cited_by.py: a range
+        # lookup on the cited_id-sorted edge list instead of unnesting every
+        # paper's citations. Counted over live papers like the rows below,
+        # since the edges do not follow later soft deletes.
+        count = db.execute("""
+            SELECT COUNT(*) FROM paper_cited_by e
+            INNER JOIN papers p ON p.id = e.citing_id
+            WHERE e.cited_id = ?
+            AND (p.deleted = false OR p.deleted IS NULL)
+        """, [paper_id]).fetchone()[0]
 
-    result = db.execute(f"""
-        SELECT * FROM papers
-        WHERE list_contains(citations, ?)
-        AND (deleted = false OR deleted IS NULL)
-        ORDER BY {sort_by} {sort_order}
-        LIMIT ? OFFSET ?
-    """, [paper_id, per_page, (page - 1) * per_page]).fetchdf()
+        result = db.execute(f"""
+            SELECT {_paper_columns('p.')} FROM paper_cited_by e
+            INNER JOIN papers p ON p.id = e.citing_id
+            WHERE e.cited_id = ?
+            AND (p.deleted = false OR p.deleted IS NULL)
+            {keyset_clause}
+            ORDER BY {order_by(sort_by, paper_key('p.'), sort_order)}
+            LIMIT ? OFFSET ?
+        """, params + [per_page + 1, offset]).fetchdf()
+    else:
+        count = db.execute("""
+            SELECT COUNT(*) FROM papers
+            WHERE list_contains(citations, ?)
+            AND (deleted = false OR deleted IS NULL)
+        """, [paper_id]).fetchone()[0]
+
+        result = db.execute(f"""
+            SELECT {_paper_columns()} FROM papers
+            WHERE list_contains(citations, ?)
+            AND (deleted = false OR deleted IS NULL)
+            {keyset_clause}
+            ORDER BY {order_by(sort_by, paper_key(), sort_order)}
+            LIMIT ? OFFSET ?
+        """, params + [per_page + 1, offset]).fetchdf()
+    citing_papers, next_cursor = page_rows(
+        df_to_json_serializable(result), per_page, sort_by, PAPER_KEY_COLUMNS, sort_by, sort_order
+    )
 
     return jsonify({
-        "citing_papers": df_to_json_serializable(result),
+        "citing_papers": citing_papers,
         "count": count,
         "page": page,
-        "per_page": per_page
+        "per_page": per_page,
+        "next_cursor": next_cursor
     })
 
 
@@ -468,7 +754,7 @@ def get_paper_references(paper_id):
     """, citations).fetchone()[0]
 
     result = db.execute(f"""
-        SELECT * FROM papers
+        SELECT {_paper_columns()} FROM papers
         WHERE id IN ({placeholders})
         AND (deleted = false OR deleted IS NULL)
         LIMIT ? OFFSET ?
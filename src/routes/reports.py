@@ -2,7 +2,9 @@ import json
 
 import pandas as pd
 from flask import Blueprint, request, jsonify
+from src.cross_citations import cross_citation_count
 from src.database import get_data_db as get_db, df_to_json_serializable
+from src.filters import subject_filter
 
 reports_bp = Blueprint("reports", __name__)
 
@@ -65,7 +67,7 @@ def generate_topic_report():
             overlap = {
                 'shared_papers': shared_paper_count,
                 'shared_authors': 0,  # Simplified
-                'cross_citations': 0,  # Simplified
+                'cross_citations': cross_citation_count(db, microtopic_id, compare_microtopic_id),
                 'jaccard': round(jaccard, 3)
             }
 
@@ -256,13 +258,14 @@ def get_full_topic_data(db, microtopic_id):
 def get_full_subject_data(db, subject, start_date=None, end_date=None):
     """Helper to get comprehensive subject data."""
     # Build base query
-    query = """
+    subject_clause, subject_params = subject_filter(subject)
+    query = f"""
         SELECT *
         FROM papers
-        WHERE categories LIKE ?
-        AND (deleted = false OR deleted IS NULL)
+        WHERE (deleted = false OR deleted IS NULL)
+        {subject_clause}
     """
-    params = [f"%{subject}%"]
+    params = list(subject_params)
 
     if start_date:
         query += " AND update_date >= ?"
@@ -335,19 +338,20 @@ def get_full_subject_data(db, subject, start_date=None, end_date=None):
         subject_data['citation_distribution'] = df_to_json_serializable(citation_dist)
 
         # Top microtopics in this subject
-        top_microtopics = db.execute("""
+        subject_clause, subject_params = subject_filter(subject, 'p.id', 'p.categories')
+        top_microtopics = db.execute(f"""
             SELECT
                 m.microtopic_id, m.label, m.size,
                 ROUND(AVG(p.citation_count), 0) as avg_citations
             FROM microtopics m
             INNER JOIN paper_microtopics pm ON m.microtopic_id = pm.microtopic_id
             INNER JOIN papers p ON pm.paper_id = p.id
-            WHERE p.categories LIKE ?
-            AND (p.deleted = false OR p.deleted IS NULL)
+            WHERE (p.deleted = false OR p.deleted IS NULL)
+            {subject_clause}
             GROUP BY m.microtopic_id, m.label, m.size
             ORDER BY m.size DESC
             LIMIT 10
-        """, [f"%{subject}%"]).fetchdf()
+        """, subject_params).fetchdf()
 
         subject_data['top_microtopics'] = df_to_json_serializable(top_microtopics) if not top_microtopics.empty else []
 
@@ -1,7 +1,16 @@
 from flask import Blueprint, request, jsonify, g
-from src.database import get_user_db, get_data_db, df_to_json_serializable
-from src.cache import cache
-from src.auth import require_auth
+from src.database import get_user_db, get_data_db, df_to_json_serializable, fetch_records, user_table
+from src.cache import user_caches
+from src import user_stats
+from src.auth import forget_user, require_auth
+from src.precompute import (
+    MAX_RECOMMENDATIONS,
+    delete_recommendations,
+    drop_recommended_paper,
+    load_recommendations,
+    recommendation_queue,
+)
+from src.recommender import STRATEGIES, recommend
 from src.sql_safety import (
     InvalidParameter,
     safe_int,
@@ -14,13 +23,13 @@ users_bp = Blueprint("users", __name__)
 
 
 def clear_user_recommendations_cache(user_id):
-    """Invalidate cached recommendations for a user.
+    """Invalidate a user's cached responses.
 
-    SimpleCache has no pattern-delete, so we clear the whole cache. This
-    is blunt but correct — recommendations change rarely and the rest of
-    the cache rewarms cheaply.
+    Only that user's namespace is dropped (see UserCacheNamespaces); the
+    shared hot-papers, graph and microtopic caches stay warm. Stored
+    recommendations are refreshed by src.precompute instead.
     """
-    cache.clear()
+    user_caches.invalidate(user_id)
 
 
 @users_bp.route("/api/auth/register", methods=["POST"])
@@ -68,6 +77,8 @@ def register():
             [firebase_uid, email]
         )
         db.commit()
+        forget_user(existing_by_email[3])
+        forget_user(firebase_uid)
 
         return jsonify({
             "user_id": existing_by_email[0],
@@ -92,8 +103,10 @@ def register():
         INSERT INTO users (id, username, email, firebase_uid, password_hash, focus_topics, created_at)
         VALUES (?, ?, ?, ?, '', ?, CURRENT_TIMESTAMP)
     """, [next_id, username, email, firebase_uid, focus_topics])
+    user_stats.init_user(db, next_id)
 
     db.commit()
+    forget_user(firebase_uid)
 
     return jsonify({
         "user_id": next_id,
@@ -146,46 +159,16 @@ def get_user(user_id):
         ).fetchone()
         user_data['linked_author_name'] = author[0] if author else None
 
-    # Calculate statistics from user DB
-    reading_list_count = user_db.execute(
-        "SELECT COUNT(*) FROM user_reading_list WHERE user_id = ?",
-        [user_id]
-    ).fetchone()[0]
-
-    papers_read_count = user_db.execute(
-        "SELECT COUNT(*) FROM user_read_history WHERE user_id = ?",
-        [user_id]
-    ).fetchone()[0]
-
-    publication_count = user_db.execute(
-        "SELECT COUNT(*) FROM user_publications WHERE user_id = ?",
-        [user_id]
-    ).fetchone()[0]
-
-    publication_citations = user_db.execute(
-        "SELECT SUM(citation_count) FROM user_publications WHERE user_id = ?",
-        [user_id]
-    ).fetchone()[0] or 0
+    # Materialized counts (src/user_stats.py); rebuilt for this user if
+    # missing or computed against an older data snapshot
+    stats = user_stats.load(user_db, user_id)
+    if stats is None:
+        user_stats.rebuild(data_db, user_id)
+        stats = user_stats.load(user_db, user_id)
 
-    # Get paper IDs from read history, then query papers from data DB
-    read_paper_ids = user_db.execute(
-        "SELECT paper_id FROM user_read_history WHERE user_id = ?",
-        [user_id]
-    ).fetchdf()
-
-    total_citations_covered = 0
-    avg_citations_per_read = 0
-    if not read_paper_ids.empty:
-        paper_ids = read_paper_ids['paper_id'].tolist()
-        placeholders = ','.join(['?'] * len(paper_ids))
-        read_papers = data_db.execute(f"""
-            SELECT citation_count
-            FROM papers
-            WHERE id IN ({placeholders})
-        """, paper_ids).fetchdf()
-
-        total_citations_covered = int(read_papers['citation_count'].sum()) if not read_papers.empty else 0
-        avg_citations_per_read = int(read_papers['citation_count'].mean()) if not read_papers.empty else 0
+    papers_read_count = stats['papers_read_count']
+    cited_read_count = stats['cited_read_count']
+    avg_citations_per_read = int(stats['total_citations_covered'] / cited_read_count) if cited_read_count else 0
 
     # Calculate reading pace (papers per week)
     if user[5]:
@@ -196,86 +179,53 @@ def get_user(user_id):
         reading_pace_per_week = 0
 
     user_data['stats'] = {
-        'reading_list_count': reading_list_count,
+        'reading_list_count': stats['reading_list_count'],
         'papers_read_count': papers_read_count,
-        'total_citations_covered': total_citations_covered,
+        'total_citations_covered': stats['total_citations_covered'],
         'avg_citations_per_read': avg_citations_per_read,
         'reading_pace_per_week': round(reading_pace_per_week, 1),
-        'publication_count': publication_count,
-        'publication_citations': publication_citations,
+        'publication_count': stats['publication_count'],
+        'publication_citations': stats['publication_citations'],
         'days_since_join': days_since_join
     }
 
-    # Reading by microtopic - get paper IDs from user DB, then join with data DB
-    if not read_paper_ids.empty:
-        paper_ids = read_paper_ids['paper_id'].tolist()
-        placeholders = ','.join(['?'] * len(paper_ids))
-        reading_by_microtopic = data_db.execute(f"""
-            SELECT
-                m.microtopic_id,
-                m.label as microtopic_label,
-                m.bucket_value as topic,
-                SPLIT_PART(m.bucket_value, '/', 1) as domain,
-                COUNT(DISTINCT pm.paper_id) as count
-            FROM paper_microtopics pm
-            INNER JOIN microtopics m ON pm.microtopic_id = m.microtopic_id
-            WHERE pm.paper_id IN ({placeholders})
-            GROUP BY m.microtopic_id, m.label, m.bucket_value
-            ORDER BY count DESC
-        """, paper_ids).fetchdf()
-        user_data['reading_by_microtopic'] = df_to_json_serializable(reading_by_microtopic) if not reading_by_microtopic.empty else []
-    else:
-        user_data['reading_by_microtopic'] = []
-
-    # Reading over time from user DB - dynamic bucketing based on date range
-    # First, get the date range
-    date_range = user_db.execute("""
+    # Reading by microtopic: materialized counts, labels from the data DB
+    data_db.execute(f"""
         SELECT
-            MIN(read_at) as min_date,
-            MAX(read_at) as max_date,
-            DATE_DIFF('day', MIN(read_at), MAX(read_at)) as days_range
-        FROM user_read_history
-        WHERE user_id = ?
-    """, [user_id]).fetchone()
-
+            m.microtopic_id,
+            m.label as microtopic_label,
+            m.bucket_value as topic,
+            SPLIT_PART(m.bucket_value, '/', 1) as domain,
+            r.paper_count as count
+        FROM {user_table('user_reading_by_microtopic')} r
+        INNER JOIN microtopics m ON r.microtopic_id = m.microtopic_id
+        WHERE r.user_id = ?
+        ORDER BY count DESC
+    """, [user_id])
+    user_data['reading_by_microtopic'] = fetch_records(data_db)
+
+    # Reading over time, bucketed by the span between first and last read
+    days_range = stats['days_range']
     reading_over_time = None
-    if date_range and date_range[2] is not None:
-        days_range = date_range[2]
-
-        # Choose bucketing strategy based on range
+    if days_range is not None:
         if days_range <= 30:
             # Daily buckets for <= 30 days
-            reading_over_time = user_db.execute("""
-                SELECT
-                    CAST(read_at AS DATE) as month,
-                    COUNT(*) as count
-                FROM user_read_history
-                WHERE user_id = ?
-                GROUP BY month
-                ORDER BY month
-            """, [user_id]).fetchdf()
+            bucket = "CAST(read_at AS DATE)"
         elif days_range <= 180:
             # Weekly buckets for 30-180 days (6 months)
-            reading_over_time = user_db.execute("""
-                SELECT
-                    DATE_TRUNC('week', read_at) as month,
-                    COUNT(*) as count
-                FROM user_read_history
-                WHERE user_id = ?
-                GROUP BY month
-                ORDER BY month
-            """, [user_id]).fetchdf()
+            bucket = "DATE_TRUNC('week', read_at)"
         else:
             # Monthly buckets for > 180 days
-            reading_over_time = user_db.execute("""
-                SELECT
-                    DATE_TRUNC('month', read_at) as month,
-                    COUNT(*) as count
-                FROM user_read_history
-                WHERE user_id = ?
-                GROUP BY month
-                ORDER BY month
-            """, [user_id]).fetchdf()
+            bucket = "DATE_TRUNC('month', read_at)"
+        reading_over_time = user_db.execute(f"""
+            SELECT
+                {bucket} as month,
+                COUNT(*) as count
+            FROM user_read_history
+            WHERE user_id = ?
+            GROUP BY month
+            ORDER BY month
+        """, [user_id]).fetchdf()
 
     user_data['reading_over_time'] = df_to_json_serializable(reading_over_time) if reading_over_time is not None and not reading_over_time.empty else []
 
@@ -319,6 +269,7 @@ def update_user(user_id):
     query = f"UPDATE users SET {', '.join(update_fields)} WHERE id = ?"
 
     db.execute(query, params)
+    forget_user(user_id=user_id)
 
     return jsonify({"status": "updated"})
 
@@ -345,10 +296,13 @@ def delete_user(user_id):
         db.execute("DELETE FROM user_reading_list WHERE user_id = ?", [user_id])
         db.execute("DELETE FROM user_read_history WHERE user_id = ?", [user_id])
         db.execute("DELETE FROM user_publications WHERE user_id = ?", [user_id])
+        delete_recommendations(db, user_id)
+        user_stats.delete_user(db, user_id)
         db.execute("DELETE FROM users WHERE id = ?", [user_id])
 
         # Commit transaction
         db.execute("COMMIT")
+        forget_user(firebase_uid, user_id=user_id)
 
         # Delete from Firebase Auth
         if firebase_uid:
@@ -401,13 +355,19 @@ def link_author(user_id):
         if not author:
             return jsonify({"error": "Author not found"}), 404
 
+        # The whole import runs on the data DB cursor, which writes the user
+        # tables through user_table(), so publications are copied from
+        # papers in one INSERT ... SELECT
+        user_stats.ensure_tables(user_db)
+        users, publications = user_table('users'), user_table('user_publications')
+
         # Start transaction
-        user_db.execute("BEGIN TRANSACTION")
+        data_db.execute("BEGIN TRANSACTION")
 
         try:
             # Update user in user DB
-            user_db.execute(
-                "UPDATE users SET linked_author_id = ? WHERE id = ?",
+            data_db.execute(
+                f"UPDATE {users} SET linked_author_id = ? WHERE id = ?",
                 [author_id, user_id]
             )
 
@@ -420,72 +380,42 @@ def link_author(user_id):
             # FIRST: Clear ALL existing auto-imported publications for this user
             # (Keep only manually added ones, which have no DOI from papers table)
             # Delete any publication that has a DOI - these are auto-imported
-            user_db.execute(
-                "DELETE FROM user_publications WHERE user_id = ? AND doi IS NOT NULL AND doi != ''",
+            data_db.execute(
+                f"DELETE FROM {publications} WHERE user_id = ? AND doi IS NOT NULL AND doi != ''",
                 [user_id]
             )
 
-            if paper_dois and len(paper_dois) > 0:
-                doi_placeholders = ','.join(['?'] * len(paper_dois))
-
-                # Get papers from data DB
-                papers = data_db.execute(f"""
+            if paper_dois:
+                publications_imported = data_db.execute(f"""
+                    INSERT INTO {publications} (user_id, title, venue, year, doi, citation_count, coauthors)
                     SELECT
-                        title,
-                        "journal-ref" as venue,
-                        YEAR(update_date) as year,
+                        ?,
+                        COALESCE(title, 'Untitled'),
+                        "journal-ref",
+                        COALESCE(YEAR(update_date), 2024),
                         doi,
-                        citation_count,
-                        authors
+                        COALESCE(citation_count, 0),
+                        COALESCE(
+                            list_filter(list_transform(string_split(authors, ','), a -> trim(a)), a -> a != ''),
+                            []
+                        )
                     FROM papers
-                    WHERE doi IN ({doi_placeholders})
-                    AND doi IS NOT NULL
-                """, list(paper_dois)).fetchall()
-
-                # Track which DOIs were found
-                found_dois = set()
-
-                # Insert papers into user_publications
-                for paper in papers:
-                    title, venue, year, doi, citation_count, authors = paper
-                    found_dois.add(doi)
-
-                    # Parse coauthors - split by comma if string
-                    coauthors = []
-                    if authors:
-                        if isinstance(authors, str):
-                            coauthors = [a.strip() for a in authors.split(',') if a.strip()]
-                        else:
-                            coauthors = authors
-
-                    # Insert with explicit type casting in SQL to avoid parameter binding issues
-                    try:
-                        user_db.execute("""
-                            INSERT INTO user_publications (user_id, title, venue, year, doi, citation_count, coauthors)
-                            VALUES (CAST(? AS INTEGER), CAST(? AS VARCHAR), CAST(? AS VARCHAR),
-                                    CAST(? AS INTEGER), CAST(? AS VARCHAR), CAST(? AS INTEGER),
-                                    CAST(? AS VARCHAR[]))
-                        """, [
-                            user_id,
-                            title or 'Untitled',
-                            venue,
-                            year or 2024,
-                            doi,
-                            citation_count or 0,
-                            coauthors
-                        ])
-                    except Exception:
-                        # Continue with other publications even if one fails
-                        continue
-
-                    publications_imported += 1
-                    total_citations += (citation_count or 0)
-
-                # Count how many papers were not found in database
-                publications_not_found = len(paper_dois) - len(found_dois)
+                    WHERE doi IN (SELECT unnest(?::VARCHAR[]))
+                """, [user_id, paper_dois]).fetchone()[0]
+
+                # Only the rows just imported have a DOI now
+                total_citations, publications_not_found = data_db.execute(f"""
+                    SELECT
+                        COALESCE(SUM(citation_count), 0),
+                        len(?::VARCHAR[]) - COUNT(DISTINCT doi)
+                    FROM {publications}
+                    WHERE user_id = ? AND doi IS NOT NULL AND doi != ''
+                """, [paper_dois, user_id]).fetchone()
+
+            user_stats.refresh_publications(data_db, user_id, on_data_db=True)
 
             # Commit transaction
-            user_db.execute("COMMIT")
+            data_db.execute("COMMIT")
 
             return jsonify({
                 "status": "linked",
@@ -500,7 +430,7 @@ def link_author(user_id):
 
         except Exception as e:
             # Rollback on any error
-            user_db.execute("ROLLBACK")
+            data_db.execute("ROLLBACK")
             raise e
 
     except Exception as e:
@@ -537,6 +467,7 @@ def unlink_author(user_id):
             "UPDATE users SET linked_author_id = NULL WHERE id = ?",
             [user_id]
         )
+        user_stats.refresh_publications(db, user_id)
 
         # Commit transaction
         db.execute("COMMIT")
@@ -557,7 +488,6 @@ def get_reading_list(user_id):
     if g.user_id != user_id:
         return jsonify({'error': 'Unauthorized'}), 403
 
-    user_db = get_user_db()
     data_db = get_data_db()
 
     sort_by = request.args.get('sort_by', 'added_at')
@@ -571,37 +501,20 @@ def get_reading_list(user_id):
     if sort_order not in ['ASC', 'DESC']:
         sort_order = 'DESC'
 
-    # Get reading list from user DB
-    reading_list = user_db.execute("""
-        SELECT paper_id, added_at
-        FROM user_reading_list
-        WHERE user_id = ?
-    """, [user_id]).fetchdf()
-
-    if reading_list.empty:
-        return jsonify({"papers": [], "count": 0})
-
-    # Get paper details from data DB
-    paper_ids = reading_list['paper_id'].tolist()
-    placeholders = ','.join(['?'] * len(paper_ids))
-    papers = data_db.execute(f"""
-        SELECT id, title, citation_count, categories, update_date
-        FROM papers
-        WHERE id IN ({placeholders})
-    """, paper_ids).fetchdf()
-
-    # Merge reading list with paper details
-    result = reading_list.merge(papers, left_on='paper_id', right_on='id', how='left')
-
-    # Sort
-    if sort_by == 'added_at':
-        result = result.sort_values('added_at', ascending=(sort_order == 'ASC'))
-    else:
-        result = result.sort_values(sort_by, ascending=(sort_order == 'ASC'))
+    # Reading list joined to paper details (papers missing from the data DB keep null fields)
+    sort_column = 'r.added_at' if sort_by == 'added_at' else f'p.{sort_by}'
+    data_db.execute(f"""
+        SELECT r.paper_id, r.added_at, p.id, p.title, p.citation_count, p.categories, p.update_date
+        FROM {user_table('user_reading_list')} r
+        LEFT JOIN papers p ON p.id = r.paper_id
+        WHERE r.user_id = ?
+        ORDER BY {sort_column} {sort_order} NULLS LAST
+    """, [user_id])
+    papers = fetch_records(data_db)
 
     return jsonify({
-        "papers": df_to_json_serializable(result) if not result.empty else [],
-        "count": len(result)
+        "papers": papers,
+        "count": len(papers)
     })
 
 
@@ -640,14 +553,22 @@ def add_to_reading_list(user_id):
         return jsonify({"status": "already_exists"}), 409
 
     # Add to reading list
-    db.execute(
-        "INSERT INTO user_reading_list (user_id, paper_id, added_at) VALUES (?, ?, CURRENT_TIMESTAMP)",
-        [user_id, paper_id]
-    )
-    db.commit()
+    db.execute("BEGIN TRANSACTION")
+    try:
+        db.execute(
+            "INSERT INTO user_reading_list (user_id, paper_id, added_at) VALUES (?, ?, CURRENT_TIMESTAMP)",
+            [user_id, paper_id]
+        )
+        user_stats.adjust_reading_list(db, user_id, 1)
+        db.execute("COMMIT")
+    except Exception as e:
+        # Rollback on error
+        db.execute("ROLLBACK")
+        raise e
 
     # Clear recommendations cache since reading list changed
     clear_user_recommendations_cache(user_id)
+    recommendation_queue.schedule(user_id)
 
     return jsonify({"status": "added", "paper_id": paper_id}), 201
 
@@ -662,11 +583,18 @@ def remove_from_reading_list(user_id, paper_id):
 
     db = get_user_db()
 
-    db.execute(
-        "DELETE FROM user_reading_list WHERE user_id = ? AND paper_id = ?",
-        [user_id, paper_id]
-    )
-    db.commit()
+    db.execute("BEGIN TRANSACTION")
+    try:
+        removed = db.execute(
+            "DELETE FROM user_reading_list WHERE user_id = ? AND paper_id = ?",
+            [user_id, paper_id]
+        ).fetchone()[0]
+        user_stats.adjust_reading_list(db, user_id, -removed)
+        db.execute("COMMIT")
+    except Exception as e:
+        # Rollback on error
+        db.execute("ROLLBACK")
+        raise e
 
     # Clear recommendations cache since reading list changed
     clear_user_recommendations_cache(user_id)
@@ -706,36 +634,19 @@ def get_read_history(user_id):
         [user_id]
     ).fetchone()[0]
 
-    # Get read history from user DB with pagination
-    read_history = user_db.execute(f"""
-        SELECT paper_id, read_at
-        FROM user_read_history
-        WHERE user_id = ?
-        ORDER BY read_at {sort_order}
+    # One page of read history joined to paper details, sorted across all pages
+    sort_column = 'h.read_at' if sort_by == 'read_at' else 'p.citation_count'
+    data_db.execute(f"""
+        SELECT h.paper_id, h.read_at, p.id, p.title, p.citation_count, p.categories
+        FROM {user_table('user_read_history')} h
+        LEFT JOIN papers p ON p.id = h.paper_id
+        WHERE h.user_id = ?
+        ORDER BY {sort_column} {sort_order} NULLS LAST, h.paper_id
         LIMIT ? OFFSET ?
-    """, [user_id, per_page, (page - 1) * per_page]).fetchdf()
-
-    if read_history.empty:
-        result = read_history
-    else:
-        # Get paper details from data DB
-        paper_ids = read_history['paper_id'].tolist()
-        placeholders = ','.join(['?'] * len(paper_ids))
-        papers = data_db.execute(f"""
-            SELECT id, title, citation_count, categories
-            FROM papers
-            WHERE id IN ({placeholders})
-        """, paper_ids).fetchdf()
-
-        # Merge
-        result = read_history.merge(papers, left_on='paper_id', right_on='id', how='left')
-
-        # Re-sort if needed
-        if sort_by == 'citation_count':
-            result = result.sort_values('citation_count', ascending=(sort_order == 'ASC'))
+    """, [user_id, per_page, (page - 1) * per_page])
 
     return jsonify({
-        "history": df_to_json_serializable(result) if not result.empty else [],
+        "history": fetch_records(data_db),
         "count": total,
         "page": page,
         "per_page": per_page
@@ -759,6 +670,8 @@ def add_to_read_history(user_id):
     if not paper_id:
         return jsonify({"error": "paper_id is required"}), 400
 
+    facts = user_stats.paper_facts(get_data_db(), paper_id)
+
     # Start transaction to ensure atomic operation
     db.execute("BEGIN TRANSACTION")
 
@@ -775,18 +688,23 @@ def add_to_read_history(user_id):
                 "INSERT INTO user_read_history (user_id, paper_id, read_at) VALUES (?, ?, ?)",
                 [user_id, paper_id, read_at]
             )
+            user_stats.record_read(db, user_id, facts, 1)
+            # Stop recommending it now; the background refresh re-ranks the rest
+            drop_recommended_paper(db, user_id, paper_id)
 
         # Remove from reading list (if present)
-        db.execute(
+        removed = db.execute(
             "DELETE FROM user_reading_list WHERE user_id = ? AND paper_id = ?",
             [user_id, paper_id]
-        )
+        ).fetchone()[0]
+        user_stats.adjust_reading_list(db, user_id, -removed)
 
         # Commit transaction
         db.execute("COMMIT")
 
         # Clear recommendations cache since read history changed
         clear_user_recommendations_cache(user_id)
+        recommendation_queue.schedule(user_id)
 
         return jsonify({"status": "added" if existing == 0 else "already_exists"}), 201 if existing == 0 else 200
 
@@ -807,14 +725,27 @@ def remove_from_read_history(user_id, paper_id):
         return jsonify({'error': 'Unauthorized'}), 403
 
     db = get_user_db()
+    facts = user_stats.paper_facts(get_data_db(), paper_id)
 
-    db.execute(
-        "DELETE FROM user_read_history WHERE user_id = ? AND paper_id = ?",
-        [user_id, paper_id]
-    )
+    db.execute("BEGIN TRANSACTION")
+    try:
+        removed = db.execute(
+            "DELETE FROM user_read_history WHERE user_id = ? AND paper_id = ?",
+            [user_id, paper_id]
+        ).fetchone()[0]
+        if removed:
+            user_stats.record_read(db, user_id, facts, -1)
+        db.execute("COMMIT")
+    except Exception as e:
+        # Rollback on error
+        db.execute("ROLLBACK")
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": "Failed to un-mark as read", "details": str(e)}), 500
 
     # Clear recommendations cache since read history changed
     clear_user_recommendations_cache(user_id)
+    recommendation_queue.schedule(user_id)
 
     return jsonify({"status": "removed"})
 
@@ -883,6 +814,7 @@ def add_publication(user_id):
         """, [user_id, title, venue, year, doi, url, citation_count, coauthors]).fetchone()
 
         new_id = result[0]
+        user_stats.refresh_publications(db, user_id)
 
         return jsonify({"status": "created", "id": new_id}), 201
 
@@ -929,6 +861,7 @@ def update_publication(user_id, pub_id):
     query = f"UPDATE user_publications SET {', '.join(update_fields)} WHERE id = ? AND user_id = ?"
 
     db.execute(query, params)
+    user_stats.refresh_publications(db, user_id)
     db.commit()  # CRITICAL: Commit the transaction
 
     return jsonify({"status": "updated"})
@@ -948,150 +881,52 @@ def delete_publication(user_id, pub_id):
         "DELETE FROM user_publications WHERE id = ? AND user_id = ?",
         [pub_id, user_id]
     )
+    user_stats.refresh_publications(db, user_id)
 
     return jsonify({"status": "deleted"})
 
 
 @users_bp.route("/api/users/<int:user_id>/recommendations", methods=["GET"])
 @require_auth
-@cache.cached(timeout=600, query_string=True)
 def get_recommendations(user_id):
-    """Get recommended papers based on reading history and topics with temporal weighting."""
+    """Get recommended papers based on reading history and topics with temporal weighting.
+
+    Served from user_recommendations, which src.precompute keeps up to date
+    in the background; ranks inline only for users with nothing stored yet.
+    """
     # Verify the authenticated user matches the requested user_id
     if g.user_id != user_id:
         return jsonify({'error': 'Unauthorized'}), 403
 
     user_db = get_user_db()
-    data_db = get_data_db()
 
     try:
         limit = safe_int(
-            request.args.get('limit'), default=10, minimum=1, maximum=50
+            request.args.get('limit'), default=10, minimum=1, maximum=MAX_RECOMMENDATIONS
         )
     except InvalidParameter as exc:
         return jsonify({"error": str(exc)}), 400
     strategy = request.args.get('strategy', 'hybrid')
-    if strategy not in ('hybrid', 'citation_graph', 'topic_similarity'):
+    if strategy not in STRATEGIES:
         strategy = 'hybrid'
 
-    # Get user's read papers with timestamps from user DB
-    read_papers = user_db.execute(
-        "SELECT paper_id, read_at FROM user_read_history WHERE user_id = ? ORDER BY read_at DESC",
-        [user_id]
-    ).fetchdf()
-
-    if read_papers.empty:
-        return jsonify({"recommendations": [], "count": 0})
-
-    # Calculate temporal weights (recent reads weighted more heavily)
-    import datetime as dt
-    now = dt.datetime.now()
-    read_papers['days_ago'] = read_papers['read_at'].apply(
-        lambda x: (now - x).days if isinstance(x, dt.datetime) else 365
-    )
-
-    # Exponential decay: papers read in last 30 days get 2x weight, 60 days get 1.5x, etc.
-    read_papers['weight'] = read_papers['days_ago'].apply(
-        lambda days: max(0.5, 2.0 * (0.5 ** (days / 30)))
-    )
-
-    read_paper_ids = read_papers['paper_id'].tolist()
-    placeholders = ','.join(['?'] * len(read_paper_ids))
-
-    # Create weighted lookup for papers (for citation scoring)
-    paper_weights = dict(zip(read_papers['paper_id'], read_papers['weight']))
-
-    recommendations = []
-
-    if strategy in ['citation_graph', 'hybrid']:
-        # Papers that cite papers user has read (query data DB)
-        citing_papers = data_db.execute(f"""
-            SELECT p.id, p.title, p.citation_count, p.categories, p.update_date, p.citations
-            FROM papers p
-            WHERE p.id NOT IN ({placeholders})
-            AND list_has_any(p.citations, CAST([{placeholders}] AS VARCHAR[]))
-            AND (p.deleted = false OR p.deleted IS NULL)
-            LIMIT {limit * 3}
-        """, read_paper_ids + read_paper_ids).fetchdf()
-
-        for _, paper in citing_papers.iterrows():
-            # Calculate temporal score: how many recently-read papers does this cite?
-            cited_papers = paper['citations'] if paper['citations'] else []
-            citation_weight = sum(
-                paper_weights.get(cited_id, 0)
-                for cited_id in cited_papers
-                if cited_id in paper_weights
-            )
-
-            # Base score 0.9, boosted by temporal weight (can go up to ~1.8 for highly relevant recent citations)
-            temporal_score = 0.9 + (citation_weight * 0.1)
-
-            recommendations.append({
-                'id': paper['id'],
-                'title': paper['title'],
-                'citation_count': int(paper['citation_count']),
-                'categories': paper['categories'],
-                'update_date': paper['update_date'],
-                'reason': 'Cites papers in your reading history',
-                'score': temporal_score
-            })
-
-    if strategy in ['topic_similarity', 'hybrid'] and len(recommendations) < limit * 2:
-        # Get microtopics with temporal weighting
-        user_microtopics = data_db.execute(f"""
-            SELECT pm.microtopic_id, pm.paper_id
-            FROM paper_microtopics pm
-            WHERE pm.paper_id IN ({placeholders})
-        """, read_paper_ids).fetchdf()
-
-        if not user_microtopics.empty:
-            # Calculate weight for each microtopic based on recency of papers that have it
-            user_microtopics['weight'] = user_microtopics['paper_id'].map(paper_weights)
-            microtopic_weights = user_microtopics.groupby('microtopic_id')['weight'].sum().to_dict()
-
-            microtopic_ids = list(microtopic_weights.keys())
-            topic_placeholders = ','.join(['?'] * len(microtopic_ids))
-
-            similar_papers = data_db.execute(f"""
-                SELECT p.id, p.title, p.citation_count, p.categories, p.update_date,
-                       pm.microtopic_id
-                FROM papers p
-                INNER JOIN paper_microtopics pm ON p.id = pm.paper_id
-                WHERE pm.microtopic_id IN ({topic_placeholders})
-                AND p.id NOT IN ({placeholders})
-                AND (p.deleted = false OR p.deleted IS NULL)
-                LIMIT {limit * 3}
-            """, microtopic_ids + read_paper_ids).fetchdf()
-
-            # Group by paper and calculate topic overlap weight
-            for paper_id in similar_papers['id'].unique():
-                paper_rows = similar_papers[similar_papers['id'] == paper_id]
-                paper_data = paper_rows.iloc[0]
-
-                # Sum weights of all shared microtopics
-                topic_weight = sum(
-                    microtopic_weights.get(mid, 0)
-                    for mid in paper_rows['microtopic_id'].values
-                )
-
-                # Base score 0.7, boosted by topic weight (niche recent topics get higher scores)
-                temporal_score = 0.7 + (topic_weight * 0.05)
-
-                if paper_id not in [r['id'] for r in recommendations]:
-                    recommendations.append({
-                        'id': paper_data['id'],
-                        'title': paper_data['title'],
-                        'citation_count': int(paper_data['citation_count']),
-                        'categories': paper_data['categories'],
-                        'update_date': paper_data['update_date'],
-                        'reason': 'Shares topics with your reading history',
-                        'score': temporal_score
-                    })
-
-    # Sort by score (descending), then by citation count
-    recommendations.sort(key=lambda x: (x['score'], x['citation_count']), reverse=True)
+    stored = load_recommendations(user_db, user_id, strategy, limit)
+    if stored is not None:
+        recommendations, stale = stored
+        if stale:
+            recommendation_queue.schedule(user_id, delay=0)
+    else:
+        # Nothing precomputed yet: rank this request inline, store the rest
+        reads = user_db.execute(
+            "SELECT paper_id, read_at FROM user_read_history WHERE user_id = ?",
+            [user_id]
+        ).fetchnumpy()
+        recommendations = recommend(
+            get_data_db(), reads['paper_id'], reads['read_at'], strategy=strategy, limit=limit
+        )
+        recommendation_queue.schedule(user_id, delay=0)
 
     return jsonify({
-        "recommendations": recommendations[:limit],
-        "count": len(recommendations[:limit])
-    })
\ No newline at end of file
+        "recommendations": recommendations,
+        "count": len(recommendations)
+    })
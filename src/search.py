@@ -0,0 +1,171 @@
+"""BM25 keyword search over the inverted index built by data/process_fts.py.
+
+The index lives in the data DB as plain tables (fts_docs, fts_dict,
+fts_postings, fts_stats), so it needs no DuckDB extension and works on the
+read-only data connection. When the tables are missing, callers fall back
+to ILIKE scans. Papers edited through the API are re-indexed in place by
+reindex_papers(); papers added through it have no id and are never indexed.
+"""
+
+import re
+import unicodedata
+
+from src.database import has_data_table
+
+FTS_TABLES = ("fts_docs", "fts_dict", "fts_postings", "fts_stats")
+
+# Must match the tokenizer in data/process_fts.py.
+_TOKEN_SPLIT_RE = re.compile(r"[^a-z0-9]+")
+MIN_TOKEN_LEN = 2
+STOPWORDS = frozenset((
+    "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "in",
+    "is", "it", "its", "of", "on", "or", "that", "the", "this", "to", "was",
+    "we", "were", "which", "with",
+))
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+def fts_available() -> bool:
+    """True if the BM25 index tables exist in the data DB."""
+    return all(has_data_table(name) for name in FTS_TABLES)
+
+
+def tokenize(text: str | None) -> list[str]:
+    """Split ``text`` into index terms, de-duplicated, in order."""
+    if not text:
+        return []
+    folded = unicodedata.normalize("NFKD", text)
+    folded = "".join(ch for ch in folded if not unicodedata.combining(ch)).lower()
+    seen = []
+    for token in _TOKEN_SPLIT_RE.split(folded):
+        if len(token) >= MIN_TOKEN_LEN and token not in STOPWORDS and token not in seen:
+            seen.append(token)
+    return seen
+
+
+def prefix_upper_bound(prefix: str) -> str:
+    """First string past every [a-z0-9] token that starts with ``prefix``."""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def match_cte(keyword: str) -> tuple[str, list] | None:
+    """Build a ``fts_match(paper_id, score)`` CTE body for ``keyword``.
+
+    Every term must occur in the paper (AND semantics, like the ILIKE filter
+    it replaces). While the user is still typing -- the keyword does not end
+    in a separator -- the last term is matched as a prefix. Returns None if
+    the keyword has no indexable terms.
+    """
+    terms = tokenize(keyword)
+    if not terms:
+        return None
+    prefix_last = keyword[-1].isalnum()
+
+    parts = []
+    params: list = []
+    for i, term in enumerate(terms):
+        if prefix_last and i == len(terms) - 1:
+            parts.append(
+                f"SELECT termid, df, {i} AS qi FROM fts_dict WHERE term >= ? AND term < ?"
+            )
+            params.extend([term, prefix_upper_bound(term)])
+        else:
+            parts.append(f"SELECT termid, df, {i} AS qi FROM fts_dict WHERE term = ?")
+            params.append(term)
+
+    sql = f"""
+        qterms AS ({' UNION ALL '.join(parts)}),
+        fts_match AS (
+            SELECT
+                d.paper_id,
+                -- Rounded so the score is stable across runs (parallel SUMs
+                -- can differ in the last bits) and usable as a cursor key.
+                round(SUM(
+                    ln(1 + (s.num_docs - q.df + 0.5) / (q.df + 0.5))
+                    * p.tf * ({BM25_K1} + 1)
+                    / (p.tf + {BM25_K1} * (1 - {BM25_B} + {BM25_B} * d.len / s.avg_len))
+                ), 6) AS score
+            FROM qterms q
+            JOIN fts_postings p ON p.termid = q.termid
+            JOIN fts_docs d ON d.docid = p.docid
+            CROSS JOIN fts_stats s
+            GROUP BY d.paper_id
+            HAVING COUNT(DISTINCT q.qi) = {len(terms)}
+        )
+    """
+    return sql, params
+
+
+
+def reindex_papers(db, ids_sql: str, params: list) -> None:
+    """Re-tokenize already indexed papers after their text changed.
+
+    `ids_sql` returns one column of papers.id values. Their postings are
+    replaced and fts_dict.df / fts_docs.len adjusted to match; new terms
+    are appended to fts_dict. fts_stats is left as built, which only nudges
+    scores until the next data/process_fts.py run. Runs inside the caller's
+    transaction.
+    """
+    if not fts_available():
+        return
+    stopwords_sql = ", ".join(f"'{w}'" for w in sorted(STOPWORDS))
+    db.execute(f"""
+        CREATE OR REPLACE TEMP TABLE fts_reindex_terms AS
+        SELECT docid, term, COUNT(*)::INTEGER AS tf
+        FROM (
+            SELECT d.docid, unnest(regexp_split_to_array(
+                lower(strip_accents(concat_ws(' ', p.title, p.abstract, p.authors))),
+                '{_TOKEN_SPLIT_RE.pattern}'
+            )) AS term
+            FROM papers p
+            JOIN fts_docs d ON d.paper_id = p.id
+            WHERE p.id IN ({ids_sql})
+        )
+        WHERE length(term) >= {MIN_TOKEN_LEN}
+          AND term NOT IN ({stopwords_sql})
+        GROUP BY docid, term
+    """, params)
+    db.execute(f"""
+        CREATE OR REPLACE TEMP TABLE fts_reindex_docs AS
+        SELECT docid FROM fts_docs WHERE paper_id IN ({ids_sql})
+    """, params)
+
+    db.execute("""
+        UPDATE fts_dict SET df = fts_dict.df - old.n
+        FROM (
+            SELECT termid, COUNT(*) AS n FROM fts_postings
+            WHERE docid IN (SELECT docid FROM fts_reindex_docs)
+            GROUP BY termid
+        ) old
+        WHERE fts_dict.termid = old.termid
+    """)
+    db.execute("DELETE FROM fts_postings WHERE docid IN (SELECT docid FROM fts_reindex_docs)")
+
+    db.execute("""
+        INSERT INTO fts_dict
+        SELECT (SELECT COALESCE(MAX(termid), 0) FROM fts_dict) + row_number() OVER (ORDER BY term), term, 0
+        FROM (SELECT DISTINCT term FROM fts_reindex_terms)
+        WHERE term NOT IN (SELECT term FROM fts_dict)
+    """)
+    db.execute("""
+        UPDATE fts_dict SET df = fts_dict.df + new.n
+        FROM (SELECT term, COUNT(*) AS n FROM fts_reindex_terms GROUP BY term) new
+        WHERE fts_dict.term = new.term
+    """)
+    db.execute("""
+        INSERT INTO fts_postings
+        SELECT d.termid, t.docid, t.tf
+        FROM fts_reindex_terms t
+        JOIN fts_dict d ON d.term = t.term
+        ORDER BY d.termid, t.docid
+    """)
+    db.execute("""
+        UPDATE fts_docs SET len = COALESCE(
+            (SELECT SUM(tf) FROM fts_reindex_terms t WHERE t.docid = fts_docs.docid), 0
+        )
+        WHERE docid IN (SELECT docid FROM fts_reindex_docs)
+    """)
+
+    for table in ("fts_reindex_terms", "fts_reindex_docs"):
+        db.execute(f"DROP TABLE {table}")
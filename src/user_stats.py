@@ -0,0 +1,307 @@
+"""Materialized per-user profile statistics.
+
+GET /api/users/<id> reads two tables in the user DB instead of
+aggregating reading lists, read history and publications on every call:
+
+  user_stats(user_id, reading_list_count, papers_read_count,
+             total_citations_covered, cited_read_count, first_read_at,
+             last_read_at, publication_count, publication_citations,
+             data_version, updated_at)
+      one row per user; cited_read_count is the number of read papers
+      with a known citation_count (the divisor for the average)
+  user_reading_by_microtopic(user_id, microtopic_id, paper_count)
+      read papers per microtopic
+
+Routes keep them current in the same transaction as each reading-list,
+read-history and publication change: counts and citation sums move by
+the change, first/last read dates and publication totals are recomputed
+for that one user. Citation counts and microtopics come from the data DB,
+so a row built against an older snapshot (``data_version``) or missing
+altogether is rebuilt for that user on the next profile view.
+
+Backfill every user at once (with the app stopped; DuckDB lets one process
+open the user DB):
+
+    python -m src.user_stats [--user-id N]
+"""
+
+import argparse
+import time
+
+import duckdb
+
+from src.database import USER_DB_PATH, data_db_manager, user_table
+
+_TABLES_SQL = """
+    CREATE TABLE IF NOT EXISTS user_stats (
+        user_id INTEGER PRIMARY KEY,
+        reading_list_count INTEGER,
+        papers_read_count INTEGER,
+        total_citations_covered BIGINT,
+        cited_read_count INTEGER,
+        first_read_at TIMESTAMP,
+        last_read_at TIMESTAMP,
+        publication_count INTEGER,
+        publication_citations BIGINT,
+        data_version VARCHAR,
+        updated_at TIMESTAMP
+    );
+    CREATE TABLE IF NOT EXISTS user_reading_by_microtopic (
+        user_id INTEGER,
+        microtopic_id VARCHAR,
+        paper_count INTEGER,
+        PRIMARY KEY (user_id, microtopic_id)
+    );
+"""
+
+_tables_ready = False
+
+
+def ensure_tables(user_db: duckdb.DuckDBPyConnection) -> None:
+    """Create the stats tables if this process has not seen them yet."""
+    global _tables_ready
+    if not _tables_ready:
+        user_db.execute(_TABLES_SQL)
+        _tables_ready = True
+
+
+def paper_facts(data_db: duckdb.DuckDBPyConnection, paper_id: str) -> tuple[int, int, list[str]]:
+    """(citation sum, papers with a citation count, microtopic ids) for ``paper_id``.
+
+    Looked up before the user DB transaction that records the read.
+    """
+    citations, cited = data_db.execute(
+        "SELECT COALESCE(SUM(citation_count), 0), COUNT(citation_count) FROM papers WHERE id = ?",
+        [paper_id],
+    ).fetchone()
+    microtopics = data_db.execute(
+        "SELECT DISTINCT microtopic_id FROM paper_microtopics WHERE paper_id = ?", [paper_id]
+    ).fetchall()
+    return int(citations), cited, [row[0] for row in microtopics]
+
+
+def init_user(user_db: duckdb.DuckDBPyConnection, user_id: int) -> None:
+    """Start a new user at zero."""
+    ensure_tables(user_db)
+    user_db.execute(
+        """
+        INSERT OR IGNORE INTO user_stats VALUES (?, 0, 0, 0, 0, NULL, NULL, 0, 0, ?, now())
+        """,
+        [user_id, data_db_manager.version],
+    )
+
+
+def record_read(
+    user_db: duckdb.DuckDBPyConnection,
+    user_id: int,
+    facts: tuple[int, int, list[str]],
+    sign: int,
+) -> None:
+    """Apply one read (``sign`` = 1) or un-read (-1) of a paper with ``facts``.
+
+    Call after the user_read_history row is inserted or deleted.
+    """
+    ensure_tables(user_db)
+    citations, cited, microtopics = facts
+    user_db.execute(
+        """
+        UPDATE user_stats SET
+            papers_read_count = papers_read_count + ?,
+            total_citations_covered = total_citations_covered + ?,
+            cited_read_count = cited_read_count + ?,
+            first_read_at = (SELECT MIN(read_at) FROM user_read_history WHERE user_id = ?),
+            last_read_at = (SELECT MAX(read_at) FROM user_read_history WHERE user_id = ?),
+            updated_at = now()
+        WHERE user_id = ?
+        """,
+        [sign, sign * citations, sign * cited, user_id, user_id, user_id],
+    )
+    if not microtopics:
+        return
+    if sign > 0:
+        user_db.execute(
+            """
+            INSERT INTO user_reading_by_microtopic
+            SELECT ?, unnest(?::VARCHAR[]), 1
+            ON CONFLICT (user_id, microtopic_id) DO UPDATE SET paper_count = paper_count + 1
+            """,
+            [user_id, microtopics],
+        )
+    else:
+        user_db.execute(
+            """
+            UPDATE user_reading_by_microtopic SET paper_count = paper_count - 1
+            WHERE user_id = ? AND microtopic_id IN (SELECT unnest(?::VARCHAR[]))
+            """,
+            [user_id, microtopics],
+        )
+        user_db.execute(
+            "DELETE FROM user_reading_by_microtopic WHERE user_id = ? AND paper_count <= 0", [user_id]
+        )
+
+
+def adjust_reading_list(user_db: duckdb.DuckDBPyConnection, user_id: int, delta: int) -> None:
+    """Move reading_list_count by ``delta`` entries."""
+    if delta:
+        ensure_tables(user_db)
+        user_db.execute(
+            """
+            UPDATE user_stats SET reading_list_count = reading_list_count + ?, updated_at = now()
+            WHERE user_id = ?
+            """,
+            [delta, user_id],
+        )
+
+
+def refresh_publications(db: duckdb.DuckDBPyConnection, user_id: int, on_data_db: bool = False) -> None:
+    """Recompute publication_count and publication_citations for one user.
+
+    With ``on_data_db``, ``db`` is a data DB cursor and the user tables are
+    reached through ``user_table`` (they must exist already).
+    """
+    if on_data_db:
+        stats, publications = user_table("user_stats"), user_table("user_publications")
+    else:
+        ensure_tables(db)
+        stats, publications = "user_stats", "user_publications"
+    db.execute(
+        f"""
+        UPDATE {stats} SET
+            publication_count = (SELECT COUNT(*) FROM {publications} WHERE user_id = ?),
+            publication_citations = (
+                SELECT COALESCE(SUM(citation_count), 0) FROM {publications} WHERE user_id = ?
+            ),
+            updated_at = now()
+        WHERE user_id = ?
+        """,
+        [user_id, user_id, user_id],
+    )
+
+
+def delete_user(user_db: duckdb.DuckDBPyConnection, user_id: int) -> None:
+    ensure_tables(user_db)
+    user_db.execute("DELETE FROM user_stats WHERE user_id = ?", [user_id])
+    user_db.execute("DELETE FROM user_reading_by_microtopic WHERE user_id = ?", [user_id])
+
+
+def load(user_db: duckdb.DuckDBPyConnection, user_id: int) -> dict | None:
+    """The user's stats row, or None if it is missing or from another data snapshot.
+
+    ``days_range`` is the number of days between the first and last read.
+    """
+    ensure_tables(user_db)
+    row = user_db.execute(
+        """
+        SELECT reading_list_count, papers_read_count, total_citations_covered,
+               cited_read_count, publication_count, publication_citations,
+               DATE_DIFF('day', first_read_at, last_read_at) AS days_range,
+               data_version
+        FROM user_stats
+        WHERE user_id = ?
+        """,
+        [user_id],
+    ).fetchone()
+    if row is None or row[-1] != data_db_manager.version:
+        return None
+    columns = [d[0] for d in user_db.description]
+    return dict(zip(columns[:-1], row[:-1]))
+
+
+def rebuild(data_db: duckdb.DuckDBPyConnection, user_id: int | None = None) -> dict:
+    """Recompute both tables from scratch, for one user or everyone.
+
+    Runs on a data DB cursor, which reads papers/paper_microtopics and
+    writes the user DB tables through ``user_table``.
+    """
+    users, stats, by_topic = user_table("users"), user_table("user_stats"), user_table("user_reading_by_microtopic")
+    history, reading_list = user_table("user_read_history"), user_table("user_reading_list")
+    publications = user_table("user_publications")
+    params = [] if user_id is None else [user_id]
+    where = "" if user_id is None else "WHERE user_id = ?"
+
+    data_db.execute("BEGIN TRANSACTION")
+    try:
+        data_db.execute(f"DELETE FROM {stats} {where}", params)
+        data_db.execute(f"DELETE FROM {by_topic} {where}", params)
+        data_db.execute(
+            f"""
+            INSERT INTO {stats}
+            SELECT
+                u.id,
+                COALESCE(rl.n, 0),
+                COALESCE(h.n, 0),
+                COALESCE(c.citations, 0),
+                COALESCE(c.cited, 0),
+                h.first_read_at,
+                h.last_read_at,
+                COALESCE(pub.n, 0),
+                COALESCE(pub.citations, 0),
+                ?,
+                now()
+            FROM {users} u
+            LEFT JOIN (
+                SELECT user_id, COUNT(*) AS n FROM {reading_list} GROUP BY user_id
+            ) rl ON rl.user_id = u.id
+            LEFT JOIN (
+                SELECT user_id, COUNT(*) AS n, MIN(read_at) AS first_read_at, MAX(read_at) AS last_read_at
+                FROM {history} GROUP BY user_id
+            ) h ON h.user_id = u.id
+            LEFT JOIN (
+                SELECT r.user_id, SUM(p.citation_count) AS citations, COUNT(p.citation_count) AS cited
+                FROM {history} r
+                INNER JOIN papers p ON p.id = r.paper_id
+                GROUP BY r.user_id
+            ) c ON c.user_id = u.id
+            LEFT JOIN (
+                SELECT user_id, COUNT(*) AS n, SUM(citation_count) AS citations
+                FROM {publications} GROUP BY user_id
+            ) pub ON pub.user_id = u.id
+            {"" if user_id is None else "WHERE u.id = ?"}
+            """,
+            [data_db_manager.version] + params,
+        )
+        data_db.execute(
+            f"""
+            INSERT INTO {by_topic}
+            SELECT h.user_id, pm.microtopic_id, COUNT(DISTINCT pm.paper_id)
+            FROM {history} h
+            INNER JOIN paper_microtopics pm ON pm.paper_id = h.paper_id
+            WHERE h.user_id IN (SELECT id FROM {users}) {"" if user_id is None else "AND h.user_id = ?"}
+            GROUP BY h.user_id, pm.microtopic_id
+            """,
+            params,
+        )
+        data_db.execute("COMMIT")
+    except Exception:
+        data_db.execute("ROLLBACK")
+        raise
+
+    users_built = data_db.execute(f"SELECT COUNT(*) FROM {stats} {where}", params).fetchone()[0]
+    topic_rows = data_db.execute(f"SELECT COUNT(*) FROM {by_topic} {where}", params).fetchone()[0]
+    return {"users": users_built, "microtopic_rows": topic_rows}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild user_stats and user_reading_by_microtopic.")
+    parser.add_argument("--user-id", type=int, default=None, help="only this user (default: everyone)")
+    args = parser.parse_args()
+
+    data_db = data_db_manager.acquire()
+    t0 = time.time()
+    try:
+        user_db = duckdb.connect(USER_DB_PATH, read_only=False)
+        try:
+            ensure_tables(user_db)
+        finally:
+            user_db.close()
+        stats = rebuild(data_db, args.user_id)
+    finally:
+        data_db_manager.release(data_db)
+        data_db_manager.close()
+
+    print(f"Rebuilt stats for {stats['users']} users "
+          f"({stats['microtopic_rows']} microtopic rows, {time.time() - t0:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
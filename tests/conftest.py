@@ -7,6 +7,7 @@ instead of the production database.
 
 import os
 import sys
+import tempfile
 
 # CRITICAL: Set environment variables BEFORE any other imports
 # Get the tests directory
@@ -20,6 +21,8 @@ os.environ['DATABASE_PATH'] = TEST_DB_PATH  # Legacy
 os.environ['USER_DB_PATH'] = TEST_DB_PATH   # User tables
 os.environ['DATA_DB_PATH'] = TEST_DB_PATH   # Data tables (papers, authors, etc.)
 os.environ['TESTING'] = '1'                 # Enable test mode (read-write for data DB)
+# Fresh shared-cache file per run so responses never leak between sessions
+os.environ['CACHE_SQLITE_PATH'] = os.path.join(tempfile.mkdtemp(prefix='rv-cache-'), 'cache.sqlite3')
 
 # Add project root to Python path
 sys.path.insert(0, PROJECT_ROOT)
@@ -92,4 +95,23 @@ def pytest_sessionstart(session):
 @pytest.fixture(scope='session')
 def test_db_path():
     """Return path to test database."""
-    return TEST_DB_PATH
\ No newline at end of file
+    return TEST_DB_PATH
+
+
+@pytest.fixture(scope='session')
+def pipeline():
+    """Import a data/ pipeline script (e.g. 'process_fts') by module name."""
+    import importlib.util
+
+    def load(name):
+        module = sys.modules.get(f"pipeline_{name}")
+        if module is None:
+            spec = importlib.util.spec_from_file_location(
+                f"pipeline_{name}", os.path.join(PROJECT_ROOT, 'data', f'{name}.py')
+            )
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            sys.modules[spec.name] = module
+        return module
+
+    return load
\ No newline at end of file
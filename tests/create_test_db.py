@@ -142,6 +142,51 @@ def create_test_database():
         )
     """)
 
+    # Create user_recommendations table (see src/precompute.py)
+    conn.execute("""
+        CREATE TABLE user_recommendations (
+            user_id INTEGER,
+            strategy VARCHAR,
+            recommendations STRUCT(
+                id VARCHAR,
+                title VARCHAR,
+                citation_count INTEGER,
+                categories VARCHAR,
+                update_date VARCHAR,
+                reason VARCHAR,
+                score DOUBLE
+            )[],
+            data_version VARCHAR,
+            computed_at TIMESTAMP,
+            PRIMARY KEY (user_id, strategy)
+        )
+    """)
+
+    # Create user_stats tables (see src/user_stats.py)
+    conn.execute("""
+        CREATE TABLE user_stats (
+            user_id INTEGER PRIMARY KEY,
+            reading_list_count INTEGER,
+            papers_read_count INTEGER,
+            total_citations_covered BIGINT,
+            cited_read_count INTEGER,
+            first_read_at TIMESTAMP,
+            last_read_at TIMESTAMP,
+            publication_count INTEGER,
+            publication_citations BIGINT,
+            data_version VARCHAR,
+            updated_at TIMESTAMP
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE user_reading_by_microtopic (
+            user_id INTEGER,
+            microtopic_id VARCHAR,
+            paper_count INTEGER,
+            PRIMARY KEY (user_id, microtopic_id)
+        )
+    """)
+
     # Create user_publications table
     conn.execute("""
         CREATE TABLE user_publications (
@@ -1,3 +1,5 @@
+import datetime
+
 import pytest
 import json
 from src.main import app
@@ -244,6 +246,31 @@ class TestVelocity:
         data = json.loads(response.data)
         assert len(data['velocity']) == 20
 
+    def test_counts_per_period(self, client, data_db):
+        """Test that each generated period counts papers like a BETWEEN query."""
+        data = json.loads(client.get('/api/analytics/velocity?period=month&lookback=40').data)
+        assert len(data['velocity']) == 40
+        assert data['velocity'][-1]['period_end'] == datetime.date.today().isoformat()
+        for bucket in data['velocity']:
+            expected = data_db.execute("""
+                SELECT COUNT(*) FROM papers
+                WHERE update_date BETWEEN ? AND ?
+                AND (deleted = false OR deleted IS NULL)
+            """, [bucket['period_start'], bucket['period_end']]).fetchone()[0]
+            assert bucket['count'] == expected
+        assert sum(b['count'] for b in data['velocity']) > 0
+
+    def test_subject_filter(self, client):
+        """Test that a subject nobody publishes in has zero velocity."""
+        data = json.loads(client.get('/api/analytics/velocity?subject=zz.XX&lookback=3').data)
+        assert [b['count'] for b in data['velocity']] == [0, 0, 0]
+        assert data['latest'] == 0
+
+    def test_invalid_lookback(self, client):
+        """Test that a non-numeric lookback is a 400."""
+        response = client.get('/api/analytics/velocity?lookback=abc')
+        assert response.status_code == 400
+
 
 class TestHotPapers:
     """Test /api/analytics/hot-papers endpoint."""
@@ -7,7 +7,8 @@ Tests all CRUD operations, edge cases, and error conditions.
 import pytest
 import json
 from src.main import app
-from src.database import get_data_db, get_user_db
+from src.cache import cache
+from src.database import data_db_manager, get_data_db, get_user_db
 
 
 @pytest.fixture
@@ -37,6 +38,31 @@ def user_db(app_ctx):
     yield get_user_db()
 
 
+@pytest.fixture
+def fake_firebase(monkeypatch):
+    """Count verify_id_token calls and accept 'token-<uid>' tokens."""
+    import time
+    from src import auth as auth_module
+
+    calls = []
+
+    def verify_id_token(token):
+        calls.append(token)
+        return {'uid': token.removeprefix('token-'), 'exp': time.time() + 3600}
+
+    monkeypatch.setattr(auth_module.auth, 'verify_id_token', verify_id_token)
+    auth_module.verified_tokens.clear()
+    auth_module.users_by_uid.clear()
+    return calls
+
+
+def register_user(client, uid):
+    """Register `uid` and return its user_id; sign in with 'Bearer token-<uid>'."""
+    response = client.post('/api/auth/register', json={
+        'firebase_uid': uid, 'username': uid, 'email': f'{uid}@test.com'})
+    return json.loads(response.data)['user_id']
+
+
 class TestHealth:
     """Test health check endpoints."""
 
@@ -61,6 +87,55 @@ class TestHealth:
 class TestPapers:
     """Test paper-related endpoints."""
 
+    def test_batch_lookup(self, client):
+        """Test that the batch endpoint resolves ids and DOIs in request order."""
+        response = client.post('/api/papers/batch', json={
+            'ids': ['2024.12346', '10.1234/TEST.PAPER.001', 'missing', '2024.12345'],
+        })
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert [p['id'] for p in data['papers']] == ['2024.12346', '2024.12345']
+        assert data['not_found'] == ['missing']
+        topics = data['papers'][1]['microtopics']
+        assert [t['microtopic_id'] for t in topics] == ['mt-ml-001', 'mt-cv-002']
+
+    def test_batch_field_projection(self, client):
+        """Test that fields trims the payload and skips microtopics unless asked."""
+        response = client.post('/api/papers/batch', json={
+            'ids': ['2024.12345'], 'fields': ['title'],
+        })
+        data = json.loads(response.data)
+        assert set(data['papers'][0]) == {'id', 'doi', 'title'}
+
+        response = client.post('/api/papers/batch', json={
+            'ids': ['2024.12345'], 'fields': ['microtopics'],
+        })
+        assert len(json.loads(response.data)['papers'][0]['microtopics']) == 2
+
+    def test_batch_matches_single_paper(self, client):
+        """Test that a default batch row has the same fields as /api/papers/<id>."""
+        single = json.loads(client.get('/api/papers/2024.12345').data)
+        batch = json.loads(client.post('/api/papers/batch', json={'ids': ['2024.12345']}).data)
+        assert set(batch['papers'][0]) == set(single)
+        response = client.post('/api/papers/batch', json={'ids': ['2024.12345'], 'fields': ['deleted']})
+        assert set(json.loads(response.data)['papers'][0]) == {'id', 'doi', 'deleted'}
+
+    def test_batch_skips_deleted_papers(self, client):
+        """Test that soft-deleted papers are reported as not found."""
+        response = client.post('/api/papers/batch', json={'ids': ['2024.12348']})
+        data = json.loads(response.data)
+        assert data['papers'] == []
+        assert data['not_found'] == ['2024.12348']
+
+    def test_batch_validation(self, client):
+        """Test that bad input is rejected with 400."""
+        from src.routes.papers import MAX_BATCH
+
+        assert client.post('/api/papers/batch', json={'ids': '2024.12345'}).status_code == 400
+        assert client.post('/api/papers/batch', json={'ids': ['x'] * (MAX_BATCH + 1)}).status_code == 400
+        response = client.post('/api/papers/batch', json={'ids': ['2024.12345'], 'fields': ['password']})
+        assert response.status_code == 400
+
     def test_get_papers_default(self, client):
         """Test getting papers with default parameters."""
         response = client.get('/api/papers')
@@ -516,6 +591,636 @@ class TestDualDatabase:
         assert papers_before == papers_after
 
 
+class TestDataDBPool:
+    """Test the shared data DB connection manager."""
+
+    def test_cursors_are_returned_after_request(self, client):
+        """Test that each request releases its cursor on teardown."""
+        from src.database import data_db_manager
+
+        for _ in range(3):
+            response = client.get('/api/health')
+            assert response.status_code == 200
+
+        stats = data_db_manager.stats()
+        assert stats['open'] is True
+        assert stats['cursors_in_use'] <= 1  # only the app_ctx fixture's, if any
+
+    def test_health_reports_pool(self, client):
+        """Test that the health endpoint exposes pool stats."""
+        response = client.get('/api/health')
+        data = json.loads(response.data)
+        assert 'data_db_pool' in data
+        assert data['data_db_pool']['max_cursors'] > 0
+
+    def test_acquire_times_out_when_exhausted(self, test_db_path):
+        """Test that the cursor bound raises instead of blocking forever."""
+        from src.database import DataDBManager, DataDBUnavailable
+
+        manager = DataDBManager(test_db_path, read_only=False, max_cursors=1,
+                                acquire_timeout=0.01, health_interval=30)
+        cursor = manager.acquire()
+        try:
+            with pytest.raises(DataDBUnavailable):
+                manager.acquire()
+        finally:
+            manager.release(cursor)
+        manager.release(manager.acquire())
+        manager.close()
+        assert manager.stats()['open'] is False
+
+    def test_swap_lets_in_flight_cursors_finish(self, tmp_path):
+        """Test that a swap leaves cursors already handed out on the old snapshot."""
+        import duckdb
+        from src.database import DataDBManager
+
+        for name, version in (('old.db', 'v1'), ('new.db', 'v2')):
+            conn = duckdb.connect(str(tmp_path / name))
+            conn.execute("CREATE TABLE data_version AS SELECT ? AS version", [version])
+            conn.close()
+
+        manager = DataDBManager(str(tmp_path / 'old.db'), read_only=True, max_cursors=4,
+                                acquire_timeout=0.01, health_interval=30)
+        assert manager.version == 'v1'
+        in_flight = manager.acquire()
+
+        assert manager.swap(str(tmp_path / 'new.db')) == 'v2'
+        assert manager.stats()['retired_connections'] == 1
+        assert in_flight.execute("SELECT version FROM data_version").fetchone()[0] == 'v1'
+
+        fresh = manager.acquire()
+        assert fresh.execute("SELECT version FROM data_version").fetchone()[0] == 'v2'
+        manager.release(fresh)
+        manager.release(in_flight)
+        assert manager.stats()['retired_connections'] == 0
+        manager.close()
+
+    @pytest.mark.parametrize('read_only', [True, False])
+    def test_swap_reopens_replaced_file(self, tmp_path, read_only):
+        """Test that a file replaced at the same path is read after a swap."""
+        import os
+        import duckdb
+        from src.database import DataDBManager
+
+        path, staged = str(tmp_path / 'data.db'), str(tmp_path / 'staged.db')
+        for name, version in ((path, 'v1'), (staged, 'v2')):
+            conn = duckdb.connect(name)
+            conn.execute("CREATE TABLE data_version AS SELECT ? AS version", [version])
+            conn.execute("CREATE TABLE papers AS SELECT ? AS id", [f'paper-{version}'])
+            conn.close()
+
+        manager = DataDBManager(path, read_only=read_only, max_cursors=2,
+                                acquire_timeout=0.01, health_interval=30)
+        assert manager.version == 'v1'
+        os.replace(staged, path)
+
+        assert manager.check_for_new_snapshot() is True
+        assert manager.version == 'v2'
+        cursor = manager.acquire()
+        try:
+            assert cursor.execute("SELECT id FROM papers").fetchall() == [('paper-v2',)]
+        finally:
+            manager.release(cursor)
+        assert manager.check_for_new_snapshot() is False
+
+        if read_only:
+            # An explicit reload of the same path reopens it as well
+            in_flight = manager.acquire()
+            assert manager.swap() == 'v2'
+            assert in_flight.execute("SELECT id FROM papers").fetchall() == [('paper-v2',)]
+            manager.release(in_flight)
+        manager.close()
+
+    def test_version_falls_back_to_file_stamp(self, tmp_path):
+        """Test that a snapshot without data_version is identified by its file."""
+        import duckdb
+        from src.database import DataDBManager
+
+        path = str(tmp_path / 'plain.db')
+        duckdb.connect(path).close()
+        manager = DataDBManager(path, read_only=True, max_cursors=1,
+                                acquire_timeout=0.01, health_interval=30)
+        assert manager.version == DataDBManager.file_stamp(path)
+        assert manager.check_for_new_snapshot() is False
+        manager.close()
+
+    @pytest.fixture
+    def attached(self, tmp_path):
+        """A manager whose connection lives on a separate user DB with the data DB attached."""
+        import duckdb
+        from src.database import DataDBManager
+
+        data_path, user_path = str(tmp_path / 'data.db'), str(tmp_path / 'user.db')
+        conn = duckdb.connect(data_path)
+        conn.execute("CREATE TABLE papers AS SELECT * FROM (VALUES ('p1', 5), ('p2', 7)) t(id, citation_count)")
+        conn.execute("CREATE TABLE data_version AS SELECT 'v1' AS version")
+        conn.close()
+        conn = duckdb.connect(user_path)
+        conn.execute("CREATE TABLE user_read_history (user_id INTEGER, paper_id VARCHAR)")
+        conn.close()
+
+        manager = DataDBManager(data_path, read_only=True, max_cursors=4, acquire_timeout=0.01,
+                                health_interval=30, user_db_path=user_path)
+        yield manager, data_path, user_path
+        manager.close()
+
+    def test_attached_user_db_joins_in_sql(self, attached):
+        """Test that data cursors see writes made through a per-request user connection."""
+        import duckdb
+        manager, _, user_path = attached
+        cursor = manager.acquire()
+        try:
+            assert manager.version == 'v1'
+            assert manager.user_catalog == 'user'
+            user_db = duckdb.connect(user_path)
+            user_db.execute("INSERT INTO user_read_history VALUES (1, 'p2')")
+            user_db.close()
+
+            rows = cursor.execute("""
+                SELECT p.id, p.citation_count FROM papers p
+                JOIN "user".main.user_read_history h ON h.paper_id = p.id
+                WHERE h.user_id = 1
+            """).fetchall()
+            assert rows == [('p2', 7)]
+            assert manager.has_table('papers', cursor)
+            assert not manager.has_table('user_read_history', cursor)
+            with pytest.raises(duckdb.Error):
+                cursor.execute("INSERT INTO papers VALUES ('p3', 0)")
+        finally:
+            manager.release(cursor)
+
+    def test_attached_swap_detaches_old_snapshot(self, attached, tmp_path):
+        """Test that swapping re-attaches under a new catalog and drops the old one."""
+        import duckdb
+        manager, data_path, _ = attached
+        new_path = str(tmp_path / 'data-2.db')
+        conn = duckdb.connect(new_path)
+        conn.execute("CREATE TABLE data_version AS SELECT 'v2' AS version")
+        conn.close()
+
+        in_flight = manager.acquire()
+        assert manager.swap(new_path) == 'v2'
+        assert in_flight.execute("SELECT version FROM data_version").fetchone()[0] == 'v1'
+        manager.release(in_flight)
+
+        cursor = manager.acquire()
+        try:
+            catalogs = {r[0] for r in cursor.execute("SELECT database_name FROM duckdb_databases()").fetchall()}
+            assert catalogs >= {'user', 'data_2'} and 'data_1' not in catalogs
+            assert cursor.execute("SELECT version FROM data_version").fetchone()[0] == 'v2'
+        finally:
+            manager.release(cursor)
+
+
+class TestDataVersion:
+    """Test the data version in cache keys and the admin reload endpoint."""
+
+    def test_cache_keys_follow_version(self, monkeypatch):
+        """Test that a new data DB version changes every cache key."""
+        from src.cache import data_cache_key, single_flight
+
+        def keys():
+            with app.test_request_context('/api/microtopics?limit=5'):
+                return data_cache_key(), single_flight.make_cache_key()
+
+        before = keys()
+        assert data_db_manager.version in before[0]
+        monkeypatch.setattr(data_db_manager, '_version', 'next-snapshot')
+        after = keys()
+        assert after[0] != before[0] and after[1] != before[1]
+        assert 'next-snapshot' in after[0]
+
+    def test_reload_disabled_without_token(self, client, monkeypatch):
+        """Test that reload is refused when ADMIN_TOKEN is unset or wrong."""
+        monkeypatch.delenv('ADMIN_TOKEN', raising=False)
+        response = client.post('/api/admin/data-db/reload', headers={'X-Admin-Token': ''})
+        assert response.status_code == 403
+
+        monkeypatch.setenv('ADMIN_TOKEN', 'secret')
+        response = client.post('/api/admin/data-db/reload', headers={'X-Admin-Token': 'wrong'})
+        assert response.status_code == 403
+
+    def test_reload_rejects_paths_outside_data_dir(self, client, monkeypatch):
+        """Test that only snapshots next to the current data DB can be loaded."""
+        monkeypatch.setenv('ADMIN_TOKEN', 'secret')
+        headers = {'X-Admin-Token': 'secret'}
+        response = client.post('/api/admin/data-db/reload', json={'path': '../data.db'}, headers=headers)
+        assert response.status_code == 400
+        response = client.post('/api/admin/data-db/reload', json={'path': 'missing.db'}, headers=headers)
+        assert response.status_code == 404
+
+    def test_reload_reopens_data_db(self, client, monkeypatch):
+        """Test that reload swaps the connection and reports the version."""
+        monkeypatch.setenv('ADMIN_TOKEN', 'secret')
+        response = client.post('/api/admin/data-db/reload', headers={'X-Admin-Token': 'secret'})
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['version'] == data_db_manager.version
+        assert client.get('/api/health').status_code == 200
+
+
+class TestKeywordSearch:
+    """Test /api/papers?keyword= on the BM25 index."""
+
+    @pytest.fixture(autouse=True)
+    def fts_index(self, app_ctx, pipeline):
+        """Build the fts_* tables in the test database."""
+        self.module = pipeline('process_fts')
+        self.module.build_fts_index(get_data_db())
+        yield
+        for table in ('fts_docs', 'fts_dict', 'fts_postings', 'fts_stats'):
+            get_data_db().execute(f"DROP TABLE IF EXISTS {table}")
+        data_db_manager.forget_tables()
+
+    def test_keyword_uses_index(self, client):
+        """Test that a keyword matches on whole terms and reports the total."""
+        response = client.get('/api/papers?keyword=machine')
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['total'] == 1
+        assert [p['id'] for p in data['papers']] == ['2024.12345']
+
+    def test_all_terms_must_match(self, client):
+        """Test that every keyword term has to occur in the paper."""
+        response = client.get('/api/papers?keyword=machine%20vision%20')
+        data = json.loads(response.data)
+        assert data['total'] == 0
+
+    def test_last_term_is_prefix(self, client):
+        """Test search-as-you-type: an unfinished last term matches as a prefix."""
+        data = json.loads(client.get('/api/papers?keyword=transfor').data)
+        assert [p['id'] for p in data['papers']] == ['2024.12347']
+        data = json.loads(client.get('/api/papers?keyword=transfor%20').data)
+        assert data['total'] == 0
+
+    def test_deleted_papers_excluded(self, client):
+        """Test that deleted papers stay out of keyword results."""
+        data = json.loads(client.get('/api/papers?keyword=deleted').data)
+        assert data['total'] == 0
+
+    def test_rank_relevance(self, client):
+        """Test that rank=relevance orders by BM25 score."""
+        response = client.get('/api/papers?keyword=paper&rank=relevance')
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        scores = [p['relevance'] for p in data['papers']]
+        assert len(scores) == data['total'] > 1
+        assert scores == sorted(scores, reverse=True)
+
+    def test_rank_relevance_cursor(self, client):
+        """Test that relevance-ranked results page with cursors."""
+        full = json.loads(client.get('/api/papers?keyword=paper&rank=relevance&per_page=100').data)
+        ids, cursor = [], None
+        while True:
+            url = '/api/papers?keyword=paper&rank=relevance&per_page=1'
+            data = json.loads(client.get(url + (f'&cursor={cursor}' if cursor else '')).data)
+            ids.extend(p['id'] for p in data['papers'])
+            cursor = data['next_cursor']
+            if cursor is None:
+                break
+        assert ids == [p['id'] for p in full['papers']]
+
+    def test_count_matches_total(self, client):
+        """Test that /api/count_papers agrees with the listing total."""
+        listing = json.loads(client.get('/api/papers?keyword=sample').data)
+        count = json.loads(client.get('/api/count_papers?keyword=sample').data)
+        assert count['count'] == listing['total']
+
+    def test_added_paper_matches(self, client):
+        """Test that a paper added through the API, which is not indexed, is still found."""
+        import time
+        doi = f'10.test/Keyword.{int(time.time() * 1000)}'
+        assert client.post('/api/papers', json={'doi': doi, 'title': 'Quokka Paper'}).status_code == 201
+        try:
+            cache.clear()
+            data = json.loads(client.get('/api/papers?keyword=quokk').data)
+            assert [p['doi'] for p in data['papers']] == [doi]
+            data = json.loads(client.get('/api/papers?keyword=paper&rank=relevance&per_page=100').data)
+            assert data['papers'][-1]['doi'] == doi
+            assert len(data['papers']) == data['total']
+        finally:
+            client.delete(f'/api/papers/{doi}')
+            cache.clear()
+
+    def test_edited_paper_reindexed(self, client, data_db):
+        """Test that editing a paper's title updates its index entries."""
+        def index_state():
+            return data_db.execute("""
+                SELECT d.term, d.df, p.docid, p.tf FROM fts_postings p
+                JOIN fts_dict d USING (termid) ORDER BY ALL
+            """).fetchall(), data_db.execute("SELECT * FROM fts_docs ORDER BY docid").fetchall()
+
+        url = '/api/papers/10.1234/test.paper.002'
+        before = index_state()
+        try:
+            assert client.put(url, json={'title': 'Wombat Burrows'}).status_code == 200
+            cache.clear()
+            data = json.loads(client.get('/api/papers?keyword=wombat').data)
+            assert [p['id'] for p in data['papers']] == ['2024.12346']
+            data = json.loads(client.get('/api/papers?keyword=another%20').data)
+            assert data['total'] == 0
+        finally:
+            client.put(url, json={'title': 'Another Sample Paper on Computer Vision'})
+            cache.clear()
+        assert index_state() == before
+
+    def test_tokenize(self):
+        """Test that query tokenization folds accents and drops stopwords."""
+        from src.search import tokenize
+
+        assert tokenize("The Schrödinger equation, of the") == ['schrodinger', 'equation']
+
+
+class TestCursorPagination:
+    """Test keyset pagination via `cursor` / `next_cursor`."""
+
+    def walk(self, client, url, key):
+        """Follow next_cursor from the first page; return the ids seen."""
+        ids, cursor = [], None
+        for _ in range(50):
+            page_url = url + (f"&cursor={cursor}" if cursor else "")
+            response = client.get(page_url)
+            assert response.status_code == 200
+            data = json.loads(response.data)
+            ids.extend(p['id'] or p['doi'] for p in data[key])
+            cursor = data['next_cursor']
+            if cursor is None:
+                return ids
+        pytest.fail("cursor pagination did not terminate")
+
+    @pytest.mark.parametrize("sort", [
+        "sort_by=citation_count&sort_order=DESC",
+        "sort_by=update_date&sort_order=ASC",
+        "sort_by=title&sort_order=ASC",
+    ])
+    def test_cursor_walk_matches_offset_order(self, client, sort):
+        """Test that walking cursors yields the same order as one big page, API-added papers included."""
+        import time
+        doi = f'10.test/Cursor.{int(time.time() * 1000)}'
+        assert client.post('/api/papers', json={'doi': doi, 'title': 'No Id Yet'}).status_code == 201
+        try:
+            cache.clear()
+            full = json.loads(client.get(f'/api/papers?per_page=100&{sort}').data)
+            assert doi in [p['doi'] for p in full['papers'] if p['id'] is None]
+            assert full['next_cursor'] is None
+
+            ids = self.walk(client, f'/api/papers?per_page=2&{sort}', 'papers')
+            assert ids == [p['id'] or p['doi'] for p in full['papers']]
+            assert len(ids) == full['total']
+        finally:
+            client.delete(f'/api/papers/{doi}')
+            cache.clear()
+
+    def test_first_page_has_next_cursor(self, client):
+        """Test that a partial page hands out a cursor and OFFSET still works."""
+        first = json.loads(client.get('/api/papers?per_page=2').data)
+        second_by_page = json.loads(client.get('/api/papers?per_page=2&page=2').data)
+        second_by_cursor = json.loads(
+            client.get(f"/api/papers?per_page=2&cursor={first['next_cursor']}").data
+        )
+        assert first['next_cursor']
+        assert [p['id'] for p in second_by_cursor['papers']] == [p['id'] for p in second_by_page['papers']]
+
+    def test_invalid_cursor(self, client):
+        """Test that garbage or mismatched cursors are rejected."""
+        assert client.get('/api/papers?cursor=not-a-cursor').status_code == 400
+        first = json.loads(client.get('/api/papers?per_page=1').data)
+        response = client.get(f"/api/papers?per_page=1&sort_by=title&cursor={first['next_cursor']}")
+        assert response.status_code == 400
+
+    def test_microtopic_papers_cursor(self, client):
+        """Test cursor pagination on microtopic papers."""
+        ids = self.walk(client, '/api/microtopics/mt-ml-001/papers?per_page=1', 'papers')
+        full = json.loads(client.get('/api/microtopics/mt-ml-001/papers?per_page=100').data)
+        assert ids == [p['id'] for p in full['papers']]
+        assert len(ids) == full['total']
+
+    def test_citations_cursor(self, client):
+        """Test that the citations list returns next_cursor."""
+        response = client.get('/api/papers/10.1234/cited.paper.001/citations?per_page=1')
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert 'next_cursor' in data
+        assert client.get('/api/papers/x/citations?cursor=%%%').status_code == 400
+
+
+class TestCitedByIndex:
+    """Test /api/papers/<id>/citations on the paper_cited_by table."""
+
+    @pytest.fixture(autouse=True)
+    def cited_by(self, app_ctx, pipeline):
+        """Build the reverse-citation table in the test database."""
+        self.module = pipeline('process_cited_by')
+        self.module.build_cited_by(get_data_db())
+        yield
+        get_data_db().execute("DROP TABLE IF EXISTS paper_cited_by")
+        data_db_manager.forget_tables()
+
+    def test_citations_from_edge_table(self, client):
+        """Test that citing papers and count come from the edge table."""
+        response = client.get('/api/papers/10.1234/cited.paper.004/citations')
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['count'] == 1
+        assert [p['id'] for p in data['citing_papers']] == ['2024.12349']
+        assert data['next_cursor'] is None
+
+    def test_count_skips_deleted_citers(self, client, data_db):
+        """Test that a citing paper deleted after the build leaves count and rows alike."""
+        data_db.execute("UPDATE papers SET deleted = true WHERE id = '2024.12349'")
+        try:
+            cache.clear()
+            data = json.loads(client.get('/api/papers/10.1234/cited.paper.004/citations').data)
+            assert data['count'] == 0
+            assert data['citing_papers'] == []
+        finally:
+            data_db.execute("UPDATE papers SET deleted = false WHERE id = '2024.12349'")
+            cache.clear()
+
+    def test_uncited_paper(self, client):
+        """Test a paper nobody cites."""
+        data = json.loads(client.get('/api/papers/nobody-cites-this/citations').data)
+        assert data['count'] == 0
+        assert data['citing_papers'] == []
+
+    def test_incremental_update(self, data_db):
+        """Test that update_cited_by follows a change to papers.citations."""
+        original = data_db.execute(
+            "SELECT citations FROM papers WHERE id = '2024.12347'"
+        ).fetchone()[0]
+        try:
+            data_db.execute(
+                "UPDATE papers SET citations = ['10.1234/cited.paper.004'] WHERE id = '2024.12347'"
+            )
+            self.module.update_cited_by(data_db, "SELECT ?", ['2024.12347'])
+            counts = dict(data_db.execute(
+                "SELECT cited_id, COUNT(*) FROM paper_cited_by GROUP BY cited_id"
+            ).fetchall())
+            assert counts['10.1234/cited.paper.004'] == 2
+
+            data_db.execute("UPDATE papers SET citations = [] WHERE id = '2024.12347'")
+            self.module.update_cited_by(data_db, "SELECT ?", ['2024.12347'])
+            counts = dict(data_db.execute(
+                "SELECT cited_id, COUNT(*) FROM paper_cited_by GROUP BY cited_id"
+            ).fetchall())
+            assert counts['10.1234/cited.paper.004'] == 1
+        finally:
+            data_db.execute(
+                "UPDATE papers SET citations = ? WHERE id = '2024.12347'", [original]
+            )
+            self.module.build_cited_by(data_db)
+
+
+class TestCategoryIndex:
+    """Test subject filters on the paper_categories table."""
+
+    @pytest.fixture(autouse=True)
+    def categories(self, app_ctx, pipeline):
+        """Build paper_categories / category_dict in the test database."""
+        pipeline('process_categories').build_categories(get_data_db())
+        yield
+        for table in ('paper_categories', 'category_dict'):
+            get_data_db().execute(f"DROP TABLE IF EXISTS {table}")
+        data_db_manager.forget_tables()
+
+    def test_exact_category(self, client):
+        """Test that a subject matches whole categories only."""
+        data = json.loads(client.get('/api/papers?subject=cs.LG&sort_by=title&sort_order=ASC').data)
+        assert sorted(p['id'] for p in data['papers']) == ['2024.12345', '2024.12349']
+        assert data['total'] == 2
+
+        data = json.loads(client.get('/api/papers?subject=cs.L').data)
+        assert data['total'] == 0
+
+    def test_archive(self, client):
+        """Test that a dot-less subject matches the whole archive."""
+        by_archive = json.loads(client.get('/api/count_papers?subject=cs').data)
+        by_category = sum(
+            json.loads(client.get(f'/api/count_papers?subject={c}').data)['count']
+            for c in ('cs.CL', 'cs.CV')
+        )
+        assert by_archive['count'] >= by_category > 0
+
+    def test_primary_flag(self, data_db):
+        """Test that the first listed category is the primary one."""
+        rows = data_db.execute(
+            "SELECT category, is_primary FROM paper_categories WHERE paper_id = '2024.12349' ORDER BY category"
+        ).fetchall()
+        assert rows == [('cs.AI', True), ('cs.CV', False), ('cs.LG', False)]
+
+    def test_analytics_subject(self, client):
+        """Test that analytics subject filters go through the table."""
+        data = json.loads(client.get('/api/analytics/citations/distribution?subject=cs.CL').data)
+        assert sum(d['paper_count'] for d in data['distribution']) == 1
+
+    def test_added_paper(self, client):
+        """Test that a paper added through the API, which has no id, is matched by its categories."""
+        import time
+        doi = f'10.test/Subject.{int(time.time() * 1000)}'
+        response = client.post('/api/papers', json={'doi': doi, 'title': 'Unindexed', 'categories': 'zz.QA cs.LG'})
+        assert response.status_code == 201
+        try:
+            cache.clear()
+
+            def count(subject):
+                return json.loads(client.get(f'/api/count_papers?subject={subject}').data)['count']
+
+            assert count('zz.QA') == count('zz') == 1
+            assert count('zz.Q') == 0
+        finally:
+            client.delete(f'/api/papers/{doi}')
+            cache.clear()
+
+    def test_recategorized_paper(self, client, data_db):
+        """Test that updating a paper's categories updates its index rows."""
+        before = data_db.execute(
+            "SELECT * FROM paper_categories WHERE paper_id = '2024.12347' ORDER BY category"
+        ).fetchall()
+        try:
+            response = client.put('/api/papers/10.1234/test.paper.003', json={'categories': 'zz.RC cs.CV'})
+            assert response.status_code == 200
+            cache.clear()
+            data = json.loads(client.get('/api/papers?subject=zz.RC').data)
+            assert [p['id'] for p in data['papers']] == ['2024.12347']
+            data = json.loads(client.get('/api/papers?subject=cs.CL').data)
+            assert '2024.12347' not in [p['id'] for p in data['papers']]
+            assert data_db.execute(
+                "SELECT archive, paper_count, primary_count FROM category_dict WHERE category = 'zz.RC'"
+            ).fetchone() == ('zz', 1, 1)
+        finally:
+            client.put('/api/papers/10.1234/test.paper.003', json={'categories': 'cs.CL'})
+            cache.clear()
+        assert data_db.execute(
+            "SELECT * FROM paper_categories WHERE paper_id = '2024.12347' ORDER BY category"
+        ).fetchall() == before
+
+
+class TestAuthorIndex:
+    """Test author filters and analytics on the paper_authors table."""
+
+    @pytest.fixture(autouse=True)
+    def paper_authors(self, app_ctx, pipeline):
+        """Build paper_authors (and paper_categories) in the test database."""
+        pipeline('process_paper_authors').build_paper_authors(get_data_db())
+        pipeline('process_categories').build_categories(get_data_db())
+        yield
+        for table in ('paper_authors', 'paper_author_tokens', 'paper_categories', 'category_dict'):
+            get_data_db().execute(f"DROP TABLE IF EXISTS {table}")
+        data_db_manager.forget_tables()
+
+    def test_author_slots(self, data_db):
+        """Test that ids and names are lined up by byline position."""
+        rows = data_db.execute("""
+            SELECT author_id, position, normalized_name FROM paper_authors
+            WHERE paper_id = '2024.12345' ORDER BY position
+        """).fetchall()
+        assert rows == [
+            ('https://orcid.org/0000-0001-0001-0001', 1, 'alice smith'),
+            ('https://orcid.org/0000-0001-0001-0002', 2, 'bob jones'),
+        ]
+
+    def test_author_name_filter(self, client):
+        """Test filtering papers by an author's last name."""
+        data = json.loads(client.get('/api/papers?author=JONES').data)
+        assert [p['id'] for p in data['papers']] == ['2024.12345']
+        count = json.loads(client.get('/api/count_papers?author=jones').data)
+        assert count['count'] == 1
+
+    def test_author_name_matching_rules(self, client):
+        """Test that names match the words of one author in any order, the last as a prefix."""
+        def ids(author):
+            return [p['id'] for p in json.loads(client.get(f'/api/papers?author={author}').data)['papers']]
+
+        assert ids('Smith%20Alice') == ids('alice%20smith') == ['2024.12345']
+        assert ids('smi') == ids('smith%20al') == ['2024.12345']
+        assert ids('smi%20alice') == []
+        # Words from two different authors of the same paper do not combine
+        assert ids('alice%20jones') == []
+
+    def test_author_id_filter(self, client):
+        """Test filtering papers by ORCID."""
+        data = json.loads(
+            client.get('/api/papers?author=https://orcid.org/0000-0001-0001-0005').data
+        )
+        assert [p['id'] for p in data['papers']] == ['2024.12347']
+
+    def test_top_authors_by_subject(self, client):
+        """Test that top authors for a subject come from that subject's papers."""
+        response = client.get('/api/analytics/authors/top?subject=cs.CV&sort_by=h_index')
+        assert response.status_code == 200
+        authors = json.loads(response.data)['top_authors']
+        assert [a['author_id'] for a in authors] == [
+            'https://orcid.org/0000-0001-0001-0007',
+            'https://orcid.org/0000-0001-0001-0003',
+        ]
+
+    def test_normalize_author_name(self):
+        """Test the Python name folding used for the author parameter."""
+        from src.filters import normalize_author_name
+
+        assert normalize_author_name("  José  O'Neil ") == "jose o neil"
+
+
 class TestReadingList:
     """Test reading list functionality."""
 
@@ -532,6 +1237,349 @@ class TestReadingList:
         assert response.status_code == 401
 
 
+class TestAuthCache:
+    """Test the verified-token and firebase_uid caches behind require_auth."""
+
+    def test_token_verified_once(self, client, fake_firebase):
+        """Test that repeated calls with one token verify it once."""
+        import uuid
+        uid = f'authcache_{uuid.uuid4().hex[:8]}'
+        user_id = register_user(client, uid)
+        headers = {'Authorization': f'Bearer token-{uid}'}
+
+        for _ in range(3):
+            response = client.get(f'/api/users/{user_id}/reading-list', headers=headers)
+            assert response.status_code == 200
+        assert fake_firebase == [f'token-{uid}']
+
+    def test_expired_token_is_verified_again(self, fake_firebase):
+        """Test that a cached token is dropped at its exp."""
+        import time
+        from src.auth import verified_tokens, verify_token, _token_key
+
+        verified_tokens.set(_token_key('token-old'), {'uid': 'old'}, expires_at=time.time() - 1)
+        assert verify_token('token-old')['uid'] == 'old'
+        assert fake_firebase == ['token-old']
+
+    def test_delete_drops_cached_user(self, client, fake_firebase):
+        """Test that a deleted account cannot reuse its cached token or row."""
+        import uuid
+        uid = f'authdel_{uuid.uuid4().hex[:8]}'
+        user_id = register_user(client, uid)
+        headers = {'Authorization': f'Bearer token-{uid}'}
+
+        assert client.get(f'/api/users/{user_id}/reading-list', headers=headers).status_code == 200
+        assert client.delete(f'/api/users/{user_id}', headers=headers).status_code == 200
+        response = client.get(f'/api/users/{user_id}/reading-list', headers=headers)
+        assert response.status_code == 404
+        assert len(fake_firebase) == 2
+
+    def test_cached_user_row_expires(self, client, fake_firebase, monkeypatch):
+        """Test that a user row changed outside this worker stops authenticating after the TTL."""
+        import time
+        import uuid
+        from src import auth
+        uid = f'authttl_{uuid.uuid4().hex[:8]}'
+        user_id = register_user(client, uid)
+        headers = {'Authorization': f'Bearer token-{uid}'}
+        url = f'/api/users/{user_id}/reading-list'
+
+        assert client.get(url, headers=headers).status_code == 200
+        # Another worker unlinks the account; this one has not been told
+        get_user_db().execute("UPDATE users SET firebase_uid = ? WHERE id = ?", [f'{uid}-moved', user_id])
+        assert client.get(url, headers=headers).status_code == 200
+
+        later = time.time() + auth.USER_CACHE_TTL + 1
+        monkeypatch.setattr(auth.time, 'time', lambda: later)
+        assert client.get(url, headers=headers).status_code == 404
+
+
+class TestRecommendations:
+    """Test GET /api/users/<id>/recommendations on the test data."""
+
+    def read(self, client, uid, *paper_ids):
+        user_id = register_user(client, uid)
+        headers = {'Authorization': f'Bearer token-{uid}'}
+        for paper_id in paper_ids:
+            response = client.post(f'/api/users/{user_id}/read-history',
+                                   json={'paper_id': paper_id}, headers=headers)
+            assert response.status_code in (200, 201)
+        return user_id, headers
+
+    def test_topic_similarity(self, client, fake_firebase):
+        """Test that papers sharing microtopics with a fresh read score 0.7 + 0.05 * 2.0."""
+        import uuid
+        user_id, headers = self.read(client, f'recs_{uuid.uuid4().hex[:8]}', '2024.12345')
+
+        response = client.get(f'/api/users/{user_id}/recommendations?strategy=topic_similarity',
+                              headers=headers)
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        by_id = {r['id']: r for r in data['recommendations']}
+        assert set(by_id) == {'2024.12346', '2024.12349'}
+        assert data['count'] == 2
+        for rec in by_id.values():
+            assert rec['score'] == pytest.approx(0.8)
+            assert rec['reason'] == 'Shares topics with your reading history'
+            assert {'title', 'citation_count', 'categories', 'update_date'} <= set(rec)
+
+    def test_no_history(self, client, fake_firebase):
+        """Test that a user without reads gets no recommendations."""
+        import uuid
+        user_id, headers = self.read(client, f'recs_{uuid.uuid4().hex[:8]}')
+
+        response = client.get(f'/api/users/{user_id}/recommendations', headers=headers)
+        assert response.status_code == 200
+        assert json.loads(response.data) == {'recommendations': [], 'count': 0}
+
+    def test_served_from_precomputed_row(self, client, user_db, fake_firebase):
+        """Test that reads queue a refresh and GET returns the stored list."""
+        import uuid
+        from src.precompute import recommendation_queue
+        user_id, headers = self.read(client, f'recs_{uuid.uuid4().hex[:8]}', '2024.12345')
+        url = f'/api/users/{user_id}/recommendations?strategy=topic_similarity'
+        inline = json.loads(client.get(url, headers=headers).data)
+
+        assert recommendation_queue.flush()
+        stored = user_db.execute(
+            "SELECT strategy, len(recommendations) FROM user_recommendations WHERE user_id = ?",
+            [user_id]).fetchall()
+        assert dict(stored)['topic_similarity'] == 2
+        assert {s for s, _ in stored} == {'hybrid', 'citation_graph', 'topic_similarity'}
+        assert json.loads(client.get(url, headers=headers).data) == inline
+
+        user_db.execute(
+            "UPDATE user_recommendations SET recommendations = recommendations[1:1] "
+            "WHERE user_id = ? AND strategy = 'topic_similarity'", [user_id])
+        assert json.loads(client.get(url, headers=headers).data)['count'] == 1
+
+    def test_read_paper_dropped_before_refresh(self, client, user_db, fake_firebase):
+        """Test that a newly read paper leaves the stored lists at once."""
+        import uuid
+        from src.precompute import recommendation_queue
+        user_id, headers = self.read(client, f'recs_{uuid.uuid4().hex[:8]}', '2024.12345')
+        assert recommendation_queue.flush()
+
+        client.post(f'/api/users/{user_id}/read-history', json={'paper_id': '2024.12349'}, headers=headers)
+        data = json.loads(client.get(f'/api/users/{user_id}/recommendations?strategy=topic_similarity',
+                                     headers=headers).data)
+        assert [r['id'] for r in data['recommendations']] == ['2024.12346']
+        assert recommendation_queue.flush()
+
+    def test_stale_snapshot_is_refreshed(self, client, user_db, fake_firebase):
+        """Test that rows from another data DB version are served, then recomputed."""
+        import uuid
+        from src.precompute import recommendation_queue
+        user_id, headers = self.read(client, f'recs_{uuid.uuid4().hex[:8]}', '2024.12345')
+        assert recommendation_queue.flush()
+        user_db.execute("UPDATE user_recommendations SET data_version = 'old' WHERE user_id = ?", [user_id])
+
+        response = client.get(f'/api/users/{user_id}/recommendations', headers=headers)
+        assert response.status_code == 200
+        assert recommendation_queue.flush()
+        versions = user_db.execute(
+            "SELECT DISTINCT data_version FROM user_recommendations WHERE user_id = ?", [user_id]).fetchall()
+        assert versions == [(data_db_manager.version,)]
+
+    def test_delete_user_drops_rows(self, client, user_db, fake_firebase):
+        """Test that deleting the account removes its stored recommendations."""
+        import uuid
+        from src.precompute import recommendation_queue
+        user_id, headers = self.read(client, f'recs_{uuid.uuid4().hex[:8]}', '2024.12345')
+        assert recommendation_queue.flush()
+        assert client.delete(f'/api/users/{user_id}', headers=headers).status_code == 200
+        count = user_db.execute(
+            "SELECT COUNT(*) FROM user_recommendations WHERE user_id = ?", [user_id]).fetchone()[0]
+        assert count == 0
+
+
+class TestUserDataJoins:
+    """Test user-DB data joined to papers in one data DB query."""
+
+    def signed_in(self, client, *read):
+        import uuid
+        uid = f'joins_{uuid.uuid4().hex[:8]}'
+        user_id = register_user(client, uid)
+        headers = {'Authorization': f'Bearer token-{uid}'}
+        for paper_id in read:
+            client.post(f'/api/users/{user_id}/read-history', json={'paper_id': paper_id}, headers=headers)
+        return user_id, headers
+
+    def test_read_history_sorts_across_pages(self, client, fake_firebase):
+        """Test that sorting by citation_count orders the whole history, not one page."""
+        user_id, headers = self.signed_in(client, '2024.12347', '2024.12349', '2024.12346', 'missing.paper')
+        url = f'/api/users/{user_id}/read-history?sort_by=citation_count&sort_order=DESC&per_page=2'
+
+        first = json.loads(client.get(url + '&page=1', headers=headers).data)
+        second = json.loads(client.get(url + '&page=2', headers=headers).data)
+        assert first['count'] == 4
+        assert [h['paper_id'] for h in first['history']] == ['2024.12349', '2024.12346']
+        assert [h['paper_id'] for h in second['history']] == ['2024.12347', 'missing.paper']
+        assert second['history'][1]['title'] is None
+
+    def test_reading_list_joined_to_papers(self, client, fake_firebase):
+        """Test that reading list entries carry paper details, nulls sorted last."""
+        user_id, headers = self.signed_in(client)
+        for paper_id in ('2024.12345', 'missing.paper', '2024.12349'):
+            client.post(f'/api/users/{user_id}/reading-list', json={'paper_id': paper_id}, headers=headers)
+
+        response = client.get(f'/api/users/{user_id}/reading-list?sort_by=citation_count', headers=headers)
+        data = json.loads(response.data)
+        assert data['count'] == 3
+        assert [(p['paper_id'], p['citation_count']) for p in data['papers']] == \
+            [('2024.12349', 100), ('2024.12345', 5), ('missing.paper', None)]
+
+    def test_profile_stats(self, client, fake_firebase):
+        """Test citation and microtopic stats over the read history."""
+        user_id, headers = self.signed_in(client, '2024.12345', '2024.12349')
+        data = json.loads(client.get(f'/api/users/{user_id}', headers=headers).data)
+        assert data['stats']['total_citations_covered'] == 105
+        assert data['stats']['avg_citations_per_read'] == 52
+        counts = {m['microtopic_id']: m['count'] for m in data['reading_by_microtopic']}
+        assert counts == {'mt-ml-001': 2, 'mt-cv-002': 1}
+
+    def test_hot_papers_excludes_read(self, client, fake_firebase):
+        """Test that hot-papers?user_id= drops that user's read papers."""
+        user_id, _ = self.signed_in(client, '2024.12349')
+        response = client.get(f'/api/analytics/hot-papers?since=2020-01-01&limit=10&user_id={user_id}')
+        assert response.status_code == 200
+        ids = [p['id'] for p in json.loads(response.data)['papers']]
+        assert '2024.12345' in ids and '2024.12349' not in ids
+
+        assert client.get('/api/analytics/hot-papers?user_id=abc').status_code == 400
+
+
+class TestUserStats:
+    """Test the materialized profile counts in user_stats."""
+
+    def signed_in(self, client):
+        import uuid
+        uid = f'stats_{uuid.uuid4().hex[:8]}'
+        return register_user(client, uid), {'Authorization': f'Bearer token-{uid}'}
+
+    def profile(self, client, user_id, headers):
+        return json.loads(client.get(f'/api/users/{user_id}', headers=headers).data)
+
+    def test_incremental_counts(self, client, fake_firebase):
+        """Test that reads, removals, reading list and publications update the counts."""
+        user_id, headers = self.signed_in(client)
+        base = f'/api/users/{user_id}'
+        client.post(f'{base}/reading-list', json={'paper_id': '2024.12345'}, headers=headers)
+        client.post(f'{base}/reading-list', json={'paper_id': '2024.12346'}, headers=headers)
+        for paper_id in ('2024.12345', '2024.12349', '2024.12347', 'missing.paper'):
+            client.post(f'{base}/read-history', json={'paper_id': paper_id}, headers=headers)
+        client.delete(f'{base}/read-history/2024.12347', headers=headers)
+        client.post(f'{base}/publications', json={'title': 'Mine', 'year': 2024, 'citation_count': 7}, headers=headers)
+
+        data = self.profile(client, user_id, headers)
+        assert data['stats']['reading_list_count'] == 1
+        assert data['stats']['papers_read_count'] == 3
+        assert data['stats']['total_citations_covered'] == 105
+        assert data['stats']['avg_citations_per_read'] == 52
+        assert data['stats']['publication_count'] == 1
+        assert data['stats']['publication_citations'] == 7
+        counts = {m['microtopic_id']: m['count'] for m in data['reading_by_microtopic']}
+        assert counts == {'mt-ml-001': 2, 'mt-cv-002': 1}
+
+    def test_matches_rebuild(self, client, fake_firebase, data_db, user_db):
+        """Test that the incremental rows equal a rebuild from scratch."""
+        from src import user_stats
+        user_id, headers = self.signed_in(client)
+        base = f'/api/users/{user_id}'
+        for paper_id in ('2024.12345', '2024.12346', '2024.12347'):
+            client.post(f'{base}/read-history', json={'paper_id': paper_id}, headers=headers)
+        client.delete(f'{base}/read-history/2024.12345', headers=headers)
+
+        def snapshot():
+            row = user_db.execute(
+                "SELECT * EXCLUDE (updated_at) FROM user_stats WHERE user_id = ?", [user_id]).fetchone()
+            topics = user_db.execute(
+                "SELECT microtopic_id, paper_count FROM user_reading_by_microtopic WHERE user_id = ? ORDER BY 1",
+                [user_id]).fetchall()
+            return row, topics
+
+        before = snapshot()
+        assert user_stats.rebuild(data_db, user_id) == {'users': 1, 'microtopic_rows': 2}
+        assert snapshot() == before
+
+    def test_missing_or_stale_row_rebuilt(self, client, fake_firebase, user_db):
+        """Test that the profile rebuilds a missing or outdated stats row."""
+        user_id, headers = self.signed_in(client)
+        client.post(f'/api/users/{user_id}/read-history', json={'paper_id': '2024.12349'}, headers=headers)
+
+        user_db.execute("DELETE FROM user_stats WHERE user_id = ?", [user_id])
+        user_db.execute("DELETE FROM user_reading_by_microtopic WHERE user_id = ?", [user_id])
+        assert self.profile(client, user_id, headers)['stats']['total_citations_covered'] == 100
+
+        user_db.execute(
+            "UPDATE user_stats SET data_version = 'old', papers_read_count = 9 WHERE user_id = ?", [user_id])
+        data = self.profile(client, user_id, headers)
+        assert data['stats']['papers_read_count'] == 1
+        assert [m['microtopic_id'] for m in data['reading_by_microtopic']] == ['mt-ml-001']
+
+    def test_failed_update_rolls_back(self, client, fake_firebase, user_db, monkeypatch):
+        """Test that a failing stats update undoes the un-read."""
+        from src import user_stats
+        user_id, headers = self.signed_in(client)
+        client.post(f'/api/users/{user_id}/read-history', json={'paper_id': '2024.12345'}, headers=headers)
+
+        def fail(*args):
+            raise RuntimeError('stats unavailable')
+
+        monkeypatch.setattr(user_stats, 'record_read', fail)
+        response = client.delete(f'/api/users/{user_id}/read-history/2024.12345', headers=headers)
+        assert response.status_code == 500
+        assert user_db.execute(
+            "SELECT COUNT(*) FROM user_read_history WHERE user_id = ?", [user_id]).fetchone()[0] == 1
+
+    def test_deleted_with_user(self, client, fake_firebase, user_db):
+        """Test that deleting the account drops its stats rows."""
+        user_id, headers = self.signed_in(client)
+        client.post(f'/api/users/{user_id}/read-history', json={'paper_id': '2024.12345'}, headers=headers)
+        client.delete(f'/api/users/{user_id}', headers=headers)
+        assert user_db.execute("SELECT COUNT(*) FROM user_stats WHERE user_id = ?", [user_id]).fetchone()[0] == 0
+        assert user_db.execute(
+            "SELECT COUNT(*) FROM user_reading_by_microtopic WHERE user_id = ?", [user_id]).fetchone()[0] == 0
+
+
+class TestLinkAuthor:
+    """Test importing a linked author's papers as publications."""
+
+    def test_imports_found_papers(self, client, fake_firebase, data_db, user_db):
+        """Test that one link imports every found DOI and counts the rest."""
+        import uuid
+        uid = f'link_{uuid.uuid4().hex[:8]}'
+        user_id = register_user(client, uid)
+        headers = {'Authorization': f'Bearer token-{uid}'}
+        author_id = f'https://orcid.org/test-{uid}'
+        data_db.execute("INSERT INTO authors VALUES (?, 'Linked Author', ?, 1, 3, 0)", [
+            author_id, ['10.1234/test.paper.001', '10.1234/test.paper.005', '10.9999/missing']])
+        try:
+            response = client.put(f'/api/users/{user_id}/link-author', json={'author_id': author_id}, headers=headers)
+            data = json.loads(response.data)
+            assert response.status_code == 200
+            assert data['publications_imported'] == 2
+            assert data['publications_not_found'] == 1
+            assert data['total_citations'] == 105
+
+            rows = user_db.execute("""
+                SELECT doi, title, venue, citation_count, coauthors FROM user_publications
+                WHERE user_id = ? ORDER BY doi
+            """, [user_id]).fetchall()
+            assert [r[0] for r in rows] == ['10.1234/test.paper.001', '10.1234/test.paper.005']
+            assert rows[0][2] == 'Test Journal 2024'
+            assert rows[0][3] == 5
+            assert rows[0][4] == ['Alice Smith', 'Bob Jones']
+
+            # Relinking replaces the imported rows instead of duplicating them
+            client.put(f'/api/users/{user_id}/link-author', json={'author_id': author_id}, headers=headers)
+            profile = json.loads(client.get(f'/api/users/{user_id}', headers=headers).data)
+            assert profile['stats']['publication_count'] == 2
+            assert profile['stats']['publication_citations'] == 105
+        finally:
+            data_db.execute("DELETE FROM authors WHERE author_id = ?", [author_id])
+
+
 class TestMicrotopics:
     """Test microtopic endpoints."""
 
@@ -588,6 +1636,275 @@ class TestMicrotopics:
         assert response.status_code == 404
 
 
+class TestDoiNorm:
+    """Test DOI lookups on the indexed papers.doi_norm column."""
+
+    @pytest.fixture
+    def doi_norm(self, app_ctx, pipeline):
+        """Add papers.doi_norm for one test and drop it again afterwards."""
+        db = get_data_db()
+        module = pipeline('process_doi_norm')
+        module.build_doi_norm(db)
+        yield module
+        db.execute(f"DROP INDEX IF EXISTS {module.INDEX_NAME}")
+        db.execute("ALTER TABLE papers DROP COLUMN IF EXISTS doi_norm")
+        data_db_manager.forget_tables()
+
+    def test_sql_matches_python_rules(self, data_db, doi_norm):
+        """Test that the pipeline and the routes normalize DOIs the same way."""
+        from src.filters import normalize_doi
+
+        data_db.execute(doi_norm._NORMALIZE_DOI_MACRO)
+        samples = [' HTTPS://DOI.org/10.1/AbC,, ', 'doi:10.2/x', 'https://doi.org/doi:10.3/y',
+                   '', '  ', None, ',', '10.4/z\t']
+        for raw in samples:
+            assert data_db.execute("SELECT normalize_doi(?)", [raw]).fetchone()[0] == normalize_doi(raw)
+
+    def test_index_built(self, data_db, doi_norm):
+        """Test that every DOI is normalized and indexed."""
+        assert data_db.execute(
+            "SELECT COUNT(*) FROM papers WHERE doi IS NOT NULL AND doi_norm IS NULL"
+        ).fetchone()[0] == 0
+        assert data_db.execute(
+            "SELECT COUNT(*) FROM duckdb_indexes() WHERE index_name = ?", [doi_norm.INDEX_NAME]
+        ).fetchone()[0] == 1
+
+    def test_get_paper_by_doi_url(self, client, doi_norm):
+        """Test that a DOI in URL form resolves to the paper."""
+        response = client.get('/api/papers/https://doi.org/10.1234/TEST.PAPER.001')
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['id'] == '2024.12345'
+        assert 'doi_norm' not in data
+        assert len(data['microtopics']) == 2
+
+    def test_listings_hide_doi_norm(self, client, data_db, doi_norm):
+        """Test that list, citation and reference rows leave out doi_norm like get_paper."""
+        original = data_db.execute("SELECT citations FROM papers WHERE id = '2024.12347'").fetchone()[0]
+        data_db.execute("UPDATE papers SET citations = ['2024.12345'] WHERE id = '2024.12347'")
+        try:
+            cache.clear()
+            rows = [
+                *json.loads(client.get('/api/papers').data)['papers'],
+                *json.loads(client.get('/api/papers?microtopic_id=mt-ml-001').data)['papers'],
+                *json.loads(client.get('/api/papers/2024.12345/citations').data)['citing_papers'],
+                *json.loads(client.get('/api/papers/2024.12347/references').data)['references'],
+            ]
+            assert {'2024.12345', '2024.12347'} <= {r['id'] for r in rows}
+            assert not any('doi_norm' in r for r in rows)
+        finally:
+            data_db.execute("UPDATE papers SET citations = ? WHERE id = '2024.12347'", [original])
+            cache.clear()
+
+    def test_batch_matches_normalized_doi(self, client, doi_norm):
+        """Test that batch lookups match DOIs on doi_norm."""
+        response = client.post('/api/papers/batch', json={'ids': ['doi:10.1234/test.paper.002']})
+        data = json.loads(response.data)
+        assert [p['id'] for p in data['papers']] == ['2024.12346']
+
+    def test_add_paper_sets_doi_norm(self, client, data_db, doi_norm):
+        """Test that new papers get doi_norm so later lookups find them."""
+        import time
+        doi = f'10.test/DoiNorm.{int(time.time() * 1000)}'
+        response = client.post('/api/papers', json={'doi': doi, 'title': 'Normalized DOI'})
+        assert response.status_code == 201
+        assert data_db.execute(
+            "SELECT doi_norm FROM papers WHERE doi = ?", [doi]
+        ).fetchone()[0] == doi.lower()
+        assert client.post('/api/papers', json={'doi': doi.upper(), 'title': 'Dup'}).status_code == 409
+        assert client.delete(f'/api/papers/{doi}').status_code == 200
+
+
+class TestMicrotopicEdges:
+    """Test the microtopic graph on the precomputed microtopic_edges table."""
+
+    URL = '/api/microtopics/graph?min_size=0&min_edge_weight=0'
+
+    @pytest.fixture
+    def edges(self, app_ctx, pipeline):
+        """Build microtopic_edges for one test and drop it again afterwards."""
+        db = get_data_db()
+        cache.clear()
+        yield lambda: pipeline('process_microtopic_edges').build_microtopic_edges(db)
+        db.execute("DROP TABLE IF EXISTS microtopic_edges")
+        data_db_manager.forget_tables()
+        cache.clear()
+
+    def test_edge_table(self, data_db, edges):
+        """Test that each overlapping pair is stored once with its weights."""
+        edges()
+        rows = data_db.execute("SELECT * FROM microtopic_edges").fetchall()
+        assert rows == [('mt-cv-002', 'mt-ml-001', 1, pytest.approx(1 / 3), pytest.approx(0.45))]
+
+    def test_graph_matches_live_edges(self, client, edges):
+        """Test that the graph endpoint returns the same edges either way."""
+        live = json.loads(client.get(self.URL).data)
+        assert live['edge_count'] == 1
+        edges()
+        cache.clear()
+        assert json.loads(client.get(self.URL).data) == live
+
+    def test_min_edge_weight(self, client, edges):
+        """Test that min_edge_weight filters precomputed edges."""
+        edges()
+        data = json.loads(client.get('/api/microtopics/graph?min_size=0&min_edge_weight=0.5').data)
+        assert data['edges'] == []
+
+    def test_citation_weight_without_cross_citations(self, client):
+        """Test that blending and min_edge_weight apply when no topics cite each other."""
+        cache.clear()
+        url = '/api/microtopics/graph?min_size=0&citation_weight=0.5&min_edge_weight='
+        data = json.loads(client.get(url + '0').data)
+        assert [(e['source'], e['target'], e['weight']) for e in data['edges']] == [
+            ('mt-ml-001', 'mt-cv-002', 0.225),
+        ]
+        assert json.loads(client.get(url + '0.99').data)['edges'] == []
+
+
+class TestMicrotopicStats:
+    """Test microtopic detail served from the materialized stats tables."""
+
+    TOPICS = ['mt-ml-001', 'mt-cv-002', 'mt-nlp-003']
+
+    @pytest.fixture
+    def stats_tables(self, app_ctx, pipeline):
+        """Build the stats tables for one test and drop them again afterwards."""
+        db = get_data_db()
+        module = pipeline('process_microtopic_stats')
+        cache.clear()
+        yield module
+        for table in module.STATS_TABLES:
+            db.execute(f"DROP TABLE IF EXISTS {table}")
+        data_db_manager.forget_tables()
+        cache.clear()
+
+    def test_detail_matches_live(self, client, data_db, stats_tables):
+        """Test that the detail endpoint returns the same data either way."""
+        live = {t: json.loads(client.get(f'/api/microtopics/{t}').data) for t in self.TOPICS}
+        stats_tables.build_microtopic_stats(data_db)
+        cache.clear()
+        for topic_id, expected in live.items():
+            data = json.loads(client.get(f'/api/microtopics/{topic_id}').data)
+            key = lambda a: a['name']
+            assert sorted(data.pop('top_authors'), key=key) == sorted(expected.pop('top_authors'), key=key)
+            assert data == expected
+
+    def test_author_citations(self, client, data_db, stats_tables):
+        """Test that top authors carry the citations of their papers."""
+        stats_tables.build_microtopic_stats(data_db)
+        data = json.loads(client.get('/api/microtopics/mt-ml-001').data)
+        assert data['top_authors'][0] == {'name': 'Alice Smith', 'paper_count': 1, 'total_citations': 5}
+        assert data['stats']['unique_author_count'] == 3
+
+    def test_bucket_refresh(self, data_db, stats_tables):
+        """Test that a bucket refresh only rewrites that bucket's rows."""
+        stats_tables.build_microtopic_stats(data_db)
+        data_db.execute("DELETE FROM microtopic_stats")
+        stats_tables.update_microtopic_stats(data_db, 'categories', 'cs.CV')
+        rows = data_db.execute("SELECT microtopic_id, paper_count FROM microtopic_stats").fetchall()
+        assert rows == [('mt-cv-002', 2)]
+
+    def test_bucket_update_needs_full_build(self, data_db, stats_tables):
+        """Test that a per-bucket refresh does not create the tables on its own."""
+        assert stats_tables.update_microtopic_stats(data_db, 'categories', 'cs.CV') is False
+        assert not data_db_manager.has_table('microtopic_stats', data_db)
+
+
+class TestCrossCitations:
+    """Test cross-citation counts from the microtopic_citations matrix."""
+
+    @pytest.fixture(autouse=True)
+    def topic_citations(self, app_ctx, pipeline):
+        """Let a cs.CV paper cite one ML and one NLP paper, then build the matrix."""
+        db = get_data_db()
+        original = db.execute("SELECT citations FROM papers WHERE id = '2024.12346'").fetchone()[0]
+        db.execute(
+            "UPDATE papers SET citations = ['10.1234/TEST.PAPER.005', '2024.12347'] WHERE id = '2024.12346'"
+        )
+        pipeline('process_topic_citations').build_topic_citations(db)
+        cache.clear()
+        yield
+        db.execute("UPDATE papers SET citations = ? WHERE id = '2024.12346'", [original])
+        db.execute("DROP TABLE IF EXISTS microtopic_citations")
+        data_db_manager.forget_tables()
+        cache.clear()
+
+    def test_matrix(self, data_db):
+        """Test that DOI and id references resolve to the cited papers' topics."""
+        rows = data_db.execute("SELECT * FROM microtopic_citations ORDER BY ALL").fetchall()
+        assert rows == [('mt-cv-002', 'mt-ml-001', 1), ('mt-cv-002', 'mt-nlp-003', 1)]
+
+    def test_compare(self, client):
+        """Test that compare counts citations in both directions."""
+        data = json.loads(client.get('/api/microtopics/compare?topic_a=mt-ml-001&topic_b=mt-cv-002').data)
+        assert data['overlap']['cross_citation_count'] == 1
+
+    def test_report(self, client):
+        """Test that the topic report comparison carries cross-citations."""
+        response = client.post('/api/reports/topic', json={
+            'microtopic_id': 'mt-nlp-003', 'compare_microtopic_id': 'mt-cv-002'
+        })
+        data = json.loads(response.data)
+        assert data['comparison']['overlap']['cross_citations'] == 1
+
+    def test_graph_edges(self, client):
+        """Test that graph edges report cross-citations without changing weights."""
+        data = json.loads(client.get('/api/microtopics/graph?min_size=0&min_edge_weight=0').data)
+        assert [(e['source'], e['target'], e['weight'], e['cross_citations']) for e in data['edges']] == [
+            ('mt-ml-001', 'mt-cv-002', 0.45, 1),
+        ]
+
+    def test_graph_citation_weight(self, client):
+        """Test that citation_weight blends citations into edge weights."""
+        data = json.loads(
+            client.get('/api/microtopics/graph?min_size=0&min_edge_weight=0&citation_weight=0.5').data
+        )
+        assert [(e['source'], e['target'], e['weight'], e['shared_papers']) for e in data['edges']] == [
+            ('mt-ml-001', 'mt-cv-002', 0.325, 1),
+            ('mt-cv-002', 'mt-nlp-003', 0.167, 0),
+        ]
+
+
+class TestAnalyticsRollup:
+    """Test that the analytics endpoints answer identically from the rollup cube."""
+
+    ENDPOINTS = [
+        '/api/analytics/papers/over-time',
+        '/api/analytics/papers/over-time?group_by=month',
+        '/api/analytics/citations/distribution',
+        '/api/analytics/subjects?limit=5',
+        '/api/analytics/domains',
+        '/api/analytics/topics?domain=Physical%20Sciences',
+    ]
+
+    @pytest.fixture
+    def rollup(self, app_ctx, pipeline):
+        """Build the cube for one test and drop it again afterwards."""
+        db = get_data_db()
+        yield lambda: pipeline('process_rollups').build_rollups(db)
+        db.execute("DROP TABLE IF EXISTS analytics_rollup")
+        db.execute("DROP TABLE IF EXISTS analytics_rollup_meta")
+        data_db_manager.forget_tables()
+
+    def test_rollup_matches_live_queries(self, client, rollup):
+        """Test that every cube-backed endpoint returns the live result."""
+        live = {url: json.loads(client.get(url).data) for url in self.ENDPOINTS}
+        assert live['/api/analytics/papers/over-time']['data']
+
+        stats = rollup()
+        assert stats['papers'] > 0
+
+        for url, expected in live.items():
+            assert json.loads(client.get(url).data) == expected, url
+
+    def test_subject_filter_uses_live_query(self, client, rollup):
+        """Test that filters the cube can't serve still return filtered data."""
+        url = '/api/analytics/papers/over-time?subject=cs.CV'
+        expected = json.loads(client.get(url).data)
+        rollup()
+        assert json.loads(client.get(url).data) == expected
+
+
 class TestEdgeCases:
     """Test edge cases and error conditions."""
 
@@ -0,0 +1,273 @@
+"""
+Tests for src/cache.py and the shared SQLite cache backend.
+"""
+
+import os
+import threading
+import time
+
+import pytest
+from flask import g, request
+
+from src import cache_backend
+from src.main import app
+from src.cache import cache, single_flight, user_caches
+from src.cache_backend import SQLiteCache
+
+
+def cache_key(path, user_id, caller=None):
+    with app.test_request_context(path):
+        g.user_id = user_id if caller is None else caller
+        return user_caches.make_cache_key(user_id=user_id)
+
+
+class TestUserCacheNamespaces:
+    """Invalidating one user must leave everyone else's entries alone."""
+
+    def test_key_ignores_query_order(self):
+        assert cache_key('/api/users/1/recommendations?limit=5&strategy=hybrid', 1) == \
+            cache_key('/api/users/1/recommendations?strategy=hybrid&limit=5', 1)
+
+    def test_key_includes_caller(self):
+        assert cache_key('/api/users/1/recommendations', 1) != \
+            cache_key('/api/users/1/recommendations', 1, caller=2)
+
+    def test_invalidate_drops_only_that_user(self):
+        with app.app_context():
+            key_1 = cache_key('/api/users/1/recommendations?limit=5', 1)
+            key_1b = cache_key('/api/users/1/recommendations?limit=10', 1)
+            key_2 = cache_key('/api/users/2/recommendations?limit=5', 2)
+            for key in (key_1, key_1b, key_2, 'view//api/analytics/hot-papers'):
+                cache.set(key, 'cached')
+
+            before = user_caches.stats()
+            assert user_caches.invalidate(1) == 2
+
+            assert cache.get(key_1) is None
+            assert cache.get(key_1b) is None
+            assert cache.get(key_2) == 'cached'
+            assert cache.get('view//api/analytics/hot-papers') == 'cached'
+
+            after = user_caches.stats()
+            assert after['invalidations'] == before['invalidations'] + 1
+            assert after['entries_dropped'] == before['entries_dropped'] + 2
+            assert after['last_dropped'] == 2
+
+    def test_new_generation_after_invalidate(self):
+        with app.app_context():
+            old = cache_key('/api/users/3/recommendations', 3)
+            user_caches.invalidate(3)
+            assert cache_key('/api/users/3/recommendations', 3) != old
+            assert user_caches.invalidate(3) == 0
+
+    def test_health_reports_invalidations(self):
+        with app.test_client() as client:
+            data = client.get('/api/health').get_json()
+        assert set(data['user_cache']) >= {'invalidations', 'entries_dropped', 'last_dropped'}
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cache_backend.time, 'time', fake.time)
+    return fake
+
+
+def make_cache(tmp_path, **kwargs):
+    return SQLiteCache(path=str(tmp_path / 'cache.sqlite3'), **kwargs)
+
+
+class TestSQLiteCache:
+    """The shared SQLite backend behind src.cache.cache."""
+
+    def test_roundtrip(self, tmp_path):
+        backend = make_cache(tmp_path)
+        assert backend.get('missing') is None
+        assert backend.set('k', {'papers': [1, 2]})
+        assert backend.get('k') == {'papers': [1, 2]}
+        assert backend.has('k')
+        assert backend.delete('k')
+        assert not backend.delete('k')
+        assert not backend.has('k')
+
+    def test_ttl(self, tmp_path, clock):
+        backend = make_cache(tmp_path, default_timeout=300)
+        backend.set('short', 1, timeout=10)
+        backend.set('default', 2)
+        backend.set('forever', 3, timeout=0)
+        clock.now += 11
+        assert backend.get('short') is None
+        assert backend.get('default') == 2
+        clock.now += 300
+        assert backend.get('default') is None
+        assert backend.get('forever') == 3
+
+    def test_add_only_when_absent_or_expired(self, tmp_path, clock):
+        backend = make_cache(tmp_path)
+        assert backend.add('k', 1, timeout=10)
+        assert not backend.add('k', 2)
+        assert backend.get('k') == 1
+        clock.now += 11
+        assert backend.add('k', 3)
+        assert backend.get('k') == 3
+
+    def test_lru_eviction_by_count(self, tmp_path, clock):
+        backend = make_cache(tmp_path, threshold=2)
+        backend.set('a', 1)
+        clock.now += 5
+        backend.set('b', 2)
+        clock.now += 5
+        assert backend.get('a') == 1  # a is now more recent than b
+        clock.now += 5
+        backend.set('c', 3)
+        assert backend.get('b') is None
+        assert backend.get('a') == 1
+        assert backend.get('c') == 3
+        assert backend.stats()['evictions'] == 1
+
+    def test_eviction_by_size_prefers_expired(self, tmp_path, clock):
+        blob = 'x' * 1000
+        backend = make_cache(tmp_path, max_bytes=2500)
+        backend.set('old', blob, timeout=5)
+        clock.now += 1
+        backend.set('kept', blob)
+        clock.now += 10
+        backend.set('new', blob)
+        assert backend.get('old') is None
+        assert backend.get('kept') == blob
+        assert backend.stats()['bytes'] <= 2500
+
+    def test_totals_follow_writes(self, tmp_path, clock):
+        backend = make_cache(tmp_path, threshold=3)
+
+        def scanned():
+            return backend._connect().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries"
+            ).fetchone()
+
+        backend.set('a', 'x' * 10)
+        backend.set('a', 'x' * 500)  # replace
+        backend.add('a', 'ignored')
+        backend.set('b', 2, timeout=5)
+        clock.now += 10
+        backend.add('b', 3)  # replaces the expired entry
+        backend.set('c', 3)
+        backend.set('d', 4)  # evicts one
+        assert backend.stats()['entries'] == 3
+        assert backend._totals(backend._connect()) == scanned()
+        backend.delete('c')
+        assert backend._totals(backend._connect()) == scanned()
+        backend.clear()
+        assert backend._totals(backend._connect()) == scanned() == (0, 0)
+
+    def test_totals_seeded_for_existing_file(self, tmp_path):
+        backend = make_cache(tmp_path)
+        backend.set('a', 'x' * 100)
+        backend.set('b', 'y')
+        conn = backend._connect()
+        conn.execute("DROP TABLE cache_totals")
+        assert make_cache(tmp_path)._totals(conn) == conn.execute(
+            "SELECT COUNT(*), SUM(size) FROM cache_entries"
+        ).fetchone()
+
+    def test_shared_across_processes(self, tmp_path):
+        backend = make_cache(tmp_path)
+        backend.get('warm')  # open a connection before forking
+        pid = os.fork()
+        if pid == 0:
+            try:
+                backend.set('from-child', 'hello')
+            finally:
+                os._exit(0)
+        os.waitpid(pid, 0)
+        assert backend.get('from-child') == 'hello'
+
+    def test_app_uses_backend(self):
+        assert isinstance(cache.cache, SQLiteCache)
+
+
+def call_view(view, path):
+    with app.test_request_context(path):
+        return view()
+
+
+class TestSingleFlight:
+    """Concurrent misses run the view once; stale entries refresh in the background."""
+
+    def test_concurrent_misses_coalesce(self):
+        calls = []
+        release = threading.Event()
+
+        @single_flight.cached(timeout=60)
+        def view():
+            calls.append(1)
+            release.wait(5)
+            return {'value': len(calls)}
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(call_view(view, '/sf/coalesce?x=1').get_json()))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.2)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        assert len(calls) == 1
+        assert results == [{'value': 1}] * 5
+        assert call_view(view, '/sf/coalesce?x=1').get_json() == {'value': 1}
+
+    def test_query_strings_are_separate_keys(self):
+        calls = []
+
+        @single_flight.cached(timeout=60)
+        def view():
+            calls.append(request.args['x'])
+            return {'x': request.args['x']}
+
+        assert call_view(view, '/sf/keys?x=1').get_json() == {'x': '1'}
+        assert call_view(view, '/sf/keys?x=2').get_json() == {'x': '2'}
+        assert call_view(view, '/sf/keys?x=1').get_json() == {'x': '1'}
+        assert calls == ['1', '2']
+
+    def test_errors_are_not_cached(self):
+        calls = []
+
+        @single_flight.cached(timeout=60)
+        def view():
+            calls.append(1)
+            return {'error': 'bad'}, 400
+
+        assert call_view(view, '/sf/errors').status_code == 400
+        assert call_view(view, '/sf/errors').status_code == 400
+        assert len(calls) == 2
+
+    def test_stale_while_revalidate(self):
+        calls = []
+
+        # timeout=0: every entry is stale at once but servable for 60s
+        @single_flight.cached(timeout=0, stale_ttl=60)
+        def view():
+            calls.append(1)
+            return {'value': len(calls)}
+
+        assert call_view(view, '/sf/stale').get_json() == {'value': 1}
+        before = single_flight.stats()['background_refreshes']
+        assert call_view(view, '/sf/stale').get_json() == {'value': 1}
+
+        deadline = time.time() + 5
+        while single_flight.stats()['background_refreshes'] == before and time.time() < deadline:
+            time.sleep(0.01)
+        assert len(calls) == 2
+        assert call_view(view, '/sf/stale').get_json() == {'value': 2}
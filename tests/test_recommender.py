@@ -0,0 +1,139 @@
+"""
+Tests for src/recommender.py.
+
+The set-based scorer must rank the same candidates, with the same scores,
+as the original row-wise route body, which is kept in benchmarks/ as the
+reference.
+"""
+
+import datetime as dt
+import threading
+import time
+
+import numpy as np
+import pytest
+from src.precompute import RecommendationQueue
+from src.recommender import CITATION_REASON, TOPIC_REASON, read_weights, recommend
+from benchmarks.bench_recommender import legacy_recommend, make_corpus, make_reads
+
+NOW = dt.datetime(2025, 1, 1)
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    conn = make_corpus(n_papers=80, n_topics=10, seed=3)
+    yield conn
+    conn.close()
+
+
+def scores(recs):
+    return {r["id"]: (round(r["score"], 9), r["reason"], r["citation_count"]) for r in recs}
+
+
+class TestReadWeights:
+    def test_decay_and_floor(self):
+        read_at = np.array([NOW, NOW - dt.timedelta(days=30, hours=5), NOW - dt.timedelta(days=400)],
+                           dtype="datetime64[us]")
+        assert read_weights(read_at, NOW).tolist() == pytest.approx([2.0, 1.0, 0.5])
+
+    def test_missing_timestamp_counts_as_a_year(self):
+        read_at = np.ma.MaskedArray(np.array([NOW, NOW], dtype="datetime64[us]"), mask=[False, True])
+        assert read_weights(read_at, NOW).tolist() == pytest.approx([2.0, 0.5])
+
+
+class TestRecommend:
+    """Same candidates and scores as the row-wise reference when it does not truncate."""
+
+    # limit * 3 exceeds the corpus, so the reference's LIMIT never cuts candidates
+    LIMIT = 100
+
+    @pytest.mark.parametrize("strategy", ["citation_graph", "topic_similarity", "hybrid"])
+    @pytest.mark.parametrize("use_cited_by", [False, True])
+    def test_matches_reference(self, corpus, strategy, use_cited_by):
+        reads = make_reads(corpus, 12, NOW, seed=5)
+        expected = legacy_recommend(corpus, reads, strategy, self.LIMIT, NOW)
+        got = recommend(corpus, reads["paper_id"].tolist(), reads["read_at"].to_numpy(),
+                        strategy, self.LIMIT, NOW, use_cited_by=use_cited_by)
+        assert expected
+        assert scores(got) == scores(expected)
+        assert [r["score"] for r in got] == sorted((r["score"] for r in got), reverse=True)
+
+    def test_reasons_and_exclusions(self, corpus):
+        reads = make_reads(corpus, 12, NOW, seed=5)
+        read_ids = set(reads["paper_id"])
+        deleted = {r[0] for r in corpus.execute("SELECT id FROM papers WHERE deleted").fetchall()}
+        got = recommend(corpus, list(read_ids), reads["read_at"].to_numpy(), "hybrid", self.LIMIT, NOW,
+                        use_cited_by=False)
+        ids = [r["id"] for r in got]
+        assert len(ids) == len(set(ids))
+        assert not (set(ids) & (read_ids | deleted))
+        assert {r["reason"] for r in got} <= {CITATION_REASON, TOPIC_REASON}
+
+    def test_limit(self, corpus):
+        reads = make_reads(corpus, 12, NOW, seed=5)
+        got = recommend(corpus, reads["paper_id"].tolist(), reads["read_at"].to_numpy(), "hybrid", 3, NOW,
+                        use_cited_by=False)
+        assert len(got) == 3
+
+    def test_empty_history_and_bad_strategy(self, corpus):
+        assert recommend(corpus, [], [], "hybrid", 10, NOW, use_cited_by=False) == []
+        with pytest.raises(ValueError):
+            recommend(corpus, ["x"], [NOW], "popular", 10, NOW, use_cited_by=False)
+
+
+class TestRecommendationQueue:
+    """Debounced, non-overlapping per-user refreshes."""
+
+    def test_debounce_coalesces_bursts(self):
+        calls = []
+        queue = RecommendationQueue(calls.append, debounce=0.2, workers=2)
+        for _ in range(5):
+            queue.schedule(1)
+        queue.schedule(2)
+        time.sleep(0.05)
+        assert calls == []
+        assert queue.flush(5)
+        assert sorted(calls) == [1, 2]
+        assert queue.stats()["debounced"] == 4
+        assert queue.stats()["refreshed"] == 2
+
+    def test_runs_after_quiet_period(self):
+        calls = []
+        queue = RecommendationQueue(calls.append, debounce=0.05, workers=1)
+        queue.schedule(7)
+        deadline = time.time() + 5
+        while not calls and time.time() < deadline:
+            time.sleep(0.01)
+        assert calls == [7]
+
+    def test_same_user_never_overlaps(self):
+        running, overlaps, calls = set(), [], []
+        release = threading.Event()
+
+        def refresh(user_id):
+            if user_id in running:
+                overlaps.append(user_id)
+            running.add(user_id)
+            calls.append(user_id)
+            release.wait(5)
+            running.discard(user_id)
+
+        queue = RecommendationQueue(refresh, debounce=0, workers=4)
+        queue.schedule(3)
+        time.sleep(0.1)
+        queue.schedule(3)  # arrives mid-refresh: runs once more afterwards
+        time.sleep(0.1)
+        assert calls == [3]
+        release.set()
+        assert queue.flush(5)
+        assert calls == [3, 3]
+        assert overlaps == []
+
+    def test_failures_are_counted(self):
+        def refresh(user_id):
+            raise RuntimeError("boom")
+
+        queue = RecommendationQueue(refresh, debounce=0, workers=1)
+        queue.schedule(1)
+        assert queue.flush(5)
+        assert queue.stats()["failed"] == 1
@@ -0,0 +1,127 @@
+"""
+Tests for df_to_json_serializable.
+
+The columnar implementation must produce the same JSON as the original
+row-wise (iterrows) version, which is kept in benchmarks/ as the reference.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.main import app
+from src.database import (
+    ARROW_STREAM_MIMETYPE, PYARROW_AVAILABLE, df_to_json_serializable, fetch_records, get_data_db,
+)
+from benchmarks.bench_serialization import legacy_df_to_json_serializable, make_papers_frame
+
+
+def assert_same_json(df):
+    assert app.json.dumps(df_to_json_serializable(df)) == app.json.dumps(legacy_df_to_json_serializable(df))
+
+
+class TestDfToJsonSerializable:
+    """Byte-for-byte equivalence with the row-wise serializer."""
+
+    def test_papers_shaped_frame(self):
+        assert_same_json(make_papers_frame(500, seed=1))
+
+    def test_empty_frames(self):
+        assert df_to_json_serializable(pd.DataFrame()) == []
+        assert_same_json(pd.DataFrame({"a": pd.Series([], dtype=int)}))
+        assert df_to_json_serializable(pd.DataFrame(index=range(2))) == [{}, {}]
+
+    def test_all_numeric_frame_upcasts_like_iterrows(self):
+        # iterrows() turns an int+float row into floats; keep that behaviour
+        df = pd.DataFrame({"n": [1, 2], "x": [0.5, np.nan]})
+        assert_same_json(df)
+        assert df_to_json_serializable(df)[0] == {"n": 1.0, "x": 0.5}
+
+    def test_single_int_column_stays_int(self):
+        df = pd.DataFrame({"count": np.array([3, 4], dtype=np.int64)})
+        assert_same_json(df)
+        assert df_to_json_serializable(df) == [{"count": 3}, {"count": 4}]
+
+    def test_nulls_and_nested_values(self):
+        df = pd.DataFrame({
+            "s": ["a", None, "c"],
+            "nullable_int": pd.array([1, None, 3], dtype="Int64"),
+            "lists": [[1, 2], [], np.array([np.int64(3), None], dtype=object)],
+            "dicts": [{"k": np.int32(1)}, {"k": None}, {}],
+            "dt": pd.to_datetime(["2024-01-02", None, "2020-12-31"]),
+            "flag": [True, False, True],
+        })
+        assert_same_json(df)
+
+    def test_real_query_result(self):
+        with app.app_context():
+            df = get_data_db().execute("SELECT * FROM papers LIMIT 50").fetchdf()
+        assert_same_json(df)
+
+
+class TestFetchRecords:
+    """fetchnumpy()-based records match the DataFrame path."""
+
+    def test_matches_dataframe_path(self):
+        with app.app_context():
+            db = get_data_db()
+            expected = df_to_json_serializable(db.execute("SELECT * FROM papers ORDER BY id LIMIT 50").fetchdf())
+            records = fetch_records(db.execute("SELECT * FROM papers ORDER BY id LIMIT 50"))
+        assert json.loads(app.json.dumps(records)) == json.loads(app.json.dumps(expected))
+
+    def test_nulls_dates_and_nested(self):
+        with app.app_context():
+            records = fetch_records(get_data_db().execute("""
+                SELECT * FROM (VALUES
+                    (1, 'a', DATE '2024-01-02', [1, 2], {'k': 1}, 0.5),
+                    (NULL, NULL, NULL, [], NULL, NULL)
+                ) t(n, s, d, l, st, x)
+            """))
+        assert records == [
+            {"n": 1, "s": "a", "d": "2024-01-02", "l": [1, 2], "st": {"k": 1}, "x": 0.5},
+            {"n": None, "s": None, "d": None, "l": [], "st": None, "x": None},
+        ]
+        assert type(records[0]["n"]) is int
+
+    def test_statement_without_result(self):
+        with app.app_context():
+            assert fetch_records(get_data_db().execute("SET threads = 4")) == []
+
+
+class TestResponseFormats:
+    """JSON encoding and Accept-negotiated Arrow responses."""
+
+    @pytest.fixture
+    def client(self):
+        app.config["TESTING"] = True
+        with app.test_client() as client:
+            yield client
+
+    def test_json_body_is_sorted_and_parseable(self, client):
+        response = client.get('/api/analytics/papers/over-time')
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert response.data == (app.json.dumps(data, separators=(",", ":")) + "\n").encode()
+        assert 'Accept' in response.headers.get('Vary', '')
+
+    def test_default_accept_gets_json(self, client):
+        response = client.get('/api/analytics/subjects', headers={'Accept': '*/*'})
+        assert response.mimetype == 'application/json'
+
+    @pytest.mark.skipif(not PYARROW_AVAILABLE, reason="pyarrow not installed")
+    def test_arrow_stream(self, client):
+        import pyarrow as pa
+
+        response = client.get('/api/analytics/authors/top?limit=5',
+                              headers={'Accept': ARROW_STREAM_MIMETYPE})
+        assert response.mimetype == ARROW_STREAM_MIMETYPE
+        table = pa.ipc.open_stream(response.data).read_all()
+        assert table.num_rows <= 5
+        assert json.loads(table.schema.metadata[b'sorted_by']) == 'h_index'
+
+    @pytest.mark.skipif(PYARROW_AVAILABLE, reason="pyarrow installed")
+    def test_arrow_falls_back_to_json_without_pyarrow(self, client):
+        response = client.get('/api/analytics/subjects', headers={'Accept': ARROW_STREAM_MIMETYPE})
+        assert response.status_code == 200
+        assert 'subjects' in json.loads(response.data)